@@ -1,139 +1,169 @@
 import pandas as pd
+import numpy as np
+import argparse
 import os
-import re
-
-# === Grade to GPA mapping ===
-grade_points = {
-    "A+": 4.0, "A": 4.0, "A-": 3.7,
-    "B+": 3.3, "B": 3.0, "B-": 2.7,
-    "C+": 2.3, "C": 2.0, "C-": 1.7,
-    "D+": 1.3, "D": 1.0,
-    "E": 0.0, "F": 0.0, "NC": 0.0
+from storage.ingest import exclude_results, load_results, map_unique, normalize_rows
+from timings import StageTimer, add_timings_argument
+
+# === Grade point cap for repeated subjects (C+) ===
+REPEAT_CAP = 2.3
+
+# === SCS course number ranges of each semester ===
+SEMESTER_RANGES = {
+    "Y1S1": (1201, 1207),
+    "Y1S2": (1208, 1214),
+    "Y2S1": (2201, 2208),
+    "Y2S2": (2209, 2214),
+    "Y3S1": (3200, 3299),
 }
+SEMESTERS = list(SEMESTER_RANGES)
+# Longest slice numpy's pairwise sum adds in a single pass
+PAIRWISE_BLOCK = 128
+SUMMARY_PATH = "data/summary/GPA_Summary.xlsx"
+
+
+def assign_semesters(subjects):
+    """
+    Map normalized subject codes to Y1S1..Y3S1 ("Unknown" when the code is not an SCS course).
+    """
+    num = pd.to_numeric(subjects.str.extract(r"SCS(\d{4})", expand=False), errors="coerce")
+    semester = np.select(
+        [num.between(low, high) for low, high in SEMESTER_RANGES.values()],
+        SEMESTERS,
+        default="Unknown",
+    )
+    return pd.Series(semester, index=subjects.index)
 
-# === Non-credit/invalid grades to exclude from GPA calculation but count MCs ===
-exclude_results = {"CM", "MC", "EC", "CN", "WH", "NC"}
-
-# === Normalize subject code ===
-def normalize_subject_code(code):
-    return re.sub(r"\s+", "", str(code)).strip().upper()
-
-
-def get_semester(subject_code):
-    subject_code = normalize_subject_code(subject_code)
-    match = re.search(r'SCS(\d{4})', subject_code)
-    if not match:
-        return "Unknown"
-    num = int(match.group(1))
-
-    if 1201 <= num <= 1207:
-        return "Y1S1"
-    elif 1208 <= num <= 1214:
-        return "Y1S2"
-    elif 2201 <= num <= 2208:
-        return "Y2S1"
-    elif 2209 <= num <= 2214:
-        return "Y2S2"
-    elif 3200 <= num <= 3299:
-        return "Y3S1"
-    else:
-        return "Unknown"
 
+def sanitize_results(rows):
+    """
+    Clean every student's rows at once.
 
-def sanitize_results(df):
+    `rows` needs Index, Subject, Credits and Result columns (or is already
+    a frame from load_results). Returns (df_all, df_gpa): all credited rows
+    (for MC/CM counting) and the best attempt per student and subject with
+    the repeat cap applied.
+    """
+    df = normalize_rows(rows)
     df = df[df["Credits"] > 0].copy()
-    df["Result"] = df["Result"].astype(str).str.strip().str.upper()
-    df["Subject"] = df["Subject"].apply(normalize_subject_code)
-    df["GradePoint"] = df["Result"].map(grade_points)
+    df["Semester"] = map_unique(df["Subject"], assign_semesters, categorical=True)
 
     # Exclude for GPA (but keep for MC counting)
     df_valid = df[~df["Result"].isin(exclude_results)].copy()
 
-    # Mark subjects with multiple attempts
-    repeat_flags = df_valid["Subject"].duplicated(keep=False)
-    df_valid["IsRepeat"] = repeat_flags
-
-    # Sort so best grade comes first
-    df_valid = df_valid.sort_values(by=["Subject", "GradePoint"], ascending=[True, False])
+    # Mark subjects with multiple attempts per student
+    df_valid["IsRepeat"] = df_valid.duplicated(subset=["Index", "Subject"], keep=False)
 
-    # Deduplicate by subject — keep best grade
-    df_gpa = df_valid.drop_duplicates(subset="Subject", keep="first").copy()
+    # Sort so best grade comes first, then keep it per student and subject
+    df_valid = df_valid.sort_values(by=["Index", "Subject", "GradePoint"], ascending=[True, True, False])
+    df_gpa = df_valid.drop_duplicates(subset=["Index", "Subject"], keep="first").copy()
 
     # Cap grade point at C+ (2.3) if it's a repeat AND better than C+
-    df_gpa["CappedGradePoint"] = df_gpa.apply(
-        lambda row: min(row["GradePoint"], 2.3) if row["IsRepeat"] and row["GradePoint"] > 2.3 else row["GradePoint"],
-        axis=1
-    )
+    repeat_capped = df_gpa["IsRepeat"] & (df_gpa["GradePoint"] > REPEAT_CAP)
+    df_gpa["CappedGradePoint"] = df_gpa["GradePoint"].mask(repeat_capped, REPEAT_CAP)
+
+    return df, df_gpa
+
+
+def ordered_sums(values, starts, ends):
+    """
+    Sum of values[start:end] for every group, added up in exactly the order
+    numpy's sum() adds that slice (one after the other below 8 values, in 8
+    running lanes from 8 on), so a GPA half-way at the 4th decimal rounds the
+    same way as in the per-student calculation.
+    """
+    starts, ends = np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+    sizes = ends - starts
+    # numpy splits slices longer than PAIRWISE_BLOCK in two; no student has that many subjects
+    long = np.flatnonzero(sizes > PAIRWISE_BLOCK)
+    sizes[long] = 0
+    lanes = np.zeros((len(starts), 8))
+    blocked = np.where(sizes >= 8, sizes - sizes % 8, 0)
+    for offset in range(0, int(blocked.max(initial=0)), 8):
+        rows = np.flatnonzero(blocked > offset)
+        lanes[rows] += values[starts[rows, None] + offset + np.arange(8)]
+    sums = ((lanes[:, 0] + lanes[:, 1]) + (lanes[:, 2] + lanes[:, 3])) + (
+        (lanes[:, 4] + lanes[:, 5]) + (lanes[:, 6] + lanes[:, 7]))
+    for offset in range(7):
+        rows = np.flatnonzero(sizes - blocked > offset)
+        sums[rows] += values[starts[rows] + blocked[rows] + offset]
+    for row in long:
+        sums[row] = values[starts[row]:ends[row]].sum()
+    return sums
+
+
+def grouped_gpa(df, keys, gp_col="GradePoint"):
+    """
+    Credit-weighted GPA per group, rounded to 4 places. Missing grade points
+    count towards credits but not points, as in the per-student calculation.
+    The points of a group are summed in subject order (see ordered_sums).
+    """
+    df = df.sort_values(keys, kind="stable")
+    sizes = df.groupby(keys, observed=True).size()
+    ends = sizes.to_numpy().cumsum()
+    starts = ends - sizes.to_numpy()
+    weighted = ordered_sums((df["Credits"] * df[gp_col]).fillna(0.0).to_numpy(dtype="float64"), starts, ends)
+    credits = ordered_sums(df["Credits"].to_numpy(dtype="float64"), starts, ends)
+    gpa = np.divide(weighted, credits, out=np.zeros(len(sizes)), where=credits > 0)
+    return pd.Series(np.round(gpa, 4), index=sizes.index)
+
+
+def compute_gpa_summary(rows):
+    """
+    Compute the GPA summary for a whole cohort.
+
+    `rows` holds every student's result rows (Index, Subject, Credits, Result).
+    Returns one row per student with the semester GPAs, the repeat-capped
+    FinalGPA, TotalMC and Rank, ordered by rank like GPA_Summary.xlsx.
+    """
+    students = pd.Index(np.asarray(pd.unique(rows["Index"]), dtype=object), name="Index").sort_values()
+    df_all, df_gpa = sanitize_results(rows)
+
+    sem_gpas = grouped_gpa(df_gpa, ["Index", "Semester"]).unstack("Semester")
+    sem_gpas = sem_gpas.reindex(index=students, columns=SEMESTERS).fillna(0.0)
 
-    # Assign semester after deduplication
-    df_gpa["Semester"] = df_gpa["Subject"].apply(get_semester)
+    # Final GPA includes all grades except excluded
+    final_gpa = grouped_gpa(df_gpa, ["Index"], "CappedGradePoint").reindex(students).fillna(0.0)
 
-    # Full list with all results (for MC/CM handling)
-    df_all = df.copy()
-    df_all["Semester"] = df_all["Subject"].apply(get_semester)
+    # Count total MC (and CM) credits
+    mc = df_all[df_all["Result"].isin({"MC", "CM"})]
+    # Credits are stored as int16; summed as int64 like before
+    total_mc = mc["Credits"].astype("int64").groupby(mc["Index"], observed=True).sum().reindex(students, fill_value=0)
 
-    return df_all, df_gpa
+    summary_df = sem_gpas.assign(FinalGPA=final_gpa, TotalMC=total_mc).reset_index()
+    summary_df.columns.name = None
+    return rank_students(summary_df)
 
 
-def calculate_gpa(df, use_capped=True):
-    if df.empty:
-        return 0.0
-    gp_col = "CappedGradePoint" if use_capped and "CappedGradePoint" in df.columns else "GradePoint"
-    df = df.copy()
-    df["Weighted"] = df["Credits"] * df[gp_col]
-    total_credits = df["Credits"].sum()
-    if total_credits == 0:
-        return 0.0
-    return round(df["Weighted"].sum() / total_credits, 4)
+def rank_students(summary_df):
+    summary_df = summary_df.sort_values(by="FinalGPA", ascending=False)
+    summary_df["Rank"] = summary_df["FinalGPA"].rank(method="min", ascending=False).astype(int)
+    return summary_df.sort_values(by="Rank")  # Optional: sort by rank instead of GPA
 
-def process_student(file_path):
-    df = pd.read_excel(file_path)
-    df_all, df_gpa = sanitize_results(df)
-    df_gpa["Semester"] = df_gpa["Subject"].apply(get_semester)
-    df_all["Semester"] = df_all["Subject"].apply(get_semester)
 
-    sem_gpas = {}
-    for sem in ["Y1S1", "Y1S2", "Y2S1", "Y2S2", "Y3S1"]:
-        sem_df = df_gpa[df_gpa["Semester"] == sem]
-        sem_gpas[sem] = calculate_gpa(sem_df, use_capped=False)
+def write_gpa_summary(summary_df, output_path=SUMMARY_PATH):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    summary_df.to_excel(output_path, index=False)
+    return output_path
 
-    # Final GPA includes all grades except excluded
-    final_gpa = calculate_gpa(df_gpa, use_capped=True)
 
-    # Count total MC (and CM) credits
-    mc_df = df_all[df_all["Result"].isin({"MC", "CM"})]
-    total_mc_credits = mc_df["Credits"].sum()
-
-    index = os.path.splitext(os.path.basename(file_path))[0]
-
-    return {
-        "Index": index,
-        **sem_gpas,
-        "FinalGPA": final_gpa,
-        "TotalMC": total_mc_credits
-    }
-
-# === Process all students ===
-folder = "data/results/"
-all_students = []
-
-for filename in os.listdir(folder):
-    if filename.endswith(".xlsx") and not filename.startswith("~$"):
-        path = os.path.join(folder, filename)
-        try:
-            result = process_student(path)
-            all_students.append(result)
-        except Exception as e:
-            print(f"❌ Error processing {filename}: {e}")
-
-# === Export to Excel ===
-summary_df = pd.DataFrame(all_students)
-summary_df = summary_df.sort_values(by="FinalGPA", ascending=False)
-summary_df["Rank"] = summary_df["FinalGPA"].rank(method="min", ascending=False).astype(int)
-summary_df = summary_df.sort_values(by="Rank")  # Optional: sort by rank instead of GPA
-
-output_path = "data/summary/GPA_Summary.xlsx"
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-summary_df.to_excel(output_path, index=False)
-
-print(f"✅ GPA summary saved to {output_path}")
+def main():
+    parser = argparse.ArgumentParser(description="Compute semester and final GPAs and rank every student.")
+    add_timings_argument(parser, "gpa_calculator")
+    args = parser.parse_args()
+
+    timer = StageTimer("gpa_calculator")
+    with timer.stage("load"):
+        rows = load_results()
+    with timer.stage("compute"):
+        summary_df = compute_gpa_summary(rows)
+    with timer.stage("write"):
+        output_path = write_gpa_summary(summary_df)
+    print(f"✅ GPA summary saved to {output_path}")
+    timer.print_summary()
+    if args.timings:
+        print(f"✅ Timing report saved to {timer.write(args.timings)}")
+
+
+if __name__ == "__main__":
+    main()
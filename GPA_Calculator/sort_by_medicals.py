@@ -1,30 +1,44 @@
 import pandas as pd
 import os
 
-# === Load the GPA summary ===
-summary_path = "data/summary/GPA_Summary.xlsx"
-df = pd.read_excel(summary_path)
+SUMMARY_PATH = "data/summary/GPA_Summary.xlsx"
+OUTPUT_PATH = "data/summary/GPA_Summary_By_Medicals.xlsx"
 
-# === Filter only the needed columns ===
-columns_to_keep = ["Index", "FinalGPA", "Rank", "TotalMC"]
-df_filtered = df[columns_to_keep]
 
-# === Sort by number of medicals descending (most MCs first) ===
-df_sorted = df_filtered.sort_values(by="TotalMC", ascending=False)
+def flag_strategic_mc(df):
+    # === Filter only the needed columns ===
+    columns_to_keep = ["Index", "FinalGPA", "Rank", "TotalMC"]
+    df_filtered = df[columns_to_keep]
 
-# === Calculate thresholds ===
-gpa_threshold = df_sorted["FinalGPA"].median()
-mc_threshold = df_sorted["TotalMC"].quantile(0.75)
+    # === Sort by number of medicals descending (most MCs first) ===
+    df_sorted = df_filtered.sort_values(by="TotalMC", ascending=False)
 
-# === Flag students possibly using MCs strategically ===
-df_sorted["StrategicUseOfMC"] = (
-    (df_sorted["FinalGPA"] > gpa_threshold) &
-    (df_sorted["TotalMC"] >= mc_threshold)
-)
+    # === Calculate thresholds ===
+    gpa_threshold = df_sorted["FinalGPA"].median()
+    mc_threshold = df_sorted["TotalMC"].quantile(0.75)
 
-# === Save to a new file ===
-output_path = "data/summary/GPA_Summary_By_Medicals.xlsx"
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-df_sorted.to_excel(output_path, index=False)
+    # === Flag students possibly using MCs strategically ===
+    df_sorted["StrategicUseOfMC"] = (
+        (df_sorted["FinalGPA"] > gpa_threshold) &
+        (df_sorted["TotalMC"] >= mc_threshold)
+    )
+    return df_sorted
 
-print(f"✅ Summary with strategic MC usage insight saved to {output_path}")
+
+def write_medicals_summary(df_sorted, output_path=OUTPUT_PATH):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    df_sorted.to_excel(output_path, index=False)
+    return output_path
+
+
+def main():
+    # === Load the GPA summary ===
+    df = pd.read_excel(SUMMARY_PATH)
+
+    # === Save to a new file ===
+    output_path = write_medicals_summary(flag_strategic_mc(df))
+    print(f"✅ Summary with strategic MC usage insight saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
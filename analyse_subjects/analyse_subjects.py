@@ -1,107 +1,97 @@
 import pandas as pd
+import argparse
 import os
-import re
-from collections import defaultdict
-
-# === Grade to GPA mapping ===
-grade_points = {
-    "A+": 4.0, "A": 4.0, "A-": 3.7,
-    "B+": 3.3, "B": 3.0, "B-": 2.7,
-    "C+": 2.3, "C": 2.0, "C-": 1.7,
-    "D+": 1.3, "D": 1.0,
-    "E": 0.0, "F": 0.0, "NC": 0.0
-}
-exclude_results = {"CM", "MC", "EC", "CN", "WH", "NC"}
-
-def normalize_subject_code(code):
-    return re.sub(r"\s+", "", str(code)).strip().upper()
+from concurrent.futures import ProcessPoolExecutor
+from storage.ingest import exclude_results, grade_points, load_results, normalize_rows
+from storage.results_store import STORE_PATH
+from timings import StageTimer, add_timings_argument
 
 def sanitize_results(df):
-    df = df[df["Credits"] > 0].copy()
-    df["Result"] = df["Result"].astype(str).str.strip().str.upper()
-    df["OriginalSubject"] = df["Subject"]  # <-- Keep original casing
-    df["Subject"] = df["Subject"].apply(normalize_subject_code)  # Normalized for grouping
-    df["GradePoint"] = df["Result"].map(grade_points)
-    return df
-
-def process_all_students(folder):
-    all_subject_records = []
-    for filename in os.listdir(folder):
-        if filename.endswith(".xlsx") and not filename.startswith("~$"):
-            path = os.path.join(folder, filename)
-            try:
-                df = pd.read_excel(path)
-                df = sanitize_results(df)
-                index = os.path.splitext(os.path.basename(filename))[0]
-                df["Index"] = index
-                all_subject_records.append(df)
-            except Exception as e:
-                print(f"❌ Error processing {filename}: {e}")
-    return pd.concat(all_subject_records, ignore_index=True)
-
-def analyze_subjects(df_all):
-    grouped = df_all.groupby("OriginalSubject")
-    output_dir = "data/summary/subjects/"
-    os.makedirs(output_dir, exist_ok=True)
-
-    for subject, group in grouped:
-        # Only valid grade results
-        valid = group[~group["Result"].isin(exclude_results)].copy()
-
-        if valid.empty:
-            continue
-
-        avg_gpa = valid["GradePoint"].mean()
-        fail_count = valid[valid["GradePoint"] == 0.0].shape[0]
-        total_students = valid.shape[0]
-        fail_rate = fail_count / total_students
-
-        # Grade distribution
-        grade_counts = valid["Result"].value_counts().sort_index()
-        grade_df = grade_counts.rename("Count").reset_index().rename(columns={"index": "Grade"})
-
-        # Summary info
+    # OriginalSubject keeps the original casing, Subject is normalized for grouping
+    df = normalize_rows(df)
+    return df[df["Credits"] > 0]
+
+def process_all_students(store=STORE_PATH):
+    df = sanitize_results(load_results(store))
+    # Keep the per-student column order of the old workbook-based loader
+    return df[[c for c in df.columns if c != "Index"] + ["Index"]]
+
+def subject_stats(grade_counts):
+    """
+    Per-subject average grade point, totals, failures and failure rate computed
+    from a (OriginalSubject, Result) -> count histogram of valid results.
+    """
+    grade_counts = grade_counts[grade_counts > 0]
+    subjects = grade_counts.index.get_level_values("OriginalSubject")
+    counts = pd.Series(grade_counts.to_numpy(), index=subjects)
+    points = pd.Series(grade_counts.index.get_level_values("Result").map(grade_points).to_numpy(), index=subjects)
+
+    # Results without a grade point count as students but not towards the average
+    graded = counts.where(points.notna(), 0)
+    stats = pd.DataFrame({
+        "Average GPA": ((counts * points).groupby(level=0).sum() / graded.groupby(level=0).sum()).round(3),
+        "Total Students": counts.groupby(level=0).sum(),
+        "Failures": counts.where(points == 0.0, 0).groupby(level=0).sum(),
+    })
+    stats.index.name = "OriginalSubject"
+    # Python's round keeps the exact rounding of the previous per-subject calculation
+    stats["Failure Rate (%)"] = [
+        round(failures / total * 100, 2) for failures, total in zip(stats["Failures"], stats["Total Students"])
+    ]
+    return stats
+
+def summarize_subjects(df_all):
+    """
+    One grouped pass over the valid (non-excluded) results.
+
+    Returns (valid, stats, grade_counts): the valid rows, a per-subject frame
+    with the average grade point, totals, failures and failure rate, and the
+    per-subject grade histogram. Both the per-subject workbooks and the
+    overall difficulty table are built from these.
+    """
+    valid = df_all[~df_all["Result"].isin(exclude_results)]
+    grade_counts = valid.groupby(["OriginalSubject", "Result"], observed=True).size()
+    return valid, subject_stats(grade_counts), grade_counts
+
+def write_subject_workbook(path, raw, summary, grade_df):
+    writer = pd.ExcelWriter(path, engine="xlsxwriter")
+    raw.to_excel(writer, index=False, sheet_name="RawData")
+    summary.to_excel(writer, index=False, sheet_name="Summary")
+    grade_df.to_excel(writer, index=False, sheet_name="GradeDistribution")
+    writer.close()
+    return path
+
+def subject_workbooks(valid, stats, grade_counts, output_dir):
+    """
+    Yield (path, raw, summary, grade_df) for every subject's workbook.
+    """
+    for subject, group in valid.groupby("OriginalSubject", observed=True):
+        row = stats.loc[subject]
         summary = pd.DataFrame({
             "Metric": ["Average Grade Point", "Total Students", "Failures", "Failure Rate"],
-            "Value": [round(avg_gpa, 3), total_students, fail_count, round(fail_rate * 100, 2)]
+            "Value": [row["Average GPA"], int(row["Total Students"]), int(row["Failures"]), row["Failure Rate (%)"]]
         })
-
-        # Save sheet
-        writer = pd.ExcelWriter(f"{output_dir}/{subject}.xlsx", engine="xlsxwriter")
-        valid[["Index", "Result", "GradePoint", "Credits"]].to_excel(writer, index=False, sheet_name="RawData")
-        summary.to_excel(writer, index=False, sheet_name="Summary")
-        grade_df.to_excel(writer, index=False, sheet_name="GradeDistribution")
-        writer.close()
-
-        print(f"✅ Saved analysis for subject: {subject}")
-
-def create_overall_summary(df_all):
-    output_dir = "data/summary/"
+        grade_df = grade_counts.loc[subject].rename("Count").reset_index()
+        raw = group[["Index", "Result", "GradePoint", "Credits"]]
+        yield os.path.join(output_dir, f"{subject}.xlsx"), raw, summary, grade_df
+
+def analyze_subjects(valid, stats, grade_counts, output_dir="data/summary/subjects/", workers=None):
+    """
+    Write one workbook per subject, spread across a process pool.
+    """
     os.makedirs(output_dir, exist_ok=True)
+    workbooks = list(subject_workbooks(valid, stats, grade_counts, output_dir))
+    if not workbooks:
+        return
 
-    grouped = df_all.groupby("OriginalSubject")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path in executor.map(write_subject_workbook, *zip(*workbooks)):
+            print(f"✅ Saved analysis for subject: {os.path.splitext(os.path.basename(path))[0]}")
 
-    summary_data = []
-
-    for subject, group in grouped:
-        valid = group[~group["Result"].isin(exclude_results)].copy()
-        if valid.empty:
-            continue
-
-        avg_gpa = valid["GradePoint"].mean()
-        fail_count = valid[valid["GradePoint"] == 0.0].shape[0]
-        total_students = valid.shape[0]
-        fail_rate = fail_count / total_students
-
-        summary_data.append({
-            "Subject": subject,
-            "Average GPA": round(avg_gpa, 3),
-            "Total Students": total_students,
-            "Failures": fail_count,
-            "Failure Rate (%)": round(fail_rate * 100, 2)
-        })
+def create_overall_summary(stats, output_dir="data/summary/"):
+    os.makedirs(output_dir, exist_ok=True)
 
-    summary_df = pd.DataFrame(summary_data)
+    summary_df = stats.rename_axis("Subject").reset_index()
 
     # Define a difficulty score — example: lower GPA + higher fail rate means harder
     # You can tweak this formula as needed
@@ -116,8 +106,27 @@ def create_overall_summary(df_all):
     print("✅ Saved overall subject summary with difficulty ranking.")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Analyse subject results and rank subjects by difficulty.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for writing workbooks (default: CPU count)")
+    add_timings_argument(parser, "analyse_subjects")
+    args = parser.parse_args()
+
+    timer = StageTimer("analyse_subjects")
+    with timer.stage("load"):
+        df_all = process_all_students()
+    with timer.stage("aggregate"):
+        valid, stats, grade_counts = summarize_subjects(df_all)
+    with timer.stage("subject workbooks"):
+        analyze_subjects(valid, stats, grade_counts, workers=args.workers)
+    with timer.stage("overall summary"):
+        create_overall_summary(stats)
+
+    print()
+    timer.print_summary()
+    if args.timings:
+        print(f"✅ Timing report saved to {timer.write(args.timings)}")
+
+
 if __name__ == "__main__":
-    folder = "data/results/"
-    df_all = process_all_students(folder)
-    analyze_subjects(df_all)
-    create_overall_summary(df_all)
+    main()
@@ -2,8 +2,13 @@ from fastapi import APIRouter
 
 router = APIRouter()
 
-from . import subjects, students, summery
+from . import subjects, students, summery, exports, metrics, watcher, simulator, search
 
 router.include_router(subjects.router, prefix="/subjects", tags=["Subjects"])
 router.include_router(students.router, prefix="/students", tags=["Students"])
 router.include_router(summery.router, prefix="/summary", tags=["Summary"])
+router.include_router(exports.router, prefix="/exports", tags=["Exports"])
+router.include_router(simulator.router, prefix="/simulate", tags=["Simulator"])
+router.include_router(search.router, tags=["Search"])
+router.include_router(metrics.router, tags=["Metrics"])
+router.include_router(watcher.router, tags=["Status"])
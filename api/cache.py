@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# How long a file signature is trusted before it is stat'ed again (seconds)
+CHECK_INTERVAL = 1.0
+# Decoded per-student frames kept in memory
+STUDENT_CACHE_SIZE = 1024
+
+
+def file_signature(paths):
+    """
+    (mtime, size) of every path; missing files are recorded as None so their
+    appearance or removal also invalidates the cache.
+    """
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class SnapshotCache:
+    """
+    In-memory cache of parsed DataFrames keyed by an arbitrary key and
+    invalidated when the mtime or size of the backing files changes.
+
+    File signatures are re-checked at most once per `check_interval`, so
+    repeated lookups within that window never touch the disk. With
+    `max_entries` set the cache evicts the least recently used entry.
+    A stale key is loaded by one request at a time; concurrent requests
+    for it wait for that load instead of each loading it again.
+    Cached frames are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, max_entries=None, check_interval=CHECK_INTERVAL):
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._signatures = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def _signature(self, paths):
+        now = time.monotonic()
+        checked = self._signatures.get(paths)
+        if checked and now - checked[0] < self.check_interval:
+            return checked[1]
+        signature = file_signature(paths)
+        self._signatures[paths] = (now, signature)
+        return signature
+
+    def get(self, key, paths, loader):
+        """
+        Return the cached value for `key`, calling `loader()` when it is missing
+        or any of `paths` changed since it was loaded.
+        """
+        paths = tuple(paths)
+        with self._lock:
+            signature = self._signature(paths)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            with self._lock:
+                # Another request may have loaded it while this one waited
+                signature = self._signature(paths)
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == signature:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                self.misses += 1
+            try:
+                value = loader()
+                with self._lock:
+                    self._entries[key] = (signature, value)
+                    self._entries.move_to_end(key)
+                    if self.max_entries is not None:
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+            finally:
+                with self._lock:
+                    if self._loading.get(key) is loading:
+                        del self._loading[key]
+        return value
+
+    def get_many(self, keys, paths, loader):
+        """
+        Like get() for several keys sharing the same backing files; `loader(missing_keys)`
+        is called once with every missing or stale key and returns a {key: value} dict.
+        """
+        paths = tuple(paths)
+        found = {}
+        missing = []
+        with self._lock:
+            signature = self._signature(paths)
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == signature:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+                else:
+                    self.misses += 1
+                    missing.append(key)
+
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                for key in missing:
+                    self._entries[key] = (signature, loaded[key])
+                    self._entries.move_to_end(key)
+                if self.max_entries is not None:
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            found.update(loaded)
+        return found
+
+    def lookup(self, key, paths):
+        """
+        (value, current) for `key` without loading anything: the cached value
+        (None when absent) and whether `paths` are unchanged since it was loaded.
+        Only a current value counts as a hit.
+        """
+        paths = tuple(paths)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            current = entry[0] == self._signature(paths)
+            if current:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+            return entry[1], current
+
+    def peek(self, key):
+        """
+        The cached value for `key` without checking the files or counting a hit (None when absent).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    def put_many(self, entries, publish=None):
+        """
+        Install several {key: (paths, value, signature)} entries at once, as if
+        they had just been loaded. A signature of None is taken from the files
+        now; pass the one recorded before loading when the files may have
+        changed while the value was built, or the one new files will have once
+        `publish()` has moved them into place.
+
+        Only the references are swapped under the lock; `publish()` (e.g.
+        moving the new files into place) runs right after. The files are not
+        stat'ed again for `check_interval`, so no lookup sees some of the new
+        values next to old ones in between.
+        """
+        now = time.monotonic()
+        entries = {key: (tuple(paths), value, file_signature(paths) if signature is None else signature)
+                   for key, (paths, value, signature) in entries.items()}
+        with self._lock:
+            for key, (paths, value, signature) in entries.items():
+                self._signatures[paths] = (now, signature)
+                self._entries[key] = (signature, value)
+                self._entries.move_to_end(key)
+        if publish is not None:
+            publish()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._signatures.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
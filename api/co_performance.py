@@ -0,0 +1,131 @@
+import numpy as np
+from storage.results_store import subject_code
+
+# Pairs of subjects taken together by fewer students are left out of the correlations
+MIN_PAIR_STUDENTS = 5
+OUTLIER_Z = 2.0
+
+
+class CoPerformance:
+    """
+    How students' grades in different subjects relate to each other.
+
+    Built once from the dense students × subjects grade point matrix of the
+    grade matrix (the counted attempt of every subject, NaN where a subject
+    was not taken):
+
+    - pairwise Pearson correlations over the students who took both subjects,
+      computed for all pairs at once from a few matrix products;
+    - prerequisite-style failure rates, P(fail B | fail A), among the students
+      who took both (a subject is failed when any attempt earned no points);
+    - the grade expected of each student in each subject, the subject average
+      plus the student's average distance from the other subjects' averages,
+      and the spread of the deviations from it per subject.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.cell_gp, _ = matrix.cell_grades()
+        self.subjects = np.array([subject_code(name) for name in matrix.subject_names], dtype=object)
+        self.names = matrix.subject_names
+
+        grades = matrix.dense(self.cell_gp)
+        taken = ~np.isnan(grades)
+        failed = matrix.dense(matrix.cell_failed(), fill=0.0)
+        self.pairs = self._pairs(grades, taken, failed)
+
+        # Student effect left out of each subject, so a grade is not compared with itself
+        counts = taken.sum(axis=0)
+        self.subject_mean = np.divide(np.nansum(grades, axis=0), counts, out=np.full(len(counts), np.nan),
+                                      where=counts > 0)
+        deviation = self._deviation(grades - self.subject_mean, taken.sum(axis=1, keepdims=True))
+        squared = np.nansum(deviation ** 2, axis=0)
+        self.deviation_sd = np.sqrt(np.divide(squared, counts, out=np.full(len(counts), np.nan), where=counts > 0))
+
+    @staticmethod
+    def _deviation(residuals, taken_count):
+        """
+        Grade minus expected grade, where the expected grade adds the student's
+        mean residual over their other subjects to the subject mean.
+        """
+        totals = np.nansum(residuals, axis=1, keepdims=True)
+        others = taken_count - 1
+        offset = np.divide(totals - residuals, others, out=np.zeros_like(residuals), where=others > 0)
+        return residuals - offset
+
+    def _pairs(self, grades, taken, failed):
+        x = np.nan_to_num(grades)
+        m = taken.astype(np.float64)
+        n = m.T @ m  # students who took both subjects
+        sum_a = x.T @ m  # [a, b]: sum of grades in a over the students who also took b
+        sum_sq_a = (x * x).T @ m
+        cross = x.T @ x
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = cross - sum_a * sum_a.T / n
+            var_a = sum_sq_a - sum_a ** 2 / n
+            correlation = cov / np.sqrt(var_a * var_a.T)
+            both_failed = failed.T @ failed
+            failed_a = failed.T @ m  # [a, b]: failed a among the students who also took b
+            fail_b_given_a = both_failed / failed_a
+            fail_rate = failed.sum(axis=0) / taken.sum(axis=0)
+
+        pairs = []
+        for a, b in zip(*np.triu_indices(len(self.subjects), k=1)):
+            if n[a, b] < MIN_PAIR_STUDENTS:
+                continue
+            pairs.append({
+                "subject_a": self.subjects[a],
+                "subject_b": self.subjects[b],
+                "students": int(n[a, b]),
+                "correlation": _number(correlation[a, b]),
+                "fail_rate_a": _number(fail_rate[a]),
+                "fail_rate_b": _number(fail_rate[b]),
+                "fail_b_given_fail_a": _number(fail_b_given_a[a, b]),
+                "fail_a_given_fail_b": _number(fail_b_given_a[b, a]),
+                "failed_both": int(both_failed[a, b]),
+            })
+        pairs.sort(key=lambda p: -abs(p["correlation"]) if p["correlation"] is not None else 0.0)
+        return pairs
+
+    def correlations(self, subject=None, min_students=MIN_PAIR_STUDENTS, limit=None):
+        """
+        Subject pairs by decreasing strength of correlation, optionally only the pairs involving `subject`.
+        """
+        pairs = [p for p in self.pairs if p["students"] >= min_students
+                 and (subject is None or subject in (p["subject_a"], p["subject_b"]))]
+        return pairs[:limit] if limit is not None else pairs
+
+    def student_deviations(self, index_number):
+        """
+        Every graded subject of a student with the expected grade, the deviation
+        from it and the deviation in units of the subject's spread (z).
+        Returns None for an unknown student.
+        """
+        position = self.matrix.index_numbers.searchsorted(str(index_number))
+        if position >= self.matrix.students or self.matrix.index_numbers[position] != str(index_number):
+            return None
+        cells = self.matrix.cell_range(position)
+        subjects = self.matrix.cell_subject[cells]
+        grades = self.cell_gp[cells]
+        taken = ~np.isnan(grades)
+        subjects, grades = subjects[taken], grades[taken]
+
+        residuals = (grades - self.subject_mean[subjects])[None, :]
+        deviation = self._deviation(residuals, np.array([[len(grades)]]))[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = deviation / self.deviation_sd[subjects]
+        return [
+            {
+                "subject": self.subjects[j],
+                "name": self.names[j],
+                "grade_point": float(g),
+                "expected": round(float(g - d), 3),
+                "deviation": round(float(d), 3),
+                "z": _number(score),
+            }
+            for j, g, d, score in zip(subjects, grades, deviation, z)
+        ]
+
+
+def _number(value, places=4):
+    return round(float(value), places) if np.isfinite(value) else None
@@ -0,0 +1,189 @@
+import argparse
+import uuid
+import numpy as np
+import pandas as pd
+from storage.ingest import grade_points, exclude_results
+from storage.results_store import iter_rows, subject_code, RESULT_COLUMNS, STORE_PATH
+
+MISSING = -1
+# Results get stable small codes; anything else found in the store is appended after these
+KNOWN_RESULTS = list(grade_points) + sorted(exclude_results - set(grade_points))
+MEMORY_SAMPLE = 1000
+
+
+def _intern(values, table, lookup, normalize=None):
+    """
+    Codes of `values` in `table`, appending values not seen before. Only the
+    distinct values of the batch are normalized and looked up one by one.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    mapping = np.empty(len(uniques), dtype=np.int32)
+    for i, value in enumerate(uniques):
+        if normalize is not None:
+            value = normalize(value)
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(table)
+            table.append(value)
+        mapping[i] = code
+    return mapping[codes]
+
+
+def _result_key(value):
+    return str(value).strip().upper()
+
+
+def _small_ints(values, dtype):
+    return pd.Series(values, dtype=object).fillna(MISSING).to_numpy(dtype=dtype)
+
+
+class CohortModel:
+    """
+    Every student's result rows in compact column arrays.
+
+    Subjects, semesters and results are stored once in small tables and each
+    row only keeps their integer codes (int16/int8); credits are int8 and
+    years int16. A student's rows are the range offsets[i]:offsets[i + 1] of
+    the row arrays, and students are found by binary search over the sorted
+    index numbers. Result codes map to grade points through `grade_point`.
+    `version` tells models loaded at different times (or in different processes) apart.
+    """
+
+    def __init__(self, index_numbers, offsets, subject, year, semester, credits, result,
+                 subjects, semesters, results):
+        self.index_numbers = index_numbers
+        self.offsets = offsets
+        self.subject = subject
+        self.year = year
+        self.semester = semester
+        self.credits = credits
+        self.result = result
+        self.subjects = np.array(subjects, dtype=object)
+        self.subject_codes = np.array([subject_code(s) for s in subjects], dtype=object)
+        self.semesters = np.array(semesters, dtype=object)
+        self.results = np.array(results, dtype=object)
+        self.grade_point = np.array([grade_points.get(r, np.nan) for r in results], dtype=np.float32)
+        self.version = uuid.uuid4().hex[:16]
+
+    @classmethod
+    def load(cls, path=STORE_PATH):
+        """
+        Build the model from the results store, one batch of rows at a time.
+        """
+        subjects, semesters, results = [], [], list(KNOWN_RESULTS)
+        lookups = ({}, {}, {r: i for i, r in enumerate(results)})
+        index_numbers, counts = [], []
+        columns = {name: [] for name in ("subject", "year", "semester", "credits", "result")}
+
+        for rows in iter_rows(path=path):
+            index, subject, year, semester, credits, result = (np.array(c, dtype=object) for c in zip(*rows))
+            # Rows arrive ordered by index number, so each student is one run
+            starts = np.concatenate([[0], np.flatnonzero(index[1:] != index[:-1]) + 1])
+            sizes = np.diff(np.append(starts, len(index)))
+            if index_numbers and index_numbers[-1] == index[0]:
+                counts[-1] += int(sizes[0])  # student continues from the previous batch
+                starts, sizes = starts[1:], sizes[1:]
+            index_numbers.extend(index[starts])
+            counts.extend(sizes.tolist())
+            columns["subject"].append(_intern(subject, subjects, lookups[0]).astype(np.int16))
+            columns["semester"].append(_intern(semester, semesters, lookups[1], str).astype(np.int8))
+            columns["result"].append(_intern(result, results, lookups[2], _result_key).astype(np.int8))
+            columns["year"].append(_small_ints(year, np.int16))
+            columns["credits"].append(_small_ints(credits, np.int8))
+
+        empty = {"subject": np.int16, "year": np.int16, "semester": np.int8, "credits": np.int8, "result": np.int8}
+        arrays = {name: np.concatenate(parts) if parts else np.empty(0, dtype=empty[name])
+                  for name, parts in columns.items()}
+        offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(np.array(index_numbers, dtype=str), offsets, subjects=subjects, semesters=semesters,
+                   results=results, **arrays)
+
+    def __len__(self):
+        return len(self.index_numbers)
+
+    def position(self, index_number):
+        """
+        Position of a student in the model, or None when they have no rows.
+        """
+        i = int(np.searchsorted(self.index_numbers, str(index_number)))
+        if i < len(self.index_numbers) and self.index_numbers[i] == str(index_number):
+            return i
+        return None
+
+    def rows(self, index_number):
+        """
+        Row range of a student (an empty range when they are not in the model).
+        """
+        i = self.position(index_number)
+        if i is None:
+            return slice(0, 0)
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def frame(self, rows):
+        """
+        Rows decoded into a DataFrame with the store's Subject, Year, Semester, Credits and Result columns.
+        """
+        year = self.year[rows].astype(np.int64)
+        credits = self.credits[rows].astype(np.int64)
+        df = pd.DataFrame({
+            "Subject": self.subjects[self.subject[rows]],
+            "Year": year,
+            "Semester": self.semesters[self.semester[rows]],
+            "Credits": credits,
+            "Result": self.results[self.result[rows]],
+        }, columns=RESULT_COLUMNS)
+        for column, values in (("Year", year), ("Credits", credits)):
+            if (values == MISSING).any():
+                df[column] = df[column].astype(object).where(values != MISSING, None)
+        return df
+
+    def student_frame(self, index_number):
+        return self.frame(self.rows(index_number))
+
+    def memory_report(self):
+        """
+        Bytes held by each array, compared with the same rows as object-dtype
+        frames of strings (estimated from a sample of students).
+        """
+        arrays = {
+            "index_numbers": self.index_numbers, "offsets": self.offsets, "subject": self.subject,
+            "year": self.year, "semester": self.semester, "credits": self.credits, "result": self.result,
+            "grade_point": self.grade_point,
+        }
+        sizes = {name: int(array.nbytes) for name, array in arrays.items()}
+        sizes["tables"] = int(sum(len(s) + 49 for s in self.subjects) + sum(len(s) + 49 for s in self.results)
+                              + sum(len(s) + 49 for s in self.semesters))
+        total = sum(sizes.values())
+
+        students = len(self)
+        sample = np.linspace(0, students - 1, min(students, MEMORY_SAMPLE)).astype(int) if students else []
+        sampled = sum(int(self.student_frame(self.index_numbers[i]).memory_usage(deep=True).sum()) for i in sample)
+        frames_estimate = int(sampled * students / len(sample)) if students else 0
+        return {
+            "students": students,
+            "rows": int(len(self.subject)),
+            "bytes": sizes,
+            "total_bytes": total,
+            "bytes_per_student": round(total / students, 1) if students else 0.0,
+            "object_frames_bytes_estimate": frames_estimate,
+            "compression_ratio": round(frames_estimate / total, 1) if total else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the memory footprint of the compact cohort model.")
+    parser.add_argument("--store", default=STORE_PATH, help="Results store to load")
+    args = parser.parse_args()
+
+    report = CohortModel.load(args.store).memory_report()
+    print(f"👥 {report['students']} students, {report['rows']} rows")
+    for name, size in report["bytes"].items():
+        print(f"   {name:<14} {size / 1024:10.1f} KiB")
+    print(f"   {'total':<14} {report['total_bytes'] / 1024:10.1f} KiB ({report['bytes_per_student']} bytes per student)")
+    print(f"   object-dtype frames would take ~{report['object_frames_bytes_estimate'] / 1024:.1f} KiB "
+          f"(x{report['compression_ratio']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import numpy as np
+from GPA_Calculator.gpa_caculator import SEMESTERS
+
+GPA_METRICS = ["FinalGPA"] + SEMESTERS
+
+# === Degree class lower bounds (best first) ===
+CLASS_BANDS = [
+    ("First Class", 3.70),
+    ("Second Class (Upper Division)", 3.30),
+    ("Second Class (Lower Division)", 3.00),
+    ("Pass", 2.00),
+]
+BELOW_PASS = "Below Pass"
+
+
+class GPADistribution:
+    """
+    Sorted copies of every GPA metric column, so rank, percentile, histogram
+    and band questions are answered by binary search (O(log n)) instead of
+    scanning or re-ranking the cohort on each request.
+    """
+
+    def __init__(self, values, metrics=GPA_METRICS):
+        self.metrics = [m for m in metrics if m in values]
+        self.sorted = {}
+        for metric in self.metrics:
+            column = np.asarray(values[metric], dtype=float)
+            self.sorted[metric] = np.sort(column[~np.isnan(column)])
+
+    def count(self, metric):
+        return len(self.sorted[metric])
+
+    def position(self, metric, value):
+        """
+        Rank (1 = highest, ties share the best rank like rank(method="min")) and
+        the percentage of students with this value or lower.
+        """
+        values = self.sorted[metric]
+        n = len(values)
+        at_or_below = int(np.searchsorted(values, value, side="right"))
+        return {
+            "value": float(value),
+            "rank": n - at_or_below + 1,
+            "percentile": round(100 * at_or_below / n, 2) if n else 0.0,
+            "students": n,
+        }
+
+    def histogram(self, metric, bins=10, low=0.0, high=4.0):
+        """
+        Counts of students in `bins` equal-width bins between `low` and `high`;
+        the last bin includes `high`. Values outside the range are not counted.
+        """
+        values = self.sorted[metric]
+        edges = np.linspace(low, high, bins + 1)
+        positions = np.searchsorted(values, edges, side="left")
+        positions[-1] = np.searchsorted(values, high, side="right")
+        counts = np.diff(positions)
+        return [
+            {"low": round(float(lo), 4), "high": round(float(hi), 4), "count": int(count)}
+            for lo, hi, count in zip(edges[:-1], edges[1:], counts)
+        ]
+
+    def class_bands(self, metric="FinalGPA", bands=CLASS_BANDS):
+        values = self.sorted[metric]
+        result = []
+        upper = len(values)
+        for name, lower_bound in bands:
+            start = int(np.searchsorted(values, lower_bound, side="left"))
+            result.append({"band": name, "min_gpa": lower_bound, "count": upper - start})
+            upper = start
+        result.append({"band": BELOW_PASS, "min_gpa": 0.0, "count": upper})
+        return result
@@ -0,0 +1,233 @@
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+import uuid
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import Optional
+import xlsxwriter
+from api.cache import file_signature
+from api.responses import dumps, not_modified
+from api.utils import store_files
+from GPA_Calculator.gpa_caculator import SEMESTER_RANGES
+from storage.results_store import batch_range, iter_rows
+
+router = APIRouter()
+
+EXPORT_DIR = "data/exports/"
+# Generated files kept on disk; the least recently written ones are removed first
+MAX_EXPORTS = 64
+# Bytes read at a time when a cached artifact is sent
+FILE_CHUNK_SIZE = 64 * 1024
+EXPORT_COLUMNS = ["Index", "Subject", "Year", "Semester", "Credits", "Result"]
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_key(fmt, subjects, index_from, index_to, semester):
+    """
+    Hash of the store contents' signature and the requested export. The same
+    request against unchanged data maps to the same key, so the key names the
+    cached artifact and doubles as its ETag.
+    """
+    request = [file_signature(store_files()), fmt, sorted(subjects or []), index_from, index_to, semester]
+    return hashlib.sha1(json.dumps(request, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(batches):
+    for rows in batches:
+        yield b"".join(dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+
+
+def _write_xlsx(batches, target):
+    # constant_memory flushes every finished row to disk, so memory stays flat however many rows there are
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True})
+    sheet = workbook.add_worksheet("Results")
+    sheet.write_row(0, 0, EXPORT_COLUMNS)
+    row_no = 1
+    for rows in batches:
+        for row in rows:
+            sheet.write_row(row_no, 0, row)
+            row_no += 1
+    workbook.close()
+
+
+def _prune_exports():
+    # Only finished artifacts; *.tmp files are exports still being written
+    files = [path for fmt in MEDIA_TYPES for path in glob.glob(os.path.join(EXPORT_DIR, f"*.{fmt}"))]
+    files.sort(key=_mtime)
+    for path in files[:-MAX_EXPORTS]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0.0  # pruned by a concurrent request
+
+
+def _open_cached(path):
+    """
+    The cached artifact at `path` opened for reading, or None when there is none
+    (or a concurrent prune just removed it). An open file can be sent to the end
+    even when _prune_exports deletes it meanwhile.
+    """
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+
+def _file_response(f, fmt, headers):
+    def chunks():
+        with f:
+            while chunk := f.read(FILE_CHUNK_SIZE):
+                yield chunk
+
+    headers = {**headers, "Content-Length": str(os.fstat(f.fileno()).st_size)}
+    return StreamingResponse(chunks(), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+def _cached_stream(chunks, path):
+    """
+    Yield `chunks` to the client while writing them to a temporary file that
+    becomes the cached artifact only once the whole export has been sent
+    (nothing is cached when `path` is None).
+    """
+    if path is None:
+        yield from chunks
+        return
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    complete = False
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        complete = True
+        os.replace(tmp_path, path)
+        _prune_exports()
+    finally:
+        if not complete and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def export_results(request: Request, fmt, subjects=None, index_from=None, index_to=None, semester=None,
+                   filename=None, not_found=None):
+    """
+    Export the results matching the filters as CSV, NDJSON or XLSX.
+
+    Rows are read from the store in batches: CSV and NDJSON are streamed to
+    the client as they are read and XLSX is written to disk row by row, so a
+    full cohort export never holds more than one batch in memory. The finished
+    file is cached under its export key and served directly next time.
+    With `not_found` set, an export without any rows is a 404 with that detail.
+    """
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {fmt}")
+    code_ranges = None
+    if semester is not None:
+        if semester not in SEMESTER_RANGES:
+            raise HTTPException(status_code=400, detail=f"Unknown semester: {semester}")
+        low, high = SEMESTER_RANGES[semester]
+        code_ranges = [(f"SCS{low}", f"SCS{high}")]
+
+    key = export_key(fmt, subjects, index_from, index_to, semester)
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="{filename or "results"}.{fmt}"',
+    }
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    path = os.path.join(EXPORT_DIR, f"{key}.{fmt}")
+    cached = _open_cached(path)
+    if cached is not None:
+        return _file_response(cached, fmt, headers)
+
+    try:
+        batches = iter_rows(subjects, index_from, index_to, code_ranges)
+        # Start the query now so a missing store is reported as 404 and not as a broken stream
+        first = next(batches, [])
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Results store not found")
+    if not first and not_found:
+        raise HTTPException(status_code=404, detail=not_found)
+
+    def all_batches():
+        if first:
+            yield first
+        yield from batches
+
+    if fmt == "xlsx":
+        if not first:
+            # Empty exports are not cached, so a cached artifact always has rows
+            buffer = io.BytesIO()
+            _write_xlsx([], buffer)
+            return Response(buffer.getvalue(), media_type=MEDIA_TYPES[fmt], headers=headers)
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            _write_xlsx(all_batches(), tmp_path)
+            # Opened before it is renamed into the cache, so no prune can take it away first
+            f = open(tmp_path, "rb")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        _prune_exports()
+        return _file_response(f, fmt, headers)
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    chunks = _csv_chunks(all_batches()) if fmt == "csv" else _ndjson_chunks(all_batches())
+    return StreamingResponse(_cached_stream(chunks, path if first else None), media_type=MEDIA_TYPES[fmt],
+                             headers=headers)
+
+
+def split_list(value):
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+
+@router.get("/results.{fmt}")
+def export_results_file(
+        request: Request,
+        fmt: str,
+        subjects: Optional[str] = Query(None, description="Comma-separated course codes or subject names"),
+        index_from: Optional[str] = Query(None, description="Lowest index number to include"),
+        index_to: Optional[str] = Query(None, description="Highest index number to include"),
+        semester: Optional[str] = Query(None, description="Only subjects of this semester, e.g. Y2S1"),
+        batch: Optional[str] = Query(None, pattern=r"^\d{4}$", description="Only this intake year, e.g. 2021")):
+    """
+    Export result rows as csv, ndjson or xlsx, e.g. /exports/results.csv?semester=Y1S1.
+    """
+    if batch is not None:
+        # A batch is a contiguous range of index numbers, narrowed further by index_from/index_to
+        low, high = batch_range(batch)
+        index_from = max(index_from or low, low)
+        index_to = min(index_to or high, high)
+    return export_results(request, fmt, split_list(subjects), index_from, index_to, semester)
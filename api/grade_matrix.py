@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from GPA_Calculator.gpa_caculator import REPEAT_CAP, SEMESTERS, assign_semesters, ordered_sums
+from storage.ingest import exclude_results, grade_points, normalize_subject_codes
+
+MC_RESULTS = {"MC", "CM"}
+# Quantiles of FinalGPA and TotalMC that sort_by_medicals uses for the strategic MC flag
+GPA_QUANTILE = 0.5
+MC_QUANTILE = 0.75
+ATTEMPTS = ("best", "latest")
+
+
+class GradeMatrix:
+    """
+    Every student's GPA-eligible attempts grouped by (student, subject) cell.
+
+    Built once from the cohort model: the attempts of a cell are contiguous
+    (oldest first) and cells are ordered by student, so a grading policy is
+    applied to the whole cohort with a few array operations
+    instead of sorting and grouping frames per request.
+    """
+
+    def __init__(self, cohort):
+        students = len(cohort)
+        row_student = np.repeat(np.arange(students, dtype=np.int32), np.diff(cohort.offsets))
+
+        # Subjects are normalized and mapped to semesters once per distinct name, as in sanitize_results
+        codes = normalize_subject_codes(pd.Series(cohort.subjects, dtype=object))
+        # Sorted, so the cells of a student are in the subject order compute_gpa_summary sums them in
+        subject_ids, subject_codes = pd.factorize(codes, sort=True)
+        self.subject_codes = np.asarray(subject_codes, dtype=object)
+        # Display name of every normalized subject: the first spelling found in the store
+        first = np.unique(subject_ids, return_index=True)[1]
+        self.subject_names = np.asarray(cohort.subjects, dtype=object)[first]
+        semester_of_code = assign_semesters(pd.Series(self.subject_codes, dtype=object))
+        self.subject_semester = np.array([SEMESTERS.index(s) if s in SEMESTERS else -1 for s in semester_of_code],
+                                         dtype=np.int8)
+        self.results = cohort.results
+        self.students = students
+        self.index_numbers = cohort.index_numbers
+
+        credited = cohort.credits > 0
+        is_mc = np.isin(cohort.results, list(MC_RESULTS))[cohort.result]
+        self.total_mc = np.bincount(row_student[credited & is_mc], weights=cohort.credits[credited & is_mc],
+                                    minlength=students)
+
+        valid = credited & ~np.isin(cohort.results, list(exclude_results))[cohort.result]
+        rows = np.flatnonzero(valid)
+        subject = subject_ids[cohort.subject[rows]].astype(np.int32)
+        cell_key = row_student[rows].astype(np.int64) * len(self.subject_codes) + subject
+        # Attempts of a cell ordered by academic year, then by their order on the results page
+        order = np.lexsort((rows, cohort.year[rows], cell_key))
+        rows, cell_key = rows[order], cell_key[order]
+
+        self.result = cohort.result[rows]
+        self.credits = cohort.credits[rows].astype(np.float64)
+        self.starts = np.flatnonzero(np.r_[True, cell_key[1:] != cell_key[:-1]]) if len(rows) else np.empty(0, int)
+        self.ends = np.r_[self.starts[1:], len(rows)].astype(np.int64)
+        self.cell_student = cell_key[self.starts] // len(self.subject_codes)
+        self.cell_subject = (cell_key[self.starts] % len(self.subject_codes)).astype(np.int32)
+        self.cell_repeat = (self.ends - self.starts) > 1
+        semester = self.subject_semester[self.cell_subject]
+        self.cell_known = semester >= 0
+        self.cell_semester_group = self.cell_student[self.cell_known] * len(SEMESTERS) + semester[self.cell_known]
+        # Cells of every (student, semester) and every student as contiguous ranges, still in subject order
+        self.semester_order = np.argsort(self.cell_semester_group, kind="stable")
+        self.semester_bounds = np.searchsorted(self.cell_semester_group[self.semester_order],
+                                               np.arange(students * len(SEMESTERS) + 1))
+        self.student_bounds = np.searchsorted(self.cell_student, np.arange(students + 1))
+        # Most cells have a single attempt; picking the attempt only needs to look at the repeated ones
+        sizes = (self.ends - self.starts)[self.cell_repeat]
+        self.repeat_attempts = np.repeat(self.starts[self.cell_repeat], sizes) + (
+            np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes))
+        self.repeat_starts = np.r_[0, np.cumsum(sizes)[:-1]].astype(np.int64)
+        self.repeat_cell = np.repeat(np.arange(len(sizes)), sizes)
+        self.baseline = self.simulate()
+
+    def grade_table(self, points=None):
+        """
+        Grade point of every result code; results missing from `points` get NaN
+        (their credits still count, without points, like in compute_gpa_summary).
+        """
+        points = grade_points if points is None else points
+        return np.array([points.get(r, np.nan) for r in self.results], dtype=np.float64)
+
+    def cell_grades(self, points=None, attempt="best"):
+        """
+        (grade point, credits) of the attempt that counts in every cell.
+        """
+        table = self.grade_table(points)
+        chosen = self.starts.copy()
+        if attempt == "latest":
+            chosen[self.cell_repeat] = self.ends[self.cell_repeat] - 1
+        elif len(self.repeat_attempts):
+            # fmax skips NaN, so a cell is NaN only when none of its attempts has grade points
+            repeated = table[self.result[self.repeat_attempts]]
+            best = np.fmax.reduceat(repeated, self.repeat_starts)
+            hit = np.where(repeated == best[self.repeat_cell], np.arange(len(repeated)), len(repeated))
+            first = np.minimum.reduceat(hit, self.repeat_starts)
+            first = np.where(first == len(repeated), self.repeat_starts, first)
+            chosen[self.cell_repeat] = self.repeat_attempts[first]
+        return table[self.result[chosen]], self.credits[chosen]
+
+    def cell_range(self, position):
+        """
+        Cells of the student at `position` in the cohort model (cells are ordered by student).
+        """
+        return slice(*np.searchsorted(self.cell_student, [position, position + 1]))
+
+    def dense(self, values, fill=np.nan):
+        """
+        A students × subjects matrix with one value per cell, `fill` where a student has no grade.
+        """
+        matrix = np.full((self.students, len(self.subject_codes)), fill, dtype=np.float64)
+        matrix[self.cell_student, self.cell_subject] = values
+        return matrix
+
+    def cell_failed(self, points=None):
+        """
+        Whether any attempt of every cell earned no grade points.
+        """
+        table = self.grade_table(points)
+        if not len(self.result):
+            return np.zeros(0, dtype=bool)
+        return np.fmin.reduceat(table[self.result], self.starts) == 0
+
+    def _gpa(self, bounds, gp, credits):
+        points = gp * credits
+        points[np.isnan(points)] = 0.0
+        weighted = ordered_sums(points, bounds[:-1], bounds[1:])
+        total = ordered_sums(credits, bounds[:-1], bounds[1:])
+        return np.round(np.divide(weighted, total, out=np.zeros(len(total)), where=total > 0), 4)
+
+    def simulate(self, points=None, repeat_cap=REPEAT_CAP, attempt="best",
+                 gpa_quantile=GPA_QUANTILE, mc_quantile=MC_QUANTILE):
+        """
+        Semester and final GPAs, ranks and strategic MC flags of the whole
+        cohort under a grading policy. The defaults reproduce GPA_Summary.xlsx
+        and GPA_Summary_By_Medicals.xlsx. Returns a dict of per-student arrays
+        (in index number order) and the MC thresholds used.
+        """
+        gp, credits = self.cell_grades(points, attempt)
+
+        known = self.cell_known
+        order = self.semester_order
+        semesters = self._gpa(self.semester_bounds, gp[known][order], credits[known][order])
+        semesters = semesters.reshape(self.students, len(SEMESTERS))
+
+        if repeat_cap is not None:
+            gp = np.where(self.cell_repeat & (gp > repeat_cap), repeat_cap, gp)
+        final = self._gpa(self.student_bounds, gp, credits)
+
+        ranked = np.sort(final)
+        rank = len(final) - np.searchsorted(ranked, final, side="right") + 1
+
+        gpa_threshold = float(np.quantile(final, gpa_quantile)) if self.students else 0.0
+        mc_threshold = float(np.quantile(self.total_mc, mc_quantile)) if self.students else 0.0
+        return {
+            "semesters": semesters,
+            "FinalGPA": final,
+            "Rank": rank,
+            "StrategicUseOfMC": (final > gpa_threshold) & (self.total_mc >= mc_threshold),
+            "thresholds": {"FinalGPA": gpa_threshold, "TotalMC": mc_threshold},
+        }
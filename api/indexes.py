@@ -0,0 +1,172 @@
+import threading
+import time
+
+import numpy as np
+
+from api.distribution import GPADistribution
+from api.responses import PreparedJSON
+from storage.results_store import subject_code
+
+
+def normalize_index(value):
+    return str(value).strip()
+
+
+def normalize_subject(value):
+    return str(value).strip().upper()
+
+
+class SummaryTable:
+    """
+    A loaded summary frame together with a key index over its rows and
+    precomputed ascending and descending sort orders for every column
+    (both stable, missing values last), plus the sorted values of every
+    numeric column for range filters.
+
+    Rows are kept as the frame's column arrays and only turned into record
+    dicts for the rows a response needs. Keys map to row positions in a
+    hash index (an O(1) lookup per student) and the sort orders, used for
+    paging only, are int32 row positions, so a table of 100k+ students
+    stays a few megabytes.
+
+    The frame and its indexes are built together and cached as one object,
+    so a reload swaps both at once and a request never sees an index built
+    from a different version of the data than the frame it points into.
+    `version` identifies the snapshot the table was loaded from.
+    """
+
+    def __init__(self, frame, key_column=None, normalize=normalize_index, aliases=None, version=None):
+        self.frame = frame.reset_index(drop=True)
+        self.version = version
+        self.loaded_at = time.time()
+        self.normalize = normalize
+        self._prepared = {}
+        self._prepared_lock = threading.Lock()
+        self.columns = list(frame.columns)
+        self.values = {column: self.frame[column].to_numpy() for column in self.columns}
+
+        self.positions = np.arange(len(self.frame), dtype=np.int32)
+        # Stable orders of row positions per column (missing values last in both directions)
+        self.orders = {column: self._order(column, True) for column in self.columns}
+        self.descending_orders = {column: self._order(column, False) for column in self.columns}
+        # Numeric values in each order, searched by bisection; descending ones are negated so they ascend too
+        self.sorted_values = {}
+        self.valid_counts = {}
+        for column in self.columns:
+            if self.values[column].dtype.kind in "biuf":
+                values = self.values[column].astype(np.float64)
+                self.sorted_values[column] = (values[self.orders[column]], -values[self.descending_orders[column]])
+                self.valid_counts[column] = int(np.count_nonzero(~np.isnan(values)))
+
+        self.by_key = {}
+        if key_column is not None:
+            for position, value in enumerate(self.frame[key_column]):
+                for key in {normalize(value), normalize(aliases(value))} if aliases else {normalize(value)}:
+                    self.by_key.setdefault(key, []).append(position)
+
+    def __getstate__(self):
+        # Tables are built in the data watcher's worker process and sent back pickled
+        state = self.__dict__.copy()
+        state["_prepared"] = {}
+        del state["_prepared_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._prepared_lock = threading.Lock()
+
+    def _order(self, column, ascending):
+        frame = self.frame.sort_values(column, ascending=ascending, kind="mergesort", na_position="last")
+        return frame.index.to_numpy(np.int32)
+
+    @property
+    def records(self):
+        """
+        Every row as a record dict (built on each call; use for one-off full listings).
+        """
+        return self.records_at(np.arange(len(self.frame)))
+
+    def records_at(self, positions, fields=None):
+        # Straight from the column arrays: tolist() gives the same Python values as to_dict(orient="records")
+        columns = fields or self.columns
+        values = [self.values[column][positions].tolist() for column in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
+
+    def lookup(self, key):
+        """
+        Records whose key matches `key` after normalization (empty list when none do).
+        """
+        return self.records_at(self.by_key.get(self.normalize(key), []))
+
+    def prepared(self, name, build):
+        """
+        Serialized (and lazily compressed) response `name`, built once per snapshot by `build()`.
+        """
+        with self._prepared_lock:
+            prepared = self._prepared.get(name)
+            if prepared is None:
+                prepared = PreparedJSON(build(), f"{self.version}-{name}")
+                self._prepared[name] = prepared
+            return prepared
+
+    def query(self, sort=None, descending=False, filters=(), offset=0, limit=None, fields=None):
+        """
+        A page of records plus the total number of matches.
+
+        `filters` is a list of (column, low, high) inclusive ranges, with None
+        for an open end. A range on the sort column is resolved by binary
+        search over its sorted values, so an unfiltered or sort-column-filtered
+        page costs O(log n + limit) regardless of the size of the table.
+        """
+        if sort is None:
+            candidates = self.positions
+        else:
+            candidates = self.descending_orders[sort] if descending else self.orders[sort]
+
+        remaining = []
+        if sort in self.sorted_values:
+            keys = self.sorted_values[sort][1 if descending else 0]
+            stop_all = self.valid_counts[sort]  # rows with a missing value never match a range
+        for column, low, high in filters:
+            if column == sort and sort in self.sorted_values:
+                if descending:
+                    low, high = (-high if high is not None else None), (-low if low is not None else None)
+                start = np.searchsorted(keys, low, side="left") if low is not None else 0
+                stop = np.searchsorted(keys, high, side="right") if high is not None else stop_all
+                stop = min(stop, stop_all)
+                candidates, keys, stop_all = candidates[start:stop], keys[start:stop], max(stop - start, 0)
+            else:
+                remaining.append((column, low, high))
+
+        if remaining:
+            mask = np.ones(len(candidates), dtype=bool)
+            for column, low, high in remaining:
+                values = self.values[column][candidates]
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            candidates = candidates[mask]
+
+        total = len(candidates)
+        page = candidates[offset:offset + limit if limit is not None else None]
+        return self.records_at(page, fields), total
+
+
+class GPATable(SummaryTable):
+    """
+    The GPA summary with its metric distributions, built from the same snapshot.
+    """
+
+    def __init__(self, frame, version=None):
+        super().__init__(frame, "Index", normalize_index, version=version)
+        self.distribution = GPADistribution(self.values)
+
+
+def gpa_table(frame, version=None):
+    return GPATable(frame, version=version)
+
+
+def subject_difficulty_table(frame, version=None):
+    # Subjects can be looked up by their full name or just the course code
+    return SummaryTable(frame, "Subject", normalize_subject, aliases=subject_code, version=version)
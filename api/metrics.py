@@ -0,0 +1,187 @@
+import bisect
+import threading
+import time
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from api.profiler import PROFILE_HEADER, PROFILING_ENABLED, SamplingProfiler
+from api.utils import cache_stats
+from timings import load_reports
+
+router = APIRouter()
+
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+SIZE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216]
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus layout, one series per label set.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.series[labels] = (counts, total + value)
+
+    def render(self, name, help_text):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            base = format_labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ["+Inf"], counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{base} {total:.6f}")
+            lines.append(f"{name}_count{base} {cumulative}")
+        return lines
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.requests = {}
+        self.in_flight = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, method, route, status, seconds, size):
+        with self._lock:
+            self.in_flight -= 1
+            labels = (("method", method), ("route", route))
+            self.latency.observe(labels, seconds)
+            self.size.observe(labels, size)
+            key = labels + (("status", str(status)),)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def render(self):
+        with self._lock:
+            lines = self.latency.render("http_request_duration_seconds", "Request latency by route")
+            lines += self.size.render("http_response_size_bytes", "Response body size by route")
+            lines += ["# HELP http_requests_total Requests by route and status", "# TYPE http_requests_total counter"]
+            lines += [f"http_requests_total{format_labels(key)} {count}" for key, count in sorted(self.requests.items())]
+            lines += [
+                "# HELP http_requests_in_flight Requests currently being served",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP process_uptime_seconds Seconds since the API process started",
+                "# TYPE process_uptime_seconds gauge",
+                f"process_uptime_seconds {time.time() - self.started:.3f}",
+            ]
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+
+def route_label(scope):
+    """
+    The route template of a request, e.g. /api/students/{index_number}, so
+    every student shares one series. Unmatched paths are grouped together.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    # Routes of included routers may only know their template below the router's prefix;
+    # the prefixes here are literal, so they are taken from the request path
+    segments = scope["path"].split("/")
+    prefix = segments[:max(len(segments) - template.count("/"), 0)]
+    return "/".join(prefix) + template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, response size and status of every
+    HTTP request. Streamed bodies are counted as they are sent.
+
+    With PROFILE_REQUESTS=1 in the environment, a request carrying an
+    X-Profile header is run under the sampling profiler and the report
+    path is returned in the X-Profile-Report response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"status": 500, "size": 0}
+        profiler = None
+        if PROFILING_ENABLED and any(key == PROFILE_HEADER for key, _ in scope["headers"]):
+            profiler = SamplingProfiler()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                if profiler is not None:
+                    message.setdefault("headers", []).append((b"x-profile-report", profiler.path(scope).encode()))
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        request_metrics.begin()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler is not None:
+                profiler.stop(scope)
+            request_metrics.end(scope["method"], route_label(scope), state["status"],
+                                time.perf_counter() - start, state["size"])
+
+
+def pipeline_lines():
+    """
+    Stage timings of the last run of every batch command that wrote a timing report.
+    """
+    lines = [
+        "# HELP pipeline_stage_seconds Time spent per stage in the last run of a batch command",
+        "# TYPE pipeline_stage_seconds gauge",
+    ]
+    totals = []
+    for report in load_reports():
+        for stage, timing in report.get("stages", {}).items():
+            labels = (("command", report["command"]), ("stage", stage))
+            lines.append(f"pipeline_stage_seconds{format_labels(labels)} {timing['seconds']}")
+        totals.append(f"pipeline_run_seconds{format_labels((('command', report['command']),))} {report['total_seconds']}")
+    lines += ["# HELP pipeline_run_seconds Total time of the last run of a batch command",
+              "# TYPE pipeline_run_seconds gauge"] + totals
+    return lines
+
+
+def cache_lines():
+    lines = []
+    for metric, kind in (("hits", "counter"), ("misses", "counter"), ("entries", "gauge")):
+        name = f"cache_{metric}_total" if kind == "counter" else f"cache_{metric}"
+        lines += [f"# HELP {name} Snapshot cache {metric}", f"# TYPE {name} {kind}"]
+        lines += [f"{name}{format_labels((('cache', cache),))} {stats[metric]}" for cache, stats in cache_stats().items()]
+    return lines
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Request, cache and batch pipeline metrics in the Prometheus text format.
+    """
+    lines = request_metrics.render() + cache_lines() + pipeline_lines()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
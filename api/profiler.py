@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+# Opt-in: set PROFILE_REQUESTS=1 and send an X-Profile header with the slow request
+PROFILING_ENABLED = os.environ.get("PROFILE_REQUESTS") == "1"
+PROFILE_HEADER = b"x-profile"
+PROFILE_DIR = "data/profiles/"
+SAMPLE_INTERVAL = 0.002
+
+# Threads whose innermost frame is in one of these modules are waiting, not working
+IDLE_MODULES = {"threading.py", "selectors.py", "queue.py", "base_events.py"}
+
+
+def frame_stack(frame):
+    stack = []
+    while frame is not None:
+        stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return stack[::-1]
+
+
+class SamplingProfiler:
+    """
+    Samples the call stack of every busy thread each `interval` seconds while
+    a request is served, including the worker threads sync endpoints run in.
+    The report is written in the folded-stack format ("a;b;c count" per line)
+    that flame graph tools read.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self.name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+                    continue
+                self.samples[";".join(frame_stack(frame))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def path(self, scope):
+        route = scope["path"].strip("/").replace("/", "_") or "root"
+        return os.path.join(PROFILE_DIR, f"{self.name}-{route}.folded")
+
+    def stop(self, scope):
+        self._stopped.set()
+        self._thread.join()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(self.path(scope), "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
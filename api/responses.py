@@ -0,0 +1,84 @@
+import gzip
+import json
+import threading
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+def dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class PreparedJSON:
+    """
+    A JSON body serialized once, with its compressed variants built on first
+    use and kept alongside it. The strong ETag is derived from the snapshot
+    version, so it changes exactly when the underlying data does.
+    """
+
+    def __init__(self, obj, version):
+        self.body = dumps(obj)
+        self.etag = f'"{version}"'
+        self._encoded = {"identity": self.body}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        with self._lock:
+            if encoding not in self._encoded:
+                if encoding == "br":
+                    self._encoded[encoding] = brotli.compress(self.body, quality=5)
+                else:
+                    self._encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+            return self._encoded[encoding]
+
+    def etag_for(self, encoding):
+        # Each content-coding is a different representation and gets its own strong ETag
+        return self.etag if encoding == "identity" else f'{self.etag[:-1]}-{encoding}"'
+
+
+def choose_encoding(request: Request, size):
+    if size < MIN_COMPRESS_SIZE:
+        return "identity"
+    accepted = {part.split(";")[0].strip().lower() for part in request.headers.get("accept-encoding", "").split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def not_modified(request: Request, etag):
+    # If-None-Match uses the weak comparison, so W/"..." matches as well
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def prepared_response(request: Request, prepared: PreparedJSON):
+    """
+    Serve a PreparedJSON body, answering 304 when the client already has this version.
+    """
+    encoding = choose_encoding(request, len(prepared.body))
+    etag = prepared.etag_for(encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(prepared.encoded(encoding), media_type="application/json", headers=headers)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Literal, Optional
+from api.utils import load_search_index
+
+router = APIRouter()
+
+MAX_RESULTS = 50
+
+
+@router.get("/search")
+def search(
+        q: str = Query(..., description="Start of an index number, subject code or subject name words"),
+        limit: int = Query(10, ge=1, le=MAX_RESULTS, description="Maximum number of matches"),
+        type: Optional[Literal["student", "subject"]] = Query(None, description="Only search students or subjects")):
+    """
+    Autocomplete students and subjects from what has been typed so far.
+    """
+    try:
+        index = load_search_index()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Results store not found")
+    matches, total = index.search(q, limit, type)
+    return {"query": q, "matches": matches, "total": total}
@@ -0,0 +1,90 @@
+import re
+import numpy as np
+from storage.results_store import subject_code
+
+# Ranking of the ways a query can match; lower is better
+EXACT, CODE_PREFIX, NAME_PREFIX, INDEX_PREFIX = range(4)
+
+
+def _tokens(text):
+    return re.findall(r"[a-z0-9]+", str(text).lower())
+
+
+def _prefix_range(keys, prefix):
+    """
+    Positions [lo, hi) of the keys starting with `prefix` in a sorted string array.
+    """
+    lo = np.searchsorted(keys, prefix, side="left")
+    hi = np.searchsorted(keys, prefix + "\uffff", side="left")
+    return int(lo), int(hi)
+
+
+class SearchIndex:
+    """
+    Prefix search over index numbers, subject codes and the words of subject names.
+
+    Every key lives in a sorted array, so the candidates for a typed prefix are
+    one contiguous range found by binary search. Index numbers come straight
+    from the cohort model (already sorted); subject codes and name words map
+    back to the subjects they belong to.
+    """
+
+    def __init__(self, cohort):
+        self.index_numbers = cohort.index_numbers
+        names = sorted(set(cohort.subjects))
+        self.subjects = [{"code": subject_code(name), "name": name} for name in names]
+
+        codes = [s["code"].lower() for s in self.subjects]
+        order = np.argsort(codes, kind="stable")
+        self.codes = np.array(codes, dtype=str)[order]
+        self.code_subjects = order
+
+        words = sorted({(word, i) for i, s in enumerate(self.subjects) for word in _tokens(s["name"])})
+        self.words = np.array([w for w, _ in words], dtype=str)
+        self.word_subjects = np.array([i for _, i in words], dtype=np.int32)
+
+    def search_students(self, query, limit):
+        prefix = re.sub(r"\s+", "", query)
+        if not prefix.isdigit():
+            return [], 0
+        lo, hi = _prefix_range(self.index_numbers, prefix)
+        matches = [{"type": "student", "value": str(self.index_numbers[i]), "label": str(self.index_numbers[i]),
+                    "rank": EXACT if self.index_numbers[i] == prefix else INDEX_PREFIX}
+                   for i in range(lo, min(hi, lo + limit))]
+        return matches, hi - lo
+
+    def search_subjects(self, query, limit):
+        ranks = {}
+        code = re.sub(r"\s+", "", query).lower()
+        lo, hi = _prefix_range(self.codes, code)
+        for i in range(lo, hi):
+            ranks[int(self.code_subjects[i])] = EXACT if self.codes[i] == code else CODE_PREFIX
+
+        # Every word of the query must start a word of the name, in any order
+        matched = None
+        for token in _tokens(query):
+            lo, hi = _prefix_range(self.words, token)
+            found = set(self.word_subjects[lo:hi].tolist())
+            matched = found if matched is None else matched & found
+            if not matched:
+                break
+        for i in matched or ():
+            ranks.setdefault(i, NAME_PREFIX)
+
+        ordered = sorted(ranks, key=lambda i: (ranks[i], self.subjects[i]["code"]))
+        matches = [{"type": "subject", "value": self.subjects[i]["code"], "label": self.subjects[i]["name"],
+                    "rank": ranks[i]} for i in ordered[:limit]]
+        return matches, len(ranks)
+
+    def search(self, query, limit=10, kind=None):
+        """
+        Ranked matches for a typed prefix: exact matches first, then subject
+        codes, subject name words and index numbers. Returns (matches, total).
+        """
+        query = query.strip().lower()
+        if not query:
+            return [], 0
+        students, student_total = self.search_students(query, limit) if kind in (None, "student") else ([], 0)
+        subjects, subject_total = self.search_subjects(query, limit) if kind in (None, "subject") else ([], 0)
+        matches = sorted(subjects + students, key=lambda m: m["rank"])[:limit]
+        return matches, student_total + subject_total
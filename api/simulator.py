@@ -0,0 +1,97 @@
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Annotated, Dict, Literal, Optional
+from api.distribution import GPADistribution
+from api.grade_matrix import GPA_QUANTILE, MC_QUANTILE
+from api.utils import load_grade_matrix
+from GPA_Calculator.gpa_caculator import REPEAT_CAP, SEMESTERS
+from storage.ingest import grade_points
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 1000
+# NaN and infinity would reach the JSON response; reject them with a 422 instead
+GradePoint = Annotated[float, Field(allow_inf_nan=False)]
+
+
+class GradingPolicy(BaseModel):
+    grade_points: Optional[Dict[str, GradePoint]] = Field(
+        None, description="Grade point of every grade, e.g. {\"A+\": 4.0, ...} (default: the current table)")
+    repeat_cap: Optional[float] = Field(REPEAT_CAP, ge=0, allow_inf_nan=False,
+                                        description="Grade point cap of repeated subjects (null: no cap)")
+    attempt: Literal["best", "latest"] = Field("best", description="Which attempt of a repeated subject counts")
+    gpa_quantile: float = Field(GPA_QUANTILE, ge=0, le=1, description="FinalGPA quantile a strategic MC user is above")
+    mc_quantile: float = Field(MC_QUANTILE, ge=0, le=1, description="TotalMC quantile a strategic MC user is at or above")
+
+
+def policy_grade_points(policy):
+    if policy.grade_points is None:
+        return grade_points
+    points = {grade.strip().upper(): value for grade, value in policy.grade_points.items()}
+    if any(value < 0 for value in points.values()):
+        raise HTTPException(status_code=400, detail="Grade points must not be negative")
+    return points
+
+
+@router.post("/gpa")
+def simulate_gpa(
+        policy: GradingPolicy,
+        limit: int = Query(50, ge=0, le=MAX_PAGE_SIZE, description="Number of students to return"),
+        offset: int = Query(0, ge=0, description="Number of students to skip"),
+        changed_only: bool = Query(False, description="Only list students whose rank or MC flag changed")):
+    """
+    Recompute every student's GPAs, rank and strategic MC flag under an alternative grading policy.
+
+    Returns cohort-level changes against the current rules and a page of students ordered by their new rank.
+    """
+    try:
+        matrix = load_grade_matrix()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Results store not found")
+
+    points = policy_grade_points(policy)
+    result = matrix.simulate(points, policy.repeat_cap, policy.attempt, policy.gpa_quantile, policy.mc_quantile)
+    baseline = matrix.baseline
+
+    final, rank, strategic = result["FinalGPA"], result["Rank"], result["StrategicUseOfMC"]
+    rank_change = baseline["Rank"] - rank
+    flag_changed = strategic != baseline["StrategicUseOfMC"]
+
+    order = np.lexsort((matrix.index_numbers, rank))
+    if changed_only:
+        order = order[((rank_change != 0) | flag_changed)[order]]
+    page = order[offset:offset + limit]
+    summary = [
+        {
+            "Index": matrix.index_numbers[i],
+            **{semester: float(result["semesters"][i, j]) for j, semester in enumerate(SEMESTERS)},
+            "FinalGPA": float(final[i]),
+            "Rank": int(rank[i]),
+            "TotalMC": float(matrix.total_mc[i]),
+            "StrategicUseOfMC": bool(strategic[i]),
+            "CurrentFinalGPA": float(baseline["FinalGPA"][i]),
+            "CurrentRank": int(baseline["Rank"][i]),
+            "RankChange": int(rank_change[i]),
+        }
+        for i in page
+    ]
+
+    return {
+        "policy": {**policy.model_dump(), "grade_points": points},
+        "students": matrix.students,
+        "thresholds": result["thresholds"],
+        "mean_gpa": round(float(final.mean()), 4) if matrix.students else 0.0,
+        "current_mean_gpa": round(float(baseline["FinalGPA"].mean()), 4) if matrix.students else 0.0,
+        "changed": {
+            "final_gpa": int((final != baseline["FinalGPA"]).sum()),
+            "rank": int((rank_change != 0).sum()),
+            "strategic_mc": int(flag_changed.sum()),
+        },
+        "strategic_mc": int(strategic.sum()),
+        "class_bands": GPADistribution({"FinalGPA": final}).class_bands(),
+        "summary": summary,
+        "total": len(order),
+        "offset": offset,
+        "limit": limit,
+    }
@@ -1,12 +1,51 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from typing import List
-import pandas as pd
-from api.utils import load_student_results
-import os
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from api.exports import export_results
+from api.indexes import normalize_index, normalize_subject
+from api.utils import load_student_results, load_students_results, load_gpa_table
+from storage.results_store import subject_code
 
 router = APIRouter()
-STUDENT_RESULTS_DIR = "data/results/"
+
+MAX_BATCH_SIZE = 1000
+
+
+class StudentBatchRequest(BaseModel):
+    index_numbers: List[str] = Field(..., description="Index numbers to fetch")
+    subjects: Optional[List[str]] = Field(None, description="Only include these subjects (course code or full name)")
+
+
+@router.post("/batch")
+def get_students_batch(request: StudentBatchRequest):
+    """
+    Fetch results and GPA summaries of many students in one call.
+    """
+    index_numbers = [normalize_index(i) for i in request.index_numbers]
+    if len(index_numbers) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} students per batch")
+
+    frames = load_students_results(index_numbers)
+    gpa_table = load_gpa_table()
+    wanted = {normalize_subject(s) for s in request.subjects or []} | {subject_code(s) for s in request.subjects or []}
+
+    students = []
+    not_found = []
+    for index_number in dict.fromkeys(index_numbers):
+        df = frames[index_number]
+        if df.empty:
+            not_found.append(index_number)
+            continue
+        if wanted:
+            subjects = df["Subject"].astype(str)
+            df = df[subjects.str.strip().str.upper().isin(wanted) | subjects.map(subject_code).isin(wanted)]
+        students.append({
+            "index_number": index_number,
+            "results": df.to_dict(orient="records"),
+            "gpa_summary": gpa_table.lookup(index_number),
+        })
+    return {"students": students, "not_found": not_found}
+
 
 @router.get("/{index_number}")
 def get_student_results(index_number: str):
@@ -22,18 +61,16 @@ def get_student_results(index_number: str):
         raise HTTPException(status_code=404, detail="Student results not found")
 
 @router.get("/{index_number}/download")
-def download_student_results(index_number: str):
+def download_student_results(request: Request, index_number: str):
     """
-    Download the student's Excel file.
+    Download the student's results as an Excel file generated from the results store.
     """
-    filepath = os.path.join(STUDENT_RESULTS_DIR, f"{index_number}.xlsx")
-    if not os.path.exists(filepath):
+    try:
+        load_student_results(index_number)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Student results not found")
-    return FileResponse(
-        filepath,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        filename=f"{index_number}.xlsx",
-    )
+    index_number = normalize_index(index_number)
+    return export_results(request, "xlsx", index_from=index_number, index_to=index_number, filename=index_number)
 
 
 # No need since the table
@@ -44,10 +81,10 @@ def get_student_subject_result(index_number: str, subject_code: str):
     """
     try:
         df = load_student_results(index_number)
-        # Normalize subject codes for comparison (you can reuse your normalize function)
+        # Normalize subject codes for comparison (the cached frame itself must not be modified)
         subject_code = subject_code.strip().upper()
-        df["NormalizedSubject"] = df["Subject"].astype(str).str.strip().str.upper()
-        filtered = df[df["NormalizedSubject"] == subject_code]
+        normalized = df["Subject"].astype(str).str.strip().str.upper()
+        filtered = df.assign(NormalizedSubject=normalized)[normalized == subject_code]
 
         if filtered.empty:
             raise HTTPException(status_code=404, detail="Subject result not found for this student")
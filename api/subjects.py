@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import FileResponse
 import os
+from api.exports import export_results
+from api.utils import load_search_index, load_subject_difficulty_table
+from storage.results_store import subject_code as course_code
 
 router = APIRouter()
 
@@ -8,23 +11,43 @@ SUBJECTS_DIR = "data/summary/subjects/"
 
 @router.get("/")
 def list_subjects():
-    files = [f for f in os.listdir(SUBJECTS_DIR) if f.endswith(".xlsx")]
-    subjects = [os.path.splitext(f)[0] for f in files]
-    return {"subjects": subjects}
+    """
+    Return the name of every subject that has an analysed summary (credited subjects with valid results).
+    """
+    try:
+        subjects = load_search_index().subjects
+        analysed = set(load_subject_difficulty_table().frame["Subject"])
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Subject summary not available")
+    return {"subjects": [s["name"] for s in subjects if s["name"] in analysed]}
 
 @router.get("/{subject_code}")
 def get_subject_summary(subject_code: str):
-    # You could read the Excel here and return JSON summary if needed
-    filepath = os.path.join(SUBJECTS_DIR, f"{subject_code}.xlsx")
-    if not os.path.exists(filepath):
+    """
+    Return the subject's statistics from the overall subject summary, with links to its exports.
+    """
+    try:
+        summary = load_subject_difficulty_table().lookup(subject_code)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Subject summary not available")
+    if not summary:
         raise HTTPException(status_code=404, detail="Subject not found")
-    # For simplicity, just return available metadata here
-    return {"subject": subject_code, "file": f"/subjects/{subject_code}/download"}
+    code = course_code(subject_code)
+    return {
+        "subject": subject_code,
+        "summary": summary,
+        "file": f"/subjects/{subject_code}/download",
+        "exports": {fmt: f"/exports/results.{fmt}?subjects={code}" for fmt in ("csv", "ndjson", "xlsx")},
+    }
 
 @router.get("/{subject_code}/download")
-def download_subject_excel(subject_code: str):
+def download_subject_excel(request: Request, subject_code: str):
+    """
+    Download the subject's analysis workbook, or an export of its results when no analysis has been written.
+    """
     filepath = os.path.join(SUBJECTS_DIR, f"{subject_code}.xlsx")
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Subject summary not found")
-    return FileResponse(filepath, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        filename=f"{subject_code}.xlsx")
+    if os.path.exists(filepath):
+        return FileResponse(filepath, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            filename=f"{subject_code}.xlsx")
+    return export_results(request, "xlsx", subjects=[subject_code], filename=course_code(subject_code),
+                          not_found="Subject not found")
@@ -1,59 +1,346 @@
-from fastapi import APIRouter, HTTPException
-from api.utils import load_gpa_summary, load_medical_credits_summary, load_subject_difficulty_summary
+from fastapi import APIRouter, HTTPException, Request
+from api.utils import cache_stats
+from api.utils import load_gpa_table, load_medical_credits_table, load_subject_difficulty_table, load_co_performance
+from api.utils import summary_batches
+from api.co_performance import MIN_PAIR_STUDENTS, OUTLIER_Z
+from storage.results_store import subject_code
+from api.responses import prepared_response
 from fastapi import Query
+from typing import Optional
+import base64
+import numpy as np
 
 router = APIRouter()
 
+SEMESTERS = ["Y1S1", "Y1S2", "Y2S1", "Y2S2", "Y3S1"]
+BATCH_PATTERN = r"^\d{4}$"
+BATCH_DESCRIPTION = "Only this intake year, e.g. 2021 (ranks are within the batch)"
+
+
+def batch_table(load, batch=None):
+    """
+    Load a summary table: the cohort-wide one, or the given batch's own copy.
+    """
+    try:
+        return load(batch)
+    except FileNotFoundError:
+        if batch is None:
+            raise
+        raise HTTPException(status_code=404, detail=f"No summaries for batch {batch}")
+
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(table, sort=None, fields=None, filters=(), offset=0, cursor=None, limit=None):
+    """
+    Validate the common list parameters and return a page of `table` with its total count.
+
+    - **sort**: column name, prefixed with "-" for descending order
+    - **fields**: comma-separated columns to include in each record
+    """
+    descending = False
+    if sort:
+        descending = sort.startswith("-")
+        sort = sort.lstrip("-+")
+        if sort not in table.columns:
+            raise HTTPException(status_code=400, detail=f"Unknown sort column: {sort}")
+
+    selected = None
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in table.columns]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    if cursor:
+        offset = decode_cursor(cursor)
+        if offset < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    records, total = table.query(sort, descending, filters, offset, limit, selected)
+    next_offset = offset + len(records)
+    return {
+        "summary": records,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_cursor": encode_cursor(next_offset) if limit is not None and next_offset < total else None,
+    }
+
+
+def is_full_listing(filters, offset, cursor, limit, sort, fields):
+    return not filters and not offset and not cursor and limit is None and not sort and not fields
+
+
 @router.get("/students/gpa-summary")
-def get_gpa_summary():
+def get_gpa_summary(
+        request: Request,
+        limit: Optional[int] = Query(None, ge=1, description="Maximum number of records to return"),
+        offset: int = Query(0, ge=0, description="Number of matching records to skip"),
+        cursor: Optional[str] = Query(None, description="next_cursor from a previous page (overrides offset)"),
+        sort: Optional[str] = Query(None, description="Column to sort by, e.g. Rank or -FinalGPA"),
+        fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+        min_gpa: Optional[float] = Query(None, description="Minimum GPA (FinalGPA, or the chosen semester)"),
+        max_gpa: Optional[float] = Query(None, description="Maximum GPA (FinalGPA, or the chosen semester)"),
+        min_mc: Optional[float] = Query(None, description="Minimum total MC credits"),
+        max_mc: Optional[float] = Query(None, description="Maximum total MC credits"),
+        semester: Optional[str] = Query(None, description="Apply min_gpa/max_gpa to this semester, e.g. Y2S1"),
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
     """
     Return student GPA summaries including yearly semester GPAs, final GPA, total MCs, and ranks.
+
+    Without `limit` every matching record is returned.
     """
-    df = load_gpa_summary()
-    return {"summary": df.to_dict(orient="records")}
+    if semester and semester.upper() not in SEMESTERS:
+        raise HTTPException(status_code=400, detail=f"Unknown semester: {semester}")
+    gpa_column = semester.upper() if semester else "FinalGPA"
+
+    filters = []
+    if min_gpa is not None or max_gpa is not None:
+        filters.append((gpa_column, min_gpa, max_gpa))
+    if min_mc is not None or max_mc is not None:
+        filters.append(("TotalMC", min_mc, max_mc))
+
+    table = batch_table(load_gpa_table, batch)
+    if is_full_listing(filters, offset, cursor, limit, sort, fields):
+        # The full table is serialized and compressed once per snapshot
+        return prepared_response(request, table.prepared("all", lambda: paginate(table)))
+    return paginate(table, sort, fields, filters, offset, cursor, limit)
 
 @router.get("/students/gpa-summary/{index_number}")
-def get_gpa_summary_for_student(index_number: str):
+def get_gpa_summary_for_student(
+        index_number: str,
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
     """
     Return GPA summary for a specific student by index number.
     """
-    df = load_gpa_summary()
-    student_data = df[df["Index"].astype(str) == index_number]
-    if student_data.empty:
+    records = batch_table(load_gpa_table, batch).lookup(index_number)
+    if not records:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return {"index_number": index_number, "summary": records}
+
+
+def gpa_metric(table, metric):
+    metric = "FinalGPA" if metric is None else metric.strip()
+    metric = metric.upper() if metric.upper() in SEMESTERS else metric
+    if metric not in table.distribution.metrics:
+        raise HTTPException(status_code=400, detail=f"Unknown GPA metric: {metric}")
+    return metric
+
+
+@router.get("/students/gpa-summary/{index_number}/percentile")
+def get_gpa_percentile(
+        index_number: str,
+        metric: Optional[str] = Query(None, description="FinalGPA (default) or a semester, e.g. Y2S1"),
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
+    """
+    Return where a student falls in the cohort (or their batch): rank and percentile for FinalGPA
+    and every semester, or only for `metric`.
+    """
+    table = batch_table(load_gpa_table, batch)
+    records = table.lookup(index_number)
+    if not records:
+        raise HTTPException(status_code=404, detail="Student not found")
+    metrics = [gpa_metric(table, metric)] if metric else table.distribution.metrics
+    positions = {m: table.distribution.position(m, records[0][m]) for m in metrics}
+    return {"index_number": index_number, "positions": positions}
+
+
+@router.get("/students/gpa-top")
+def get_gpa_top(
+        k: int = Query(10, ge=1, le=1000, description="Number of students to return"),
+        metric: Optional[str] = Query(None, description="FinalGPA (default) or a semester, e.g. Y2S1"),
+        bottom: bool = Query(False, description="Return the lowest k instead of the highest"),
+        fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
+    """
+    Return the top-k (or bottom-k) students by FinalGPA or a semester GPA.
+    """
+    table = batch_table(load_gpa_table, batch)
+    metric = gpa_metric(table, metric)
+    page = paginate(table, metric if bottom else f"-{metric}", fields, limit=k)
+    return {"metric": metric, "bottom": bottom, "summary": page["summary"], "total": page["total"]}
+
+
+@router.get("/students/gpa-histogram")
+def get_gpa_histogram(
+        metric: Optional[str] = Query(None, description="FinalGPA (default) or a semester, e.g. Y2S1"),
+        bins: int = Query(8, ge=1, le=400, description="Number of equal-width bins"),
+        low: float = Query(0.0, description="Lower edge of the first bin"),
+        high: float = Query(4.0, description="Upper edge of the last bin (inclusive)"),
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
+    """
+    Return a histogram of student GPAs with configurable bins.
+    """
+    if high <= low:
+        raise HTTPException(status_code=400, detail="high must be greater than low")
+    table = batch_table(load_gpa_table, batch)
+    metric = gpa_metric(table, metric)
+    distribution = table.distribution
+    return {"metric": metric, "students": distribution.count(metric),
+            "histogram": distribution.histogram(metric, bins, low, high)}
+
+
+@router.get("/students/class-bands")
+def get_class_bands(
+        metric: Optional[str] = Query(None, description="FinalGPA (default) or a semester, e.g. Y2S1"),
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
+    """
+    Return the number of students in each degree class band.
+    """
+    table = batch_table(load_gpa_table, batch)
+    metric = gpa_metric(table, metric)
+    return {"metric": metric, "bands": table.distribution.class_bands(metric)}
+
+
+@router.get("/students/{index_number}/outliers")
+def get_student_outliers(
+        index_number: str,
+        z: float = Query(OUTLIER_Z, gt=0, description="Flag subjects this many standard deviations from the expected grade"),
+        outliers_only: bool = Query(False, description="Only return the flagged subjects")):
+    """
+    Return how far a student's grade in each subject is from the grade expected of them
+    (the subject average shifted by how the student does in their other subjects).
+    """
+    try:
+        subjects = load_co_performance().student_deviations(index_number.strip())
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Results store not found")
+    if subjects is None:
         raise HTTPException(status_code=404, detail="Student not found")
-    return {"index_number": index_number, "summary": student_data.to_dict(orient="records")}
+    for subject in subjects:
+        subject["outlier"] = subject["z"] is not None and abs(subject["z"]) >= z
+    if outliers_only:
+        subjects = [s for s in subjects if s["outlier"]]
+    subjects.sort(key=lambda s: -abs(s["z"] or 0.0))
+    return {"index_number": index_number, "z": z, "subjects": subjects}
 
 
 @router.get("/students/medical-credits")
 def get_medical_credits(
-        strategic_only: bool = Query(False, description="Filter to only students with StrategicUseOfMC=True")):
+        request: Request,
+        strategic_only: bool = Query(False, description="Filter to only students with StrategicUseOfMC=True"),
+        limit: Optional[int] = Query(None, ge=1, description="Maximum number of records to return"),
+        offset: int = Query(0, ge=0, description="Number of matching records to skip"),
+        cursor: Optional[str] = Query(None, description="next_cursor from a previous page (overrides offset)"),
+        sort: Optional[str] = Query(None, description="Column to sort by, e.g. -TotalMC"),
+        fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+        min_gpa: Optional[float] = Query(None, description="Minimum FinalGPA"),
+        max_gpa: Optional[float] = Query(None, description="Maximum FinalGPA"),
+        min_mc: Optional[float] = Query(None, description="Minimum total MC credits"),
+        max_mc: Optional[float] = Query(None, description="Maximum total MC credits"),
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
     """
     Return student medical credit details and strategic usage.
 
     - **strategic_only**: If true, return only records where StrategicUseOfMC is true.
     """
-    df = load_medical_credits_summary()
-
+    filters = []
     if strategic_only:
-        df = df[df["StrategicUseOfMC"] == True]
+        filters.append(("StrategicUseOfMC", True, True))
+    if min_gpa is not None or max_gpa is not None:
+        filters.append(("FinalGPA", min_gpa, max_gpa))
+    if min_mc is not None or max_mc is not None:
+        filters.append(("TotalMC", min_mc, max_mc))
 
-    return {"summary": df.to_dict(orient="records")}
+    table = batch_table(load_medical_credits_table, batch)
+    if is_full_listing(filters[1:] if strategic_only else filters, offset, cursor, limit, sort, fields):
+        name = "strategic" if strategic_only else "all"
+        return prepared_response(request, table.prepared(name, lambda: paginate(table, filters=filters)))
+    return paginate(table, sort, fields, filters, offset, cursor, limit)
 
 @router.get("/subjects/difficulty-summary")
-def get_subject_difficulty_summary():
+def get_subject_difficulty_summary(
+        request: Request,
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
     """
     Return subject-wise difficulty metrics including average GPA, failure rate, and difficulty scores.
     """
-    df = load_subject_difficulty_summary()
-    return {"summary": df.to_dict(orient="records")}
+    table = batch_table(load_subject_difficulty_table, batch)
+    return prepared_response(request, table.prepared("all", lambda: {"summary": table.records}))
 
 @router.get("/subjects/difficulty-summary/{subject_code}")
-def get_subject_difficulty(subject_code: str):
+def get_subject_difficulty(
+        subject_code: str,
+        batch: Optional[str] = Query(None, pattern=BATCH_PATTERN, description=BATCH_DESCRIPTION)):
     """
-    Return difficulty summary for a specific subject code.
+    Return difficulty summary for a specific subject (full name or course code).
     """
-    df = load_subject_difficulty_summary()
-    subject_data = df[df["Subject"].str.upper() == subject_code.upper()]
-    if subject_data.empty:
+    records = batch_table(load_subject_difficulty_table, batch).lookup(subject_code)
+    if not records:
         raise HTTPException(status_code=404, detail="Subject not found")
-    return {"subject_code": subject_code, "summary": subject_data.to_dict(orient="records")}
+    return {"subject_code": subject_code, "summary": records}
+
+
+@router.get("/subjects/difficulty-summary/{subject_code}/batches")
+def get_subject_difficulty_by_batch(subject_code: str):
+    """
+    Compare a subject's difficulty across intakes, from each batch's subject summary.
+    """
+    batches = []
+    for batch in summary_batches():
+        records = batch_table(load_subject_difficulty_table, batch).lookup(subject_code)
+        batches += [{"batch": batch, **record} for record in records]
+    if not batches:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    return {"subject_code": subject_code, "batches": batches}
+
+
+@router.get("/batches")
+def get_batches():
+    """
+    Compare intakes: students, GPA statistics, class bands and strategic MC users of every batch,
+    from each batch's summaries.
+    """
+    batches = []
+    for batch in summary_batches():
+        table = batch_table(load_gpa_table, batch)
+        final_gpa = table.distribution.sorted["FinalGPA"]
+        medical = batch_table(load_medical_credits_table, batch)
+        _, strategic = medical.query(filters=[("StrategicUseOfMC", True, True)], limit=0)
+        batches.append({
+            "batch": batch,
+            "students": len(final_gpa),
+            "mean_gpa": round(float(final_gpa.mean()), 4) if len(final_gpa) else None,
+            "median_gpa": round(float(np.median(final_gpa)), 4) if len(final_gpa) else None,
+            "class_bands": table.distribution.class_bands(),
+            "strategic_mc": strategic,
+        })
+    return {"batches": batches}
+
+
+@router.get("/subjects/correlations")
+def get_subject_correlations(
+        subject: Optional[str] = Query(None, description="Only pairs involving this subject (course code or full name)"),
+        min_students: int = Query(MIN_PAIR_STUDENTS, ge=MIN_PAIR_STUDENTS, description="Minimum students who took both subjects"),
+        limit: Optional[int] = Query(None, ge=1, description="Maximum number of pairs to return")):
+    """
+    Return pairs of subjects by how strongly their grades correlate, with the
+    conditional failure rates P(fail B | fail A) of each pair.
+    """
+    try:
+        co_performance = load_co_performance()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Results store not found")
+    code = subject_code(subject) if subject else None
+    if code is not None and code not in co_performance.subjects:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    pairs = co_performance.correlations(code, min_students, limit)
+    return {"subject": code, "pairs": pairs}
+
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """
+    Return hit/miss counters of the in-memory summary/cohort cache and the student LRU.
+    """
+    return cache_stats()
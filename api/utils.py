@@ -1,26 +1,229 @@
+import hashlib
+import io
 import os
+import threading
 import pandas as pd
+from api.cache import SnapshotCache, STUDENT_CACHE_SIZE, file_signature
+from api.co_performance import CoPerformance
+from api.cohort import CohortModel
+from api.grade_matrix import GradeMatrix
+from api.indexes import SummaryTable, gpa_table, subject_difficulty_table
+from api.search_index import SearchIndex
+from storage.results_store import BATCHES_DIR, STORE_PATH
 
-STUDENT_RESULTS_DIR = "data/results/"
 DATA_DIR = "data/summary/"
+# Summary files served by the API and how each is turned into a table
+SUMMARY_FILES = {
+    "GPA_Summary.xlsx": gpa_table,
+    "GPA_Summary_By_Medicals.xlsx": SummaryTable,
+    "overall_subject_summary.xlsx": subject_difficulty_table,
+}
+
+COHORT_KEY = "cohort"
+GRADE_MATRIX_KEY = "grade-matrix"
+CO_PERFORMANCE_KEY = "co-performance"
+SEARCH_KEY = "search"
+
+# Parsed frames and the cohort model stay in memory until the backing files change on disk
+summary_cache = SnapshotCache()
+# Student frames decoded from the cohort model, keyed by (model version, index number)
+student_cache = SnapshotCache(max_entries=STUDENT_CACHE_SIZE)
+# Set while the data watcher runs: it reloads the cohort models itself after the store changes
+watching = threading.Event()
+_cohort_reload = threading.Lock()
+
+
+def store_files():
+    # SQLite in WAL mode appends to the -wal file before checkpointing into the main file
+    return (STORE_PATH, f"{STORE_PATH}-wal")
+
+
+def cohort_entries(signature, model):
+    """
+    Cache entries of the cohort model and every model derived from it, all from the same store snapshot.
+    """
+    matrix = GradeMatrix(model)
+    return {
+        COHORT_KEY: (store_files(), model, signature),
+        GRADE_MATRIX_KEY: (store_files(), matrix, signature),
+        CO_PERFORMANCE_KEY: (store_files(), CoPerformance(matrix), signature),
+        SEARCH_KEY: (store_files(), SearchIndex(model), signature),
+    }
+
+def reload_cohort():
+    """
+    Load the cohort model from the store and install it with its derived models.
+    One reload runs at a time; a reload that finds the models current does nothing.
+    """
+    with _cohort_reload:
+        if summary_cache.lookup(COHORT_KEY, store_files())[1]:
+            return
+        signature = file_signature(store_files())
+        summary_cache.put_many(cohort_entries(signature, CohortModel.load()))
+
+def _reload_cohort_in_background():
+    try:
+        reload_cohort()
+    except Exception as e:
+        print(f"❌ Cohort reload failed: {e}")
+
+def _cohort_model(key):
+    """
+    A model of the cohort family. The first request loads it (concurrent ones wait for
+    that single load). After the store changes the loaded model keeps being served while
+    a new one is built in the background: by the data watcher when it runs, or else by a
+    reload thread, so no request rebuilds the cohort itself.
+    """
+    value, current = summary_cache.lookup(key, store_files())
+    if value is None:
+        reload_cohort()
+        value, _ = summary_cache.lookup(key, store_files())
+    elif not current and not watching.is_set() and not _cohort_reload.locked():
+        threading.Thread(target=_reload_cohort_in_background, name="cohort-reload", daemon=True).start()
+    return value
+
+def load_cohort() -> CohortModel:
+    """
+    The compact model of every student's rows.
+    """
+    return _cohort_model(COHORT_KEY)
+
+def load_grade_matrix() -> GradeMatrix:
+    """
+    The (student, subject) grade cells used by the GPA policy simulator, built with the cohort model.
+    """
+    return _cohort_model(GRADE_MATRIX_KEY)
+
+def load_co_performance() -> CoPerformance:
+    """
+    Subject correlations, conditional failure rates and expected grades, built with the cohort model.
+    """
+    return _cohort_model(CO_PERFORMANCE_KEY)
+
+def load_search_index() -> SearchIndex:
+    """
+    Prefix search over index numbers and subjects, built with the cohort model.
+    """
+    return _cohort_model(SEARCH_KEY)
 
 def load_student_results(index_number: str) -> pd.DataFrame:
     """
-    Load the Excel file for the given student index_number.
+    Load the given student's rows from the cohort model (decoded frames are kept in an LRU).
     Returns DataFrame or raises FileNotFoundError.
     """
-    filepath = os.path.join(STUDENT_RESULTS_DIR, f"{index_number}.xlsx")
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"Student result file not found: {index_number}.xlsx")
-    df = pd.read_excel(filepath)
+    cohort = load_cohort()
+    df = student_cache.get((cohort.version, index_number), (), lambda: cohort.student_frame(index_number))
+    if df.empty:
+        raise FileNotFoundError(f"Student results not found: {index_number}")
     # Basic cleaning or normalization can be done here if needed
     return df
 
+def load_students_results(index_numbers) -> dict:
+    """
+    Load several students' rows from the cohort model, decoding only those not in the LRU.
+    Returns {index_number: DataFrame}; students without results get an empty frame.
+    """
+    cohort = load_cohort()
+    keys = [(cohort.version, index_number) for index_number in dict.fromkeys(index_numbers)]
+    frames = student_cache.get_many(keys, (), lambda missing: {key: cohort.student_frame(key[1]) for key in missing})
+    return {index_number: frames[(version, index_number)] for version, index_number in keys}
+
+def read_snapshot(path, build):
+    with open(path, "rb") as f:
+        data = f.read()
+    # The content hash is the snapshot version used for ETags
+    version = hashlib.sha1(data).hexdigest()[:16]
+    return build(pd.read_excel(io.BytesIO(data)), version=version)
+
+def batch_filename(filename, batch=None):
+    """
+    Path of a summary file relative to DATA_DIR: the cohort-wide file, or the given batch's copy.
+    """
+    return filename if batch is None else f"{BATCHES_DIR}/{batch}/{filename}"
+
+def summary_batches(root=DATA_DIR):
+    """
+    Intake years that have their own summaries under `root`, oldest first.
+    """
+    folder = os.path.join(root, BATCHES_DIR)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(name for name in os.listdir(folder) if os.path.isdir(os.path.join(folder, name)))
+
+def summary_files(root=DATA_DIR):
+    """
+    {filename: builder} of the cohort-wide summary files and every batch's copies found under `root`.
+    """
+    files = dict(SUMMARY_FILES)
+    for batch in summary_batches(root):
+        for filename, build in SUMMARY_FILES.items():
+            files[batch_filename(filename, batch)] = build
+    return files
+
+def _load_table(filename, build=SummaryTable, batch=None):
+    # The frame and its indexes are cached as one object and replaced together on reload
+    path = f"{DATA_DIR}{batch_filename(filename, batch)}"
+    return summary_cache.get(path, (path,), lambda: read_snapshot(path, build))
+
+def load_gpa_table(batch=None) -> SummaryTable:
+    return _load_table("GPA_Summary.xlsx", gpa_table, batch)
+
+def load_medical_credits_table(batch=None) -> SummaryTable:
+    return _load_table("GPA_Summary_By_Medicals.xlsx", batch=batch)
+
+def load_subject_difficulty_table(batch=None) -> SummaryTable:
+    return _load_table("overall_subject_summary.xlsx", subject_difficulty_table, batch)
+
+def install_tables(tables, publish=None, cohort=None, staging=None):
+    """
+    Swap in freshly built {filename: table} summary tables together (see SnapshotCache.put_many),
+    optionally with the cohort model entries built alongside them (see cohort_entries).
+    Tables read from files in `staging` are installed with the signatures those files
+    keep when `publish()` moves them into DATA_DIR.
+    """
+    entries = dict(cohort or {})
+    for filename, table in tables.items():
+        path = f"{DATA_DIR}{filename}"
+        signature = file_signature((os.path.join(staging, filename),)) if staging else None
+        entries[path] = ((path,), table, signature)
+    summary_cache.put_many(entries, publish)
+
+def summary_versions():
+    """
+    Version and load time of every summary table currently in memory.
+    """
+    versions = {}
+    for filename in summary_files():
+        table = summary_cache.peek(f"{DATA_DIR}{filename}")
+        if table is not None:
+            versions[filename] = {"version": table.version, "loaded_at": table.loaded_at}
+    return versions
+
 def load_gpa_summary():
-    return pd.read_excel(f"{DATA_DIR}GPA_Summary.xlsx")
+    return load_gpa_table().frame
 
 def load_medical_credits_summary():
-    return pd.read_excel(f"{DATA_DIR}GPA_Summary_By_Medicals.xlsx")
+    return load_medical_credits_table().frame
 
 def load_subject_difficulty_summary():
-    return pd.read_excel(f"{DATA_DIR}overall_subject_summary.xlsx")
\ No newline at end of file
+    return load_subject_difficulty_table().frame
+
+def warm_caches():
+    """
+    Load every summary table and build its indexes up front (called at server startup).
+    """
+    for load in (load_gpa_table, load_medical_credits_table, load_subject_difficulty_table, load_cohort,
+                 load_grade_matrix, load_co_performance, load_search_index):
+        try:
+            load()
+        except FileNotFoundError as e:
+            print(f"⚠️ Summary not available yet: {e}")
+    for batch in summary_batches():
+        for load in (load_gpa_table, load_medical_credits_table, load_subject_difficulty_table):
+            try:
+                load(batch)
+            except FileNotFoundError as e:
+                print(f"⚠️ Summary not available yet: {e}")
+
+def cache_stats():
+    return {"summaries": summary_cache.stats(), "students": student_cache.stats()}
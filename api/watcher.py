@@ -0,0 +1,202 @@
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import APIRouter, HTTPException
+from api.cache import file_signature
+from api.cohort import CohortModel
+from api.utils import (
+    DATA_DIR, SUMMARY_FILES, cohort_entries, install_tables, load_cohort, read_snapshot, store_files, summary_batches,
+    summary_files, summary_versions, watching,
+)
+from storage.results_store import BATCHES_DIR
+from update_summaries import STATE_PATH, SUBJECTS_DIR, build_summaries
+
+router = APIRouter()
+
+# Set WATCH_DATA=1 to recompute the summaries whenever the results store changes (off by default,
+# the summary files are then served as they are)
+WATCH_ENABLED = os.environ.get("WATCH_DATA", "0") == "1"
+POLL_INTERVAL = 2.0
+# The store must be unchanged this long before a recompute starts, so a running scrape is not chased
+SETTLE_SECONDS = 5.0
+STAGING_DIR = f"{DATA_DIR}.staging/"
+
+
+def summaries_outdated():
+    """
+    Whether the results store was written after any summary file (or a summary file is missing).
+    """
+    try:
+        store_mtime = max(os.path.getmtime(path) for path in store_files() if os.path.exists(path))
+    except ValueError:
+        return False  # no store yet
+    for filename in SUMMARY_FILES:
+        path = f"{DATA_DIR}{filename}"
+        if not os.path.exists(path) or os.path.getmtime(path) < store_mtime:
+            return True
+    return False
+
+
+def build_snapshot(staging, signature):
+    """
+    The recompute itself, run in the watcher's worker process: write every summary to
+    `staging`, load the staged files into tables and build the cohort model and the
+    models derived from it. Returns (students, tables, cohort entries).
+    """
+    students = build_summaries(staging)
+    tables = {filename: read_snapshot(os.path.join(staging, filename), build)
+              for filename, build in summary_files(staging).items()}
+    return students, tables, cohort_entries(signature, CohortModel.load())
+
+
+class DataWatcher:
+    """
+    Polls the results store and recomputes the summaries when it changes.
+
+    The recompute runs in a separate worker process (build_snapshot), which
+    writes the files to a staging directory and builds the tables and cohort
+    models from them. The watcher thread only swaps the new objects into the
+    summary cache in one step and moves the files into data/summary/, so
+    requests keep being served from the previous snapshot until the new one
+    is complete and never see a mix of the two. The per-subject workbooks and
+    the aggregate state used by update_summaries.py are published with them.
+    """
+
+    def __init__(self, interval=POLL_INTERVAL, settle=SETTLE_SECONDS):
+        self.interval = interval
+        self.settle = settle
+        self.signature = None
+        self.changed_at = None
+        self.pending = False
+        self.recomputing = False
+        self.last_recompute = None
+        self.last_error = None
+        self._stopped = threading.Event()
+        self._thread = None
+        self._executor = None
+
+    def start(self):
+        self._stopped.clear()
+        watching.set()
+        self.signature = file_signature(store_files())
+        self.changed_at = time.monotonic() - self.settle
+        self.pending = summaries_outdated()
+        self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+
+    def _new_executor(self):
+        # spawn: forking a process that runs the server's threads is not safe
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+    def stop(self):
+        self._stopped.set()
+        watching.clear()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            signature = file_signature(store_files())
+            if signature != self.signature:
+                self.signature = signature
+                self.changed_at = time.monotonic()
+                self.pending = True
+            if self.pending and time.monotonic() - self.changed_at >= self.settle:
+                self.pending = False
+                self.recompute()
+
+    def recompute(self):
+        staging = os.path.join(STAGING_DIR, uuid.uuid4().hex)
+        self.recomputing = True
+        start = time.perf_counter()
+        try:
+            signature = file_signature(store_files())
+            if self._executor is None:
+                # Started on the first recompute, so an idle watcher costs no process
+                self._executor = self._new_executor()
+            students, tables, cohort = self._executor.submit(build_snapshot, staging, signature).result()
+
+            subjects_dir = os.path.join(staging, os.path.relpath(SUBJECTS_DIR, DATA_DIR))
+            subject_files = set(os.listdir(subjects_dir))
+            batches = set(summary_batches(staging))
+
+            def publish():
+                # The files of the swapped-in tables first
+                for filename in tables:
+                    os.makedirs(os.path.dirname(f"{DATA_DIR}{filename}"), exist_ok=True)
+                    os.replace(os.path.join(staging, filename), f"{DATA_DIR}{filename}")
+                for batch in summary_batches():
+                    # Intakes whose students are all gone from the store
+                    if batch not in batches:
+                        shutil.rmtree(os.path.join(DATA_DIR, BATCHES_DIR, batch), ignore_errors=True)
+                os.makedirs(SUBJECTS_DIR, exist_ok=True)
+                for filename in os.listdir(SUBJECTS_DIR):
+                    # Subjects nobody has a valid result for any more
+                    if filename.endswith(".xlsx") and filename not in subject_files:
+                        os.remove(os.path.join(SUBJECTS_DIR, filename))
+                for filename in subject_files:
+                    os.replace(os.path.join(subjects_dir, filename), os.path.join(SUBJECTS_DIR, filename))
+                os.replace(os.path.join(staging, os.path.relpath(STATE_PATH, DATA_DIR)), STATE_PATH)
+
+            install_tables(tables, publish, cohort=cohort, staging=staging)
+            self.last_recompute = {
+                "finished_at": time.time(),
+                "seconds": round(time.perf_counter() - start, 3),
+                "students": students,
+            }
+            self.last_error = None
+            print(f"🔁 Summaries recomputed for {students} students in {self.last_recompute['seconds']:.2f}s")
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # The worker died (e.g. killed for memory); start a fresh one for the next change
+                self._executor = self._new_executor()
+            self.last_error = str(e)
+            print(f"❌ Summary recompute failed: {e}")
+        finally:
+            self.recomputing = False
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def status(self):
+        return {
+            "enabled": self._thread is not None and self._thread.is_alive(),
+            "pending": self.pending,
+            "recomputing": self.recomputing,
+            "last_recompute": self.last_recompute,
+            "last_error": self.last_error,
+        }
+
+
+watcher = DataWatcher()
+
+
+@router.get("/status")
+def get_status():
+    """
+    Version and age of every summary snapshot being served, and the state of the data watcher.
+    """
+    now = time.time()
+    snapshots = {
+        filename: {**info, "age_seconds": round(now - info["loaded_at"], 3)}
+        for filename, info in summary_versions().items()
+    }
+    return {"snapshots": snapshots, "watcher": watcher.status()}
+
+
+@router.get("/status/memory")
+def get_memory_report():
+    """
+    Memory footprint of the in-memory cohort model.
+    """
+    try:
+        return load_cohort().memory_report()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Results store not found")
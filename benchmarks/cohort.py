@@ -0,0 +1,196 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from storage.results_store import connect, write_results
+
+# === SCS catalogue: (subject, study year, semester, credits, share of students taking it) ===
+CATALOGUE = [
+    ("ENH1201 Enhancement I", 1, "1", 0, 1.0),
+    ("ENH1202 Enhancement II", 1, "2", 0, 1.0),
+    ("SCS1201 Data Structures and Algorithms I", 1, "1", 3, 1.0),
+    ("SCS1202 Programming Using C", 1, "1", 3, 1.0),
+    ("SCS1203 Database I", 1, "1", 3, 1.0),
+    ("SCS1204 Discrete Mathematics 1", 1, "1", 2, 1.0),
+    ("SCS1205 Computer Systems", 1, "1", 2, 1.0),
+    ("SCS1206 Laboratory I", 1, "1", 2, 1.0),
+    ("SCS1207 Software Engineering I", 1, "1", 2, 1.0),
+    ("SCS1208 Data Structure and Algorithm II", 1, "2", 3, 1.0),
+    ("SCS1209 Object Oriented Programming", 1, "2", 3, 1.0),
+    ("SCS1210 Software Engineering II", 1, "2", 2, 1.0),
+    ("SCS1211 Mathematical Methods I", 1, "2", 2, 1.0),
+    ("SCS1212 Foundation of Computer Science", 1, "2", 2, 1.0),
+    ("SCS1213 Probability and Statistics", 1, "2", 2, 1.0),
+    ("SCS1214 Operating Systems I", 1, "2", 3, 1.0),
+    ("ENH2201 Enhancement III (Entrepreneurship)", 2, "2", 0, 1.0),
+    ("SCS2201 Data Structures and Algorithms III", 2, "1", 3, 1.0),
+    ("SCS2202 Group Project I", 2, "1&2", 4, 1.0),
+    ("SCS2203 Software Engineering III", 2, "1", 2, 1.0),
+    ("SCS2204 Functional Programming", 2, "1", 3, 1.0),
+    ("SCS2205 Computer Networks I", 2, "1", 3, 1.0),
+    ("SCS2206 Mathematical Methods II", 2, "1", 2, 1.0),
+    ("SCS2207 Programming Language Concepts", 2, "1", 2, 1.0),
+    ("SCS2208 Rapid Application Development", 2, "1", 3, 1.0),
+    ("SCS2209 Database II", 2, "2", 3, 1.0),
+    ("SCS2210 Discrete Mathematics II", 2, "2", 2, 1.0),
+    ("SCS2211 Laboratory II", 2, "2", 3, 1.0),
+    ("SCS2212 Automata Theory", 2, "2", 2, 1.0),
+    ("SCS2213 Electronics and Physical Computing", 2, "2", 3, 1.0),
+    ("SCS2214 Information System Security", 2, "2", 2, 1.0),
+    ("ENH3201 Industrial Placement / Industry Project", 3, "2", 0, 1.0),
+    ("SCS3201 Machine Learning and Neural Computing", 3, "1", 2, 0.42),
+    ("SCS3202 Advanced Computer Architecture", 3, "1", 1, 0.08),
+    ("SCS3203 Middleware Architecture", 3, "1", 3, 0.9),
+    ("SCS3204 Management", 3, "1", 2, 0.74),
+    ("SCS3205 Computer Graphics I", 3, "1", 2, 0.28),
+    ("SCS3206 Graph Theory", 3, "1", 1, 0.47),
+    ("SCS3207 Software Quality Assurance", 3, "1", 2, 0.82),
+    ("SCS3208 Software Project Management", 3, "1", 2, 0.84),
+    ("SCS3209 Human Computer Interaction", 3, "1", 3, 0.66),
+    ("SCS3210 Systems and Network Administration", 3, "1", 3, 0.24),
+    ("SCS3211 Compiler Theory", 3, "1", 2, 0.25),
+    ("SCS3212 Mobile Application Development", 3, "1", 3, 0.18),
+    ("SCS3213 Game Development", 3, "1", 3, 0.12),
+    ("SCS3214 Group Project II", 3, "1", 3, 1.0),
+    ("SCS3215 Professional Practice", 3, "1", 2, 1.0),
+    ("SCS3216 Research Methods", 3, "1&2", 2, 0.29),
+]
+
+# Letter grades from best to worst with their share of graded results in the real cohort
+GRADES = ["A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D", "E", "F"]
+GRADE_SHARES = [0.036, 0.208, 0.103, 0.112, 0.099, 0.095, 0.086, 0.094, 0.038, 0.036, 0.028, 0.019, 0.046]
+FAIL_GRADES = {"D+", "D", "E", "F"}
+
+MC_RATE = 0.03       # medical submitted instead of sitting the paper
+WITHHELD_RATE = 0.012
+REPEAT_RATE = 0.6    # share of failed papers that are re-sat the next year
+FIRST_INTAKE = 2018
+
+
+# Score cut-offs between consecutive grades (scores are roughly normal with a 1.3 spread)
+GRADE_CUTS = np.quantile(np.random.default_rng(0).standard_normal(200_000) * 1.3, 1 - np.cumsum(GRADE_SHARES)[:-1])
+
+
+def _grades(scores):
+    # Best grades go to the highest scores
+    return np.asarray(GRADES, dtype=object)[np.searchsorted(-GRADE_CUTS, -scores)]
+
+
+def generate_cohort(students, intakes=1, seed=0, start=0):
+    """
+    Synthetic result rows for `students` students as a DataFrame with
+    Index, Name, Subject, Year, Semester, Credits and Result columns, in the
+    order parse_student_results returns them for each student.
+
+    Every student takes the core subjects and a random set of third-year
+    electives. Grades follow a per-student ability and per-subject difficulty
+    and are cut to the real grade mix. Failed papers may be repeated the next
+    year, some papers are replaced by a medical (MC) and re-sat, and the
+    enhancement courses are completed (CM) or not (NC).
+    """
+    rng = np.random.default_rng(seed + start)
+    ids = np.arange(start, start + students)
+    intake = FIRST_INTAKE + ids % intakes
+    index = pd.Series((intake % 100) * 1_000_000 + ids // intakes + 1).astype(str).to_numpy()
+    ability = rng.standard_normal(students)
+
+    subjects, years, semesters, credits, shares = (np.asarray(c, dtype=object) for c in zip(*CATALOGUE))
+    shares = shares.astype(float)
+    taken = rng.random((students, len(CATALOGUE))) < shares
+    student_pos, subject_pos = np.nonzero(taken)
+
+    difficulty = np.random.default_rng(seed).normal(0, 0.35, len(CATALOGUE))
+    scores = ability[student_pos] - difficulty[subject_pos] + rng.normal(0, 0.8, len(student_pos))
+    result = _grades(scores)
+    enhancement = credits[subject_pos] == 0
+    result[enhancement] = np.where(rng.random(enhancement.sum()) < 0.9, "CM", "NC")
+
+    roll = rng.random(len(student_pos))
+    medical = ~enhancement & (roll < MC_RATE)
+    result[medical] = "MC"
+    result[~enhancement & (roll >= MC_RATE) & (roll < MC_RATE + WITHHELD_RATE)] = "WH"
+
+    year = (intake[student_pos] + years[subject_pos].astype(int) - 1) % 100
+    rows = pd.DataFrame({
+        "Student": student_pos,
+        "Subject": subjects[subject_pos],
+        "Year": year,
+        "Semester": semesters[subject_pos],
+        "Credits": credits[subject_pos].astype(int),
+        "Result": result,
+        "Attempt": 0,
+    })
+
+    # Medicals and some failed papers are taken again the following year
+    retake = medical | (np.isin(result, list(FAIL_GRADES)) & (rng.random(len(student_pos)) < REPEAT_RATE))
+    again = rows[retake].copy()
+    again["Year"] = again["Year"] + 1
+    again["Result"] = _grades(scores[retake] + rng.normal(0.5, 0.6, retake.sum()))
+    again["Attempt"] = 1
+
+    rows = pd.concat([rows, again]).sort_values(["Student", "Attempt"], kind="stable")
+    rows.insert(0, "Index", index[rows["Student"].to_numpy()])
+    names = np.asarray([f"Student {i}" for i in ids], dtype=object)
+    rows.insert(1, "Name", names[rows["Student"].to_numpy()])
+    return rows.drop(columns=["Student", "Attempt"]).reset_index(drop=True)
+
+
+def iter_students(rows):
+    """
+    (index_no, name, rows) tuples in the shape write_results stores.
+    """
+    values = rows[["Subject", "Year", "Semester", "Credits", "Result"]].astype(str).to_numpy().tolist()
+    bounds = np.flatnonzero(rows["Index"].to_numpy()[1:] != rows["Index"].to_numpy()[:-1]) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(rows)]])
+    for begin, end in zip(starts, stops):
+        yield rows["Index"].iat[begin], rows["Name"].iat[begin], values[begin:end]
+
+
+def render_page(index_no, name, rows):
+    """
+    HTML in the layout of the UCSC results page, for parser benchmarks.
+    """
+    cells = "".join(
+        f"<tr><td>{subject}</td><td>[{year}]</td><td>[{semester}]</td><td>{credits}</td><td>{result}</td></tr>"
+        for subject, year, semester, credits, result in rows
+    )
+    return (
+        "<html><body><h3>Student Record of Examinations</h3>"
+        f"<h5>Name : {name}</h5><h5>Index No : {index_no}</h5>"
+        "<table><tr><th>Subject</th><th>Year</th><th>Sem</th><th>Credits</th><th>Result</th></tr>"
+        f"{cells}</table></body></html>"
+    )
+
+
+def write_cohort(students, path, intakes=1, seed=0, chunk_size=5000):
+    """
+    Generate a cohort in chunks and write it to a results store at `path`.
+    """
+    conn = connect(path)
+    try:
+        for start in range(0, students, chunk_size):
+            rows = generate_cohort(min(chunk_size, students - start), intakes, seed, start)
+            write_results(conn, iter_students(rows))
+    finally:
+        conn.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic cohort to a results store.")
+    parser.add_argument("--students", type=int, default=1000, help="Number of students")
+    parser.add_argument("--intakes", type=int, default=1, help="Number of intake years to spread them over")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--store", default="data/bench/results.db", help="Results store to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_cohort(args.students, args.store, args.intakes, args.seed)
+    print(f"✅ Wrote {args.students} synthetic students to {args.store} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from GPA_Calculator.gpa_caculator import compute_gpa_summary, write_gpa_summary
+from GPA_Calculator.sort_by_medicals import flag_strategic_mc, write_medicals_summary
+from analyse_subjects.analyse_subjects import create_overall_summary, process_all_students, summarize_subjects
+from api.utils import summary_cache
+from benchmarks.cohort import generate_cohort, iter_students, render_page, write_cohort
+from scraper.parse_results import DEFAULT_PARSER, parse_student_results
+from server import app
+from storage.ingest import load_results
+
+BENCH_DIR = "data/bench/"
+DEFAULT_SIZES = [1000, 10000]
+PARSE_PAGES = 2000
+API_REPEATS = 200
+# Slowdowns beyond this ratio are reported as regressions by --compare
+REGRESSION_RATIO = 1.10
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def result(benchmark, students, seconds, count, unit, **extra):
+    return {
+        "benchmark": benchmark,
+        "students": students,
+        "seconds": round(seconds, 4),
+        "throughput": round(count / seconds, 2) if seconds else None,
+        "unit": unit,
+        **extra,
+    }
+
+
+def bench_parse(students):
+    """
+    parse_student_results over fixture pages rendered from a synthetic cohort.
+    """
+    pages = [render_page(*student) for student in iter_students(generate_cohort(min(students, PARSE_PAGES)))]
+    _, seconds = timed(lambda: [parse_student_results(page) for page in pages])
+    return [result("parse", students, seconds, len(pages), "pages/s", parser=DEFAULT_PARSER)]
+
+
+def bench_gpa(students):
+    # A cold load: the cached frame would only time unpickling
+    rows, load_seconds = timed(load_results, cache=False)
+    summary, seconds = timed(compute_gpa_summary, rows)
+    return [
+        result("load", students, load_seconds, len(rows), "rows/s"),
+        result("gpa", students, seconds, len(summary), "students/s"),
+    ], summary
+
+
+def bench_analyse(students):
+    df_all, load_seconds = timed(process_all_students)
+    (valid, stats, grade_counts), seconds = timed(summarize_subjects, df_all)
+    return [
+        result("analyse_load", students, load_seconds, len(df_all), "rows/s"),
+        result("analyse", students, seconds, len(df_all), "rows/s"),
+    ], stats
+
+
+def write_summary_files(summary, stats):
+    write_gpa_summary(summary)
+    write_medicals_summary(flag_strategic_mc(summary))
+    create_overall_summary(stats)
+
+
+def bench_api(students, summary, repeats=API_REPEATS):
+    """
+    Latency and throughput of the main read endpoints through FastAPI's TestClient.
+    """
+    summary_cache.clear()
+    indexes = summary["Index"].astype(str).to_numpy()
+    picks = np.random.default_rng(0).choice(indexes, repeats)
+    routes = {
+        "gpa_summary_page": lambda i: "/api/summary/students/gpa-summary?limit=50&sort=-FinalGPA",
+        "gpa_summary_full": lambda i: "/api/summary/students/gpa-summary",
+        "gpa_summary_student": lambda i: f"/api/summary/students/gpa-summary/{picks[i]}",
+        "gpa_percentile": lambda i: f"/api/summary/students/gpa-summary/{picks[i]}/percentile",
+        "student_results": lambda i: f"/api/students/{picks[i]}",
+        "difficulty_summary": lambda i: "/api/summary/subjects/difficulty-summary",
+        "subject_correlations": lambda i: "/api/summary/subjects/correlations?limit=50",
+        "student_outliers": lambda i: f"/api/summary/students/{picks[i]}/outliers",
+    }
+
+    results = []
+    with TestClient(app) as client:
+        for name, url in routes.items():
+            client.get(url(0))  # warm-up
+            latencies = []
+            size = 0
+            for i in range(repeats):
+                start = time.perf_counter()
+                response = client.get(url(i))
+                latencies.append(time.perf_counter() - start)
+                size = len(response.content)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url(i)} returned {response.status_code}")
+            latencies = np.array(latencies)
+            results.append(result(
+                f"api:{name}", students, latencies.sum(), repeats, "req/s",
+                p50_ms=round(float(np.percentile(latencies, 50)) * 1000, 3),
+                p95_ms=round(float(np.percentile(latencies, 95)) * 1000, 3),
+                response_bytes=size,
+            ))
+    return results
+
+
+def run_size(students, workdir, regenerate=False):
+    """
+    Run every benchmark against a synthetic cohort of `students` students.
+
+    The scripts and the API use relative data/ paths, so each cohort lives in
+    its own directory and the benchmarks run from there.
+    """
+    os.makedirs(workdir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = []
+        store = "data/results.db"
+        if regenerate or not os.path.exists(store):
+            for path in (store, f"{store}-wal", f"{store}-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+            _, seconds = timed(write_cohort, students, store)
+            results.append(result("generate", students, seconds, students, "students/s"))
+
+        results += bench_parse(students)
+        gpa_results, summary = bench_gpa(students)
+        analyse_results, stats = bench_analyse(students)
+        results += gpa_results + analyse_results
+        write_summary_files(summary, stats)
+        results += bench_api(students, summary)
+        return results
+    finally:
+        os.chdir(cwd)
+
+
+def run_metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "commit": commit or None,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(current, previous):
+    """
+    Print the change of every benchmark against a previous results file.
+    Returns the (benchmark, students) pairs that got slower than REGRESSION_RATIO.
+    """
+    before = {(r["benchmark"], r["students"]): r for r in previous["results"]}
+    regressions = []
+    for r in current["results"]:
+        old = before.get((r["benchmark"], r["students"]))
+        if not old or not old["seconds"]:
+            continue
+        ratio = r["seconds"] / old["seconds"]
+        marker = "⚠️" if ratio > REGRESSION_RATIO else "  "
+        print(f"{marker} {r['benchmark']:<28} {r['students']:>7}  {old['seconds']:>9.4f}s -> {r['seconds']:>9.4f}s  x{ratio:.2f}")
+        if ratio > REGRESSION_RATIO:
+            regressions.append((r["benchmark"], r["students"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing, GPA and subject analysis, and the API on synthetic cohorts.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Cohort sizes, e.g. 1000 10000 100000")
+    parser.add_argument("--dir", default=BENCH_DIR, help="Working directory for the synthetic cohorts")
+    parser.add_argument("--output", default=None, help="JSON results file (default: <dir>/results-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Previous JSON results file to compare against")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate cohorts that already exist")
+    args = parser.parse_args()
+
+    report = {"meta": run_metadata(), "results": []}
+    for students in args.sizes:
+        print(f"⏱️ Benchmarking {students} students...")
+        for r in run_size(students, os.path.join(args.dir, str(students)), args.regenerate):
+            report["results"].append(r)
+            print(f"   {r['benchmark']:<28} {r['seconds']:>9.4f}s  {r['throughput']} {r['unit']}")
+
+    output = args.output or os.path.join(args.dir, f"results-{report['meta']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f))
+        if regressions:
+            print(f"❌ {len(regressions)} benchmarks regressed by more than {REGRESSION_RATIO - 1:.0%}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,97 @@
+import argparse
+from datetime import timedelta
 import pandas as pd
-from scraper.login import login
-from scraper.fetch_results import get_results_html
+from scraper.login import LOGIN_URL
+from scraper.batch import scrape_students, DEFAULT_CONCURRENCY, DEFAULT_RATE_LIMIT, DEFAULT_RETRIES, DEFAULT_BACKOFF
 from scraper.parse_results import parse_student_results
-from scraper.save_to_excel import save_results
-import os
+from storage.results_store import ResultsWriter, STORE_PATH
+from scraper.manifest import Manifest, MANIFEST_PATH
+from scraper.archive import save_html
+from timings import StageTimer, add_timings_argument
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape UCSC exam results for every student in the credentials file.")
+    parser.add_argument("--credentials", default="data/creditionals.xlsx", help="Excel file with Index and NIC columns")
+    parser.add_argument("--url", default=LOGIN_URL, help="Results login URL (point at a local server for testing)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Number of parallel workers")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT,
+                        help="Maximum requests per second across all workers (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Retries for connection errors and timeouts")
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF, help="Initial retry backoff in seconds")
+    parser.add_argument("--store", default=STORE_PATH, help="Results store to write to")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help="Per-student scrape manifest")
+    parser.add_argument("--max-age", type=float, default=24,
+                        help="Skip students fetched successfully within this many hours")
+    parser.add_argument("--force", action="store_true", help="Re-scrape every student, ignoring the manifest")
+    add_timings_argument(parser, "scrape")
+    return parser.parse_args()
+
+
+def make_page_processor(manifest, writer, timer):
+    def process_page(index_no, html):
+        # Keep the raw page so parser fixes can be replayed offline (python -m scraper.reparse)
+        with timer.stage("archive"):
+            save_html(index_no, html)
+        with timer.stage("parse"):
+            name, idx, result_data = parse_student_results(html)
+        # Only rewrite the stored rows when they actually changed; the manifest is
+        # updated once the rows are committed so a crash never marks unsaved work fresh
+        with timer.stage("save"):
+            if manifest.has_changed(index_no, result_data) or not writer.has_student(idx):
+                writer.add(idx, name, result_data, on_write=lambda: manifest.record_success(index_no, result_data))
+            else:
+                manifest.record_success(index_no, result_data)
+    return process_page
+
 
 def main():
-    os.makedirs("data/results", exist_ok=True)
+    args = parse_args()
 
     # Read NIC as string (important for preserving full digits and non-numeric suffixes)
-    df = pd.read_excel("data/creditionals.xlsx", dtype={"NIC": str, "Index": str})
-    for _, row in df.iterrows():
-        index_no = row["Index"].strip()
-        nic = str(row["NIC"]).strip()
-        print("index_no", index_no)
-        print("nic", nic)
-        try:
-            html = login(index_no, nic)
-            name, idx, result_data = parse_student_results(html)
-            save_results(name, idx, result_data)
-        except Exception as e:
-            print(f"Error for hi {index_no}: {e}")
+    df = pd.read_excel(args.credentials, dtype={"NIC": str, "Index": str})
+    students = [(row["Index"].strip(), str(row["NIC"]).strip()) for _, row in df.iterrows()]
+
+    manifest = Manifest(args.manifest)
+    if not args.force:
+        # Fresh students are skipped, which also resumes an interrupted run
+        max_age = timedelta(hours=args.max_age)
+        pending = [(index_no, nic) for index_no, nic in students if not manifest.is_fresh(index_no, max_age)]
+        print(f"⏭️ Skipping {len(students) - len(pending)} students fetched within the last {args.max_age:g}h")
+        students = pending
+    manifest.start_run()
+
+    timer = StageTimer("scrape")
+    try:
+        with ResultsWriter(args.store) as writer:
+            summary = scrape_students(
+                students,
+                make_page_processor(manifest, writer, timer),
+                url=args.url,
+                concurrency=args.concurrency,
+                rate_limit=args.rate_limit,
+                retries=args.retries,
+                backoff=args.backoff,
+                timer=timer,
+            )
+    finally:
+        # Students whose rows were committed stay recorded even if the run is interrupted
+        manifest.flush()
+
+    for index_no, error in summary["failed"].items():
+        manifest.record_failure(index_no, error)
+    manifest.finish_run()
+
+    print(f"\n✅ Succeeded: {len(summary['succeeded'])}")
+    print(f"❌ Failed: {len(summary['failed'])}")
+    for index_no, error in sorted(summary["failed"].items()):
+        print(f"   {index_no}: {error}")
+    print(f"🔁 Changed: {len(manifest.changed_since())}")
+    print(f"⏱️ Finished {len(students)} students in {summary['elapsed']:.1f}s")
+    timer.print_summary()
+    if args.timings:
+        print(f"✅ Timing report saved to {timer.write(args.timings)}")
+
 
 if __name__ == "__main__":
     main()
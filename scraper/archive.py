@@ -0,0 +1,32 @@
+import gzip
+import os
+
+ARCHIVE_DIR = "data/raw"
+
+
+def archive_path(index_no, folder=ARCHIVE_DIR):
+    return os.path.join(folder, f"{index_no}.html.gz")
+
+
+def save_html(index_no, html, folder=ARCHIVE_DIR):
+    """
+    Save the raw results page as gzip-compressed HTML so it can be re-parsed offline.
+    """
+    os.makedirs(folder, exist_ok=True)
+    path = archive_path(index_no, folder)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_html(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def list_archive(folder=ARCHIVE_DIR):
+    if not os.path.isdir(folder):
+        return []
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".html.gz"))
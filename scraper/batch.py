@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from scraper.login import login, LOGIN_URL, REQUEST_TIMEOUT
+from timings import StageTimer
+
+# === Defaults for the concurrent scrape ===
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT = 2.0  # requests per second across all workers
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0  # seconds, doubled after every failed attempt
+
+# Only transient failures are retried; a LoginError (wrong credentials) fails straight away
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout)
+# Responses the server sends when it is overloaded or rate limiting us
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces requests evenly so the whole pool
+    stays under `rate` requests per second. A rate of 0 disables it.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SessionPool:
+    """
+    One requests.Session per worker thread, so keep-alive connections
+    are reused across students instead of reconnecting for every login.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+
+def is_retryable(error):
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code in RETRYABLE_STATUS
+
+
+def login_with_retry(index_no, nic, session, limiter, url=LOGIN_URL, retries=DEFAULT_RETRIES,
+                     backoff=DEFAULT_BACKOFF, timeout=REQUEST_TIMEOUT):
+    """
+    Log in for a single student, retrying connection errors, timeouts, server
+    errors and 429 responses with exponential backoff. Returns the results page HTML.
+    """
+    attempt = 0
+    while True:
+        limiter.wait()
+        try:
+            return login(index_no, nic, session=session, url=url, timeout=timeout)
+        except requests.RequestException as e:
+            if not is_retryable(e) or attempt >= retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+
+
+def scrape_students(students, process, url=LOGIN_URL, concurrency=DEFAULT_CONCURRENCY,
+                    rate_limit=DEFAULT_RATE_LIMIT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                    timeout=REQUEST_TIMEOUT, timer=None):
+    """
+    Scrape every (index_no, nic) pair on a bounded thread pool.
+
+    `process(index_no, html)` is called in the worker thread for every page
+    that was fetched (parse and save). Returns a summary dict with the
+    succeeded index numbers and a {index_no: error} map of failures.
+    Time spent logging in is added to the "login" stage of `timer`.
+    """
+    timer = timer or StageTimer("scrape")
+    limiter = RateLimiter(rate_limit)
+    sessions = SessionPool()
+    succeeded = []
+    failed = {}
+
+    def work(index_no, nic):
+        with timer.stage("login"):
+            html = login_with_retry(index_no, nic, sessions.get(), limiter, url=url, retries=retries,
+                                    backoff=backoff, timeout=timeout)
+        process(index_no, html)
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(work, index_no, nic): index_no for index_no, nic in students}
+            for future in as_completed(futures):
+                index_no = futures[future]
+                try:
+                    future.result()
+                    succeeded.append(index_no)
+                except Exception as e:
+                    failed[index_no] = str(e)
+                    print(f"❌ Error for {index_no}: {e}")
+    finally:
+        sessions.close()
+
+    return {
+        "succeeded": succeeded,
+        "failed": failed,
+        "elapsed": time.perf_counter() - start,
+    }
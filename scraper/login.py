@@ -2,22 +2,30 @@ import requests
 
 LOGIN_URL = "https://ucsc.cmb.ac.lk/exam_results/"
 RESULTS_URL = "https://ucsc.cmb.ac.lk/exam_results/results"  # hypothetical actual results URL
+REQUEST_TIMEOUT = 30  # seconds
 
 
-def login(index_no, nic):
-    session = requests.Session()
+class LoginError(Exception):
+    """Raised when the results page is not returned for the given credentials."""
+
+
+def login(index_no, nic, session=None, url=LOGIN_URL, timeout=REQUEST_TIMEOUT):
+    # Reuse the caller's session when given so connections stay pooled across students
+    session = session or requests.Session()
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        "Referer": LOGIN_URL,
+        "Referer": url,
     }
     payload = {
         'no': index_no,
         'pw': nic
         # add any hidden inputs if needed after inspecting form
     }
-    response = session.post(LOGIN_URL, data=payload, headers=headers)
+    response = session.post(url, data=payload, headers=headers, timeout=timeout)
+    # An error page (e.g. 503 or 429) is not a failed login; let the caller decide whether to retry it
+    response.raise_for_status()
 
     if "Student Record of Examinations" not in response.text:
-        raise Exception(f"Login failed for {index_no}")
+        raise LoginError(f"Login failed for {index_no}")
 
     return response.text  # Return the HTML content after login
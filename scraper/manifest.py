@@ -0,0 +1,179 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+MANIFEST_PATH = "data/manifest.json"
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
+
+def hash_rows(rows):
+    """
+    Stable hash of the parsed result rows, used to tell whether a student's results changed.
+    """
+    payload = json.dumps([[str(cell) for cell in row] for row in rows], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class Manifest:
+    """
+    Per-student scrape manifest stored as JSON.
+
+    Each entry records when the student was last fetched, a hash of the parsed
+    result rows, the status of the last attempt and when the rows last changed.
+    Every update is appended as one line to a journal next to the file, so an
+    interrupted run can resume from where it stopped without rewriting the
+    whole manifest per student. The journal is folded back into the file at
+    the start and end of a run and by flush().
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self._lock = threading.Lock()
+        self._journal = None
+        self.data = {"last_run": None, "run_completed": True, "students": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        self._replay_journal()
+
+    @property
+    def students(self):
+        return self.data["students"]
+
+    def start_run(self):
+        """
+        Mark the start of a scrape run. An interrupted run keeps its original
+        start time so changes made before the crash still count as this run's.
+        """
+        with self._lock:
+            if self.data.get("run_completed", True):
+                self.data["last_run"] = _now()
+            self.data["run_completed"] = False
+            self._save()
+
+    def finish_run(self):
+        with self._lock:
+            self.data["run_completed"] = True
+            self._save()
+
+    def is_fresh(self, index_no, max_age):
+        """
+        True when the student was fetched successfully within `max_age` (a timedelta).
+        """
+        entry = self.students.get(index_no)
+        if not entry or entry.get("status") != STATUS_OK:
+            return False
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        return datetime.now() - fetched_at < max_age
+
+    def has_changed(self, index_no, rows):
+        """
+        True when `rows` differ from the rows recorded at the last successful fetch.
+        """
+        entry = self.students.get(index_no, {})
+        return entry.get("hash") != hash_rows(rows)
+
+    def record_success(self, index_no, rows, fetched=True):
+        """
+        Record a successful fetch. Returns True when the rows differ from the previous fetch.
+        With fetched=False (rows re-parsed from the archive) the last fetch time is kept.
+        """
+        digest = hash_rows(rows)
+        with self._lock:
+            entry = self.students.get(index_no, {})
+            changed = entry.get("hash") != digest
+            now = _now()
+            entry.update({"hash": digest, "status": STATUS_OK, "error": None})
+            if fetched or "fetched_at" not in entry:
+                entry["fetched_at"] = now
+            if changed:
+                entry["changed_at"] = now
+            self.students[index_no] = entry
+            self._append(index_no, entry)
+        return changed
+
+    def record_failure(self, index_no, error):
+        with self._lock:
+            entry = self.students.get(index_no, {})
+            entry.update({"fetched_at": _now(), "status": STATUS_FAILED, "error": str(error)})
+            self.students[index_no] = entry
+            self._append(index_no, entry)
+
+    def flush(self):
+        """
+        Fold the journal into the manifest file.
+        """
+        with self._lock:
+            self._save()
+
+    def changed_since(self, since=None):
+        """
+        Index numbers whose results changed at or after `since` (ISO timestamp or datetime).
+        Defaults to the start of the last run.
+        """
+        since = since or self.data.get("last_run")
+        if since is None:
+            return sorted(self.students)
+        if isinstance(since, str):
+            since = datetime.fromisoformat(since)
+        return sorted(
+            index_no for index_no, entry in self.students.items()
+            if entry.get("changed_at") and datetime.fromisoformat(entry["changed_at"]) >= since
+        )
+
+    def _replay_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    index_no, entry = json.loads(line)
+                except ValueError:
+                    break  # the last line of a crashed run may be cut off
+                self.students[index_no] = entry
+
+    def _append(self, index_no, entry):
+        if self._journal is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps([index_no, entry], sort_keys=True) + "\n")
+        self._journal.flush()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        # Everything in the journal is now in the file
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+def get_changed_students(since=None, path=MANIFEST_PATH):
+    """
+    Index numbers whose results changed since `since` (default: the start of the last scrape run).
+    """
+    return Manifest(path).changed_since(since)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List students whose results changed.")
+    parser.add_argument("--since", help="ISO timestamp (default: start of the last scrape run)")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    args = parser.parse_args()
+    for index_no in get_changed_students(args.since, args.manifest):
+        print(index_no)
@@ -1,8 +1,14 @@
 from bs4 import BeautifulSoup
 
+try:
+    import lxml  # noqa: F401 -- optional, much faster than the built-in parser
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
 
-def parse_student_results(html):
-    soup = BeautifulSoup(html, "html.parser")
+
+def parse_student_results(html, parser=DEFAULT_PARSER):
+    soup = BeautifulSoup(html, parser)
     name_tag = soup.find("h5", string=lambda x: x and "Name" in x)
     index_tag = soup.find("h5", string=lambda x: x and "Index" in x)
 
@@ -13,7 +19,6 @@ def parse_student_results(html):
     index_no = index_tag.text.split(":")[1].strip()
 
     tables = soup.find_all("table")
-    print('tables ',tables)
     data = []
 
     for table in tables:
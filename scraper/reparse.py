@@ -0,0 +1,101 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from scraper.archive import ARCHIVE_DIR, list_archive, load_html
+from scraper.manifest import MANIFEST_PATH, Manifest
+from scraper.parse_results import parse_student_results, DEFAULT_PARSER
+from storage.results_store import ResultsWriter, STORE_PATH
+
+
+def reparse_file(path, parser=DEFAULT_PARSER):
+    """
+    Parse one archived page. Runs inside a worker process.
+    Returns (path, parsed, error) where parsed is (name, index_no, rows).
+    """
+    try:
+        return path, parse_student_results(load_html(path), parser=parser), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def reparse_archive(archive_dir=ARCHIVE_DIR, store=STORE_PATH, workers=None, parser=DEFAULT_PARSER, save=True,
+                    manifest_path=MANIFEST_PATH):
+    """
+    Re-run parse_student_results over every archived page on a process pool.
+    Parsed rows are written to the results store in batches from the parent process.
+    Like a live scrape, only students whose rows changed are rewritten, and they are
+    recorded in the manifest as changed in this run so the incremental summaries pick them up.
+    Returns a summary dict with parsed/failed/changed counts and throughput in pages per second.
+    """
+    paths = list_archive(archive_dir)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+
+    start = time.perf_counter()
+    parsed = 0
+    rows = 0
+    changed = 0
+    failed = {}
+    writer = ResultsWriter(store) if save else None
+    manifest = Manifest(manifest_path) if save else None
+    if manifest:
+        manifest.start_run()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(reparse_file, paths, [parser] * len(paths), chunksize=chunksize)
+            for path, page, error in results:
+                if error:
+                    failed[path] = error
+                    continue
+                parsed += 1
+                rows += len(page[2])
+                if not writer:
+                    continue
+                name, idx, result_data = page
+                # The archive is keyed by the index number the page was scraped for, like the manifest
+                index_no = os.path.basename(path)[:-len(".html.gz")]
+                if manifest.has_changed(index_no, result_data) or not writer.has_student(idx):
+                    changed += 1
+                    # Recorded once the rows are committed, as in main.make_page_processor
+                    writer.add(idx, name, result_data,
+                               on_write=partial(manifest.record_success, index_no, result_data, fetched=False))
+    finally:
+        if writer:
+            writer.close()
+        if manifest:
+            manifest.flush()
+    if manifest:
+        manifest.finish_run()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "pages": len(paths),
+        "parsed": parsed,
+        "rows": rows,
+        "changed": changed,
+        "failed": failed,
+        "elapsed": elapsed,
+        "pages_per_second": len(paths) / elapsed if elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Re-parse the raw HTML archive without scraping the live site.")
+    arg_parser.add_argument("--archive", default=ARCHIVE_DIR, help="Folder of archived .html.gz pages")
+    arg_parser.add_argument("--store", default=STORE_PATH, help="Results store to write the parsed rows to")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    arg_parser.add_argument("--parser", default=DEFAULT_PARSER, help="BeautifulSoup parser backend")
+    arg_parser.add_argument("--manifest", default=MANIFEST_PATH, help="Per-student scrape manifest to record changes in")
+    arg_parser.add_argument("--dry-run", action="store_true", help="Parse only, do not write results")
+    args = arg_parser.parse_args()
+
+    summary = reparse_archive(args.archive, args.store, args.workers, args.parser, save=not args.dry_run,
+                              manifest_path=args.manifest)
+    for path, error in sorted(summary["failed"].items()):
+        print(f"❌ Error parsing {path}: {error}")
+    print(f"✅ Parsed {summary['parsed']}/{summary['pages']} pages ({summary['rows']} rows) with {args.parser}")
+    print(f"🔁 Changed: {summary['changed']}")
+    print(f"⏱️ {summary['elapsed']:.2f}s — {summary['pages_per_second']:.1f} pages/s")
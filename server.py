@@ -1,8 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from api import router as api_router
+from api.metrics import MetricsMiddleware
+from api.utils import warm_caches
+from api.watcher import watcher, WATCH_ENABLED
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load summary tables and build their lookup indexes before serving requests
+    warm_caches()
+    if WATCH_ENABLED:
+        watcher.start()
+    yield
+    watcher.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,4 +27,7 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Outermost, so the recorded latency covers the whole request including CORS handling
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix="/api")
@@ -0,0 +1,26 @@
+import argparse
+import os
+
+from storage.results_store import STORE_PATH, export_student_excel, list_students
+
+
+def export_excel(folder="data/results", indexes=None, path=STORE_PATH):
+    """
+    Generate <index>.xlsx workbooks from the results store (all students by default).
+    """
+    os.makedirs(folder, exist_ok=True)
+    indexes = indexes or list_students(path)
+    for index_no in indexes:
+        export_student_excel(index_no, os.path.join(folder, f"{index_no}.xlsx"), path)
+    return len(indexes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export per-student result workbooks from the results store.")
+    parser.add_argument("indexes", nargs="*", help="Index numbers to export (default: every student)")
+    parser.add_argument("--folder", default="data/results", help="Folder to write <index>.xlsx files to")
+    parser.add_argument("--store", default=STORE_PATH, help="Results store to read from")
+    args = parser.parse_args()
+
+    count = export_excel(args.folder, args.indexes, args.store)
+    print(f"✅ Exported {count} workbooks to {args.folder}")
@@ -0,0 +1,186 @@
+import argparse
+import glob
+import hashlib
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from storage.results_store import STORE_PATH, list_students, read_range
+
+# === Grade to GPA mapping ===
+grade_points = {
+    "A+": 4.0, "A": 4.0, "A-": 3.7,
+    "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7,
+    "D+": 1.3, "D": 1.0,
+    "E": 0.0, "F": 0.0, "NC": 0.0
+}
+
+# === Non-credit/invalid grades to exclude from GPA calculation but count MCs ===
+exclude_results = {"CM", "MC", "EC", "CN", "WH", "NC"}
+
+CACHE_DIR = "data/cache/"
+# Stores with fewer students than this are read in one go: reading takes about 180us per student
+# and starting the pool and sending the frames back about 50ms + 10us per student, so
+# two workers only win from roughly a thousand students on. A single intake stays below it.
+PARALLEL_MIN_STUDENTS = 1000
+PARTITIONS_PER_WORKER = 2
+CATEGORY_COLUMNS = ["Index", "OriginalSubject", "Subject", "Semester", "Result"]
+
+
+def normalize_subject_codes(subjects):
+    """
+    Subject names with all whitespace removed, upper-cased (the normalized subject code).
+    """
+    return subjects.astype(str).str.replace(r"\s+", "", regex=True).str.upper()
+
+
+def map_unique(values, func, categorical=False):
+    """
+    Apply a vectorized string transform to the distinct values only and broadcast
+    the result back; a cohort has millions of rows but only a few hundred subjects.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped = func(pd.Series(uniques, dtype=object)).to_numpy()
+    if categorical:
+        cat = pd.Categorical(mapped)
+        return pd.Series(pd.Categorical.from_codes(cat.codes[codes], cat.categories), index=values.index)
+    return pd.Series(mapped[codes], index=values.index)
+
+
+def normalize_rows(rows):
+    """
+    Turn rows as read from the store (Index, Subject, Year, Semester, Credits,
+    Result) into the typed cohort frame shared by the batch commands:
+
+    - Index, Semester and OriginalSubject (the subject name as stored) are categoricals;
+    - Subject is the normalized subject code and Result the stripped, upper-case grade;
+    - Credits is int16 (missing credits become 0, so they never count) and Year nullable Int16;
+    - GradePoint is looked up once (NaN for results without grade points).
+
+    Frames that are already normalized are returned as they are.
+    """
+    if "OriginalSubject" in rows.columns:
+        return rows
+    df = pd.DataFrame({
+        "Index": pd.Categorical(rows["Index"].astype(str)),
+        "OriginalSubject": pd.Categorical(rows["Subject"].astype(str)),
+        "Subject": map_unique(rows["Subject"], normalize_subject_codes, categorical=True).array,
+        "Year": pd.to_numeric(rows["Year"], errors="coerce").astype("Int16"),
+        "Semester": pd.Categorical(rows["Semester"].astype(str)),
+        "Credits": pd.to_numeric(rows["Credits"], errors="coerce").fillna(0).astype("int16"),
+        "Result": map_unique(rows["Result"], lambda r: r.astype(str).str.strip().str.upper(), categorical=True).array,
+    })
+    df["GradePoint"] = df["Result"].map(grade_points).astype("float64")
+    return df
+
+
+def _load_partition(index_from, index_before, path):
+    return normalize_rows(read_range(index_from, index_before, path))
+
+
+def _concat(frames):
+    """
+    Concatenate normalized frames, merging the categories of every categorical column.
+    """
+    frames = [f for f in frames if len(f)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    columns = {}
+    for column in frames[0].columns:
+        if column in CATEGORY_COLUMNS:
+            columns[column] = union_categoricals([f[column] for f in frames], sort_categories=True)
+        else:
+            columns[column] = pd.concat([f[column] for f in frames], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def store_signature(path=STORE_PATH):
+    """
+    Hash of the (mtime, size) of the store and its write-ahead log; changes whenever the data does.
+    """
+    signature = []
+    for file in (path, f"{path}-wal"):
+        try:
+            st = os.stat(file)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return hashlib.sha1(repr((os.path.abspath(path), signature)).encode()).hexdigest()[:16]
+
+
+def partitions(students, count):
+    """
+    `count` contiguous [index_from, index_before) ranges splitting the sorted `students` evenly.
+    """
+    if count <= 1 or len(students) < count:
+        return [(None, None)]
+    bounds = [students[len(students) * i // count] for i in range(1, count)]
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def load_results(path=STORE_PATH, workers=None, cache=True, cache_dir=CACHE_DIR):
+    """
+    Every stored row as one typed cohort frame (see normalize_rows).
+
+    The store is split into contiguous index ranges that are read and
+    normalized in a process pool. The frame is cached as a pickle keyed by the
+    store's file signature, so the batch commands run after each other share
+    a single load until the store changes.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Results store not found: {path} (run python -m storage.migrate)")
+    cache_path = os.path.join(cache_dir, f"results-{store_signature(path)}.pkl")
+    if cache:
+        try:
+            return pd.read_pickle(cache_path)
+        except FileNotFoundError:
+            pass  # not cached yet, or removed by another process's cleanup
+        except (EOFError, pickle.UnpicklingError):
+            print(f"⚠️ Ignoring unreadable cache {cache_path}")
+
+    workers = workers or os.cpu_count() or 1
+    students = list_students(path)
+    ranges = partitions(students, workers * PARTITIONS_PER_WORKER)
+    if workers == 1 or len(students) < PARALLEL_MIN_STUDENTS:
+        df = _concat([_load_partition(None, None, path)])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            starts, stops = zip(*ranges)
+            df = _concat(list(executor.map(_load_partition, starts, stops, [path] * len(ranges))))
+
+    if cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+        # Frames of older versions of the store are never read again
+        for old in glob.glob(os.path.join(cache_dir, "results-*.pkl")):
+            if old != cache_path:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass  # already removed by another process
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the results store into the cached cohort frame.")
+    parser.add_argument("--store", default=STORE_PATH, help="Results store to load")
+    parser.add_argument("--workers", type=int, default=None, help="Processes to read with (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not write the cached frame")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_results(args.store, args.workers, cache=not args.no_cache)
+    seconds = time.perf_counter() - start
+    memory = df.memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"✅ Loaded {len(df)} rows of {df['Index'].nunique()} students in {seconds:.2f}s ({memory:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
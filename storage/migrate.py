@@ -0,0 +1,46 @@
+import argparse
+import os
+
+import pandas as pd
+
+from storage.results_store import STORE_PATH, RESULT_COLUMNS, connect, write_results
+
+
+def migrate_from_excel(folder="data/results", path=STORE_PATH, batch_size=100):
+    """
+    One-time import of the per-student workbooks in `folder` into the results store.
+    Returns the number of students migrated.
+    """
+    conn = connect(path)
+    batch = []
+    migrated = 0
+    try:
+        for filename in sorted(os.listdir(folder)):
+            if filename.endswith(".xlsx") and not filename.startswith("~$"):
+                index = os.path.splitext(filename)[0]
+                try:
+                    df = pd.read_excel(os.path.join(folder, filename), dtype={"Semester": str})
+                    batch.append((index, None, df[RESULT_COLUMNS].values.tolist()))
+                except Exception as e:
+                    print(f"❌ Error migrating {filename}: {e}")
+                    continue
+                if len(batch) >= batch_size:
+                    write_results(conn, batch)
+                    migrated += len(batch)
+                    batch = []
+        if batch:
+            write_results(conn, batch)
+            migrated += len(batch)
+    finally:
+        conn.close()
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import per-student result workbooks into the results store.")
+    parser.add_argument("--folder", default="data/results", help="Folder of <index>.xlsx files")
+    parser.add_argument("--store", default=STORE_PATH, help="Results store to write to")
+    args = parser.parse_args()
+
+    count = migrate_from_excel(args.folder, args.store)
+    print(f"✅ Migrated {count} students into {args.store}")
@@ -0,0 +1,323 @@
+import os
+import re
+import sqlite3
+import threading
+
+import pandas as pd
+
+STORE_PATH = "data/results.db"
+RESULT_COLUMNS = ["Subject", "Year", "Semester", "Credits", "Result"]
+# Each intake's summaries go to <summary dir>/batches/<year>/ with the same file names
+BATCHES_DIR = "batches"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    "Index"     TEXT    NOT NULL,
+    Seq         INTEGER NOT NULL,
+    Subject     TEXT    NOT NULL,
+    SubjectCode TEXT    NOT NULL,
+    Year        INTEGER,
+    Semester    TEXT,
+    Credits     INTEGER,
+    Result      TEXT,
+    PRIMARY KEY ("Index", Seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_subject ON results (SubjectCode, "Index");
+CREATE TABLE IF NOT EXISTS students (
+    "Index" TEXT PRIMARY KEY,
+    Name    TEXT
+);
+"""
+
+
+def subject_code(subject):
+    """
+    Leading course code of a subject name, e.g. "SCS1201 Data Structures..." -> "SCS1201".
+    """
+    match = re.match(r"\s*([A-Za-z]+\s*\d+)", str(subject))
+    code = match.group(1) if match else str(subject)
+    return re.sub(r"\s+", "", code).upper()
+
+
+def batch_of(index_no):
+    """
+    Intake year of an index number, e.g. "20000561" -> "2020" (None when it does not start with two digits).
+
+    Index numbers start with the last two digits of the intake year, so the rows
+    of one batch are a contiguous range of the store's primary key.
+    """
+    prefix = str(index_no).strip()[:2]
+    return f"20{prefix}" if len(prefix) == 2 and prefix.isdigit() else None
+
+
+def batch_range(batch):
+    """
+    Inclusive (index_from, index_to) bounds of a batch's index numbers.
+    """
+    prefix = str(batch)[-2:]
+    return prefix, f"{prefix}\uffff"
+
+
+def list_batches(path=STORE_PATH):
+    """
+    Intake years present in the store, oldest first.
+    """
+    conn = _connect_read(path)
+    try:
+        prefixes = conn.execute('SELECT DISTINCT substr("Index", 1, 2) FROM students ORDER BY 1').fetchall()
+    finally:
+        conn.close()
+    return [batch for batch in (batch_of(prefix) for prefix, in prefixes) if batch]
+
+
+def _to_int(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def connect(path=STORE_PATH):
+    """
+    Open the results store for writing, creating it and its schema on first use.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _connect_read(path=STORE_PATH):
+    """
+    Open an existing store for reading. The schema is created by whoever writes
+    the store (see connect), so readers skip the DDL.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Results store not found: {path} (run python -m storage.migrate)")
+    return sqlite3.connect(path, check_same_thread=False)
+
+
+def write_results(conn, students):
+    """
+    Replace the stored rows of every student in `students` in a single transaction.
+
+    `students` is an iterable of (index_no, name, rows) where rows are
+    [subject, year, semester, credits, result] lists as produced by parse_student_results.
+    """
+    students = list(students)
+    records = []
+    for index_no, _, rows in students:
+        for seq, (subject, year, semester, credits, result) in enumerate(rows):
+            records.append((str(index_no), seq, str(subject), subject_code(subject), _to_int(year),
+                            str(semester), _to_int(credits), str(result)))
+
+    with conn:
+        conn.executemany('DELETE FROM results WHERE "Index" = ?', [(str(i),) for i, _, _ in students])
+        conn.executemany(
+            'INSERT INTO results ("Index", Seq, Subject, SubjectCode, Year, Semester, Credits, Result) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            records,
+        )
+        conn.executemany(
+            'INSERT INTO students ("Index", Name) VALUES (?, ?) '
+            'ON CONFLICT ("Index") DO UPDATE SET Name = COALESCE(excluded.Name, students.Name)',
+            [(str(i), name) for i, name, _ in students],
+        )
+
+
+class ResultsWriter:
+    """
+    Thread-safe buffered writer used by the scraper: rows are collected in
+    memory and written to the store in batches of `batch_size` students.
+    `on_write` callbacks run once a student's batch has been committed.
+    """
+
+    def __init__(self, path=STORE_PATH, batch_size=50):
+        self.conn = connect(path)
+        self.batch_size = batch_size
+        self._buffer = []
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def add(self, index_no, name, rows, on_write=None):
+        with self._lock:
+            self._buffer.append((index_no, name, rows))
+            if on_write:
+                self._callbacks.append(on_write)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def has_student(self, index_no):
+        with self._lock:
+            if any(i == index_no for i, _, _ in self._buffer):
+                return True
+            row = self.conn.execute('SELECT 1 FROM results WHERE "Index" = ? LIMIT 1', (str(index_no),)).fetchone()
+            return row is not None
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            write_results(self.conn, self._buffer)
+            self._buffer = []
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read(query, params=(), path=STORE_PATH):
+    conn = _connect_read(path)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+def read_student(index_no, path=STORE_PATH):
+    """
+    One student's rows in the same shape as the old per-student workbooks.
+    """
+    return _read(
+        'SELECT Subject, Year, Semester, Credits, Result FROM results WHERE "Index" = ? ORDER BY Seq',
+        (str(index_no),), path,
+    )
+
+
+def read_students(indexes, path=STORE_PATH, chunk_size=500):
+    """
+    Rows of the given students with their Index, in one query per chunk of index numbers.
+    """
+    indexes = [str(i) for i in indexes]
+    frames = []
+    for start in range(0, len(indexes), chunk_size):
+        chunk = indexes[start:start + chunk_size]
+        placeholders = ", ".join("?" * len(chunk))
+        frames.append(_read(
+            f'SELECT "Index", Subject, Year, Semester, Credits, Result FROM results '
+            f'WHERE "Index" IN ({placeholders}) ORDER BY "Index", Seq',
+            tuple(chunk), path,
+        ))
+    if not frames:
+        return pd.DataFrame(columns=["Index"] + RESULT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_subject(code, path=STORE_PATH):
+    """
+    Every student's rows for one subject code (e.g. "SCS1201").
+    """
+    return _read(
+        'SELECT "Index", Subject, Year, Semester, Credits, Result FROM results '
+        'WHERE SubjectCode = ? ORDER BY "Index", Seq',
+        (subject_code(code),), path,
+    )
+
+
+def read_all(path=STORE_PATH):
+    """
+    Every stored row with its Index, ordered by student.
+    """
+    return _read(
+        'SELECT "Index", Subject, Year, Semester, Credits, Result FROM results ORDER BY "Index", Seq',
+        (), path,
+    )
+
+
+def read_range(index_from=None, index_before=None, path=STORE_PATH):
+    """
+    Rows of the students with index_from <= Index < index_before (None for an open end), ordered by student.
+    """
+    clauses, params = [], []
+    if index_from is not None:
+        clauses.append('"Index" >= ?')
+        params.append(str(index_from))
+    if index_before is not None:
+        clauses.append('"Index" < ?')
+        params.append(str(index_before))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return _read(
+        f'SELECT "Index", Subject, Year, Semester, Credits, Result FROM results {where} ORDER BY "Index", Seq',
+        tuple(params), path,
+    )
+
+
+def list_students(path=STORE_PATH):
+    """
+    Index numbers of every student with stored results, in order.
+
+    Reads the students table and probes the results key per student instead
+    of scanning every result row for distinct index numbers.
+    """
+    conn = _connect_read(path)
+    try:
+        return [index for index, in conn.execute(
+            'SELECT "Index" FROM students s WHERE EXISTS (SELECT 1 FROM results r WHERE r."Index" = s."Index") '
+            'ORDER BY "Index"'
+        )]
+    finally:
+        conn.close()
+
+
+def iter_rows(subjects=None, index_from=None, index_to=None, code_ranges=None, path=STORE_PATH, batch_size=5000):
+    """
+    Stream (Index, Subject, Year, Semester, Credits, Result) tuples in batches, ordered by student.
+
+    Filters: `subjects` (course codes), an inclusive `index_from`/`index_to`
+    range and `code_ranges`, a list of inclusive (low, high) course code ranges
+    such as ("SCS1201", "SCS1207"). Only one batch is held in memory at a time.
+    """
+    clauses, params = [], []
+    if subjects:
+        codes = [subject_code(s) for s in subjects]
+        clauses.append(f"SubjectCode IN ({', '.join('?' * len(codes))})")
+        params.extend(codes)
+    if index_from is not None:
+        clauses.append('"Index" >= ?')
+        params.append(str(index_from))
+    if index_to is not None:
+        clauses.append('"Index" <= ?')
+        params.append(str(index_to))
+    if code_ranges:
+        clauses.append("(" + " OR ".join("SubjectCode BETWEEN ? AND ?" for _ in code_ranges) + ")")
+        for low, high in code_ranges:
+            params.extend([low, high])
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    conn = _connect_read(path)
+    try:
+        cursor = conn.execute(
+            f'SELECT "Index", Subject, Year, Semester, Credits, Result FROM results {where} ORDER BY "Index", Seq',
+            params,
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def export_student_excel(index_no, target, path=STORE_PATH):
+    """
+    Write one student's results as an Excel workbook (a file path or a file-like object).
+    """
+    df = read_student(index_no, path)
+    if df.empty:
+        raise FileNotFoundError(f"Student results not found: {index_no}")
+    df.to_excel(target, index=False)
+    return target
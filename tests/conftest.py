@@ -0,0 +1,74 @@
+import os
+import shutil
+
+import pytest
+
+from benchmarks.cohort import generate_cohort, iter_students
+from storage.results_store import connect, write_results
+from update_summaries import build_summaries
+
+# Small synthetic cohort spread over two intakes (index numbers 18xxxxxx and 19xxxxxx)
+STUDENTS = 40
+INTAKES = 2
+
+
+@pytest.fixture(scope="session")
+def cohort_rows():
+    return generate_cohort(STUDENTS, intakes=INTAKES, seed=1)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Run the test inside an empty folder, so every relative data/ path points there.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def students(cohort_rows):
+    """
+    The synthetic cohort as (index_no, name, rows) tuples, like the scraper produces.
+    """
+    return list(iter_students(cohort_rows))
+
+
+@pytest.fixture(scope="session")
+def summary_template(tmp_path_factory, cohort_rows):
+    """
+    A folder with the cohort in data/results.db and every summary built from it, made once per run.
+    """
+    folder = tmp_path_factory.mktemp("template")
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        conn = connect()
+        write_results(conn, iter_students(cohort_rows))
+        conn.close()
+        build_summaries()
+    finally:
+        os.chdir(cwd)
+    return folder
+
+
+@pytest.fixture
+def summaries(workdir, summary_template):
+    """
+    A fresh copy of the template's data/ folder in the working folder, with the API caches emptied.
+    """
+    from api.utils import student_cache, summary_cache
+
+    shutil.copytree(summary_template / "data", workdir / "data")
+    summary_cache.clear()
+    student_cache.clear()
+    return workdir
+
+
+@pytest.fixture
+def client(summaries):
+    from fastapi.testclient import TestClient
+    from server import app
+
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+import pytest
+
+from analyse_subjects.analyse_subjects import (
+    analyze_subjects, create_overall_summary, sanitize_results, summarize_subjects,
+)
+from storage.ingest import exclude_results, grade_points
+
+ROWS = pd.DataFrame([
+    ("21000001", "SCS1201 Data Structures", 2021, "1", 3, "A"),
+    ("21000002", "SCS1201 Data Structures", 2021, "1", 3, "F"),
+    ("21000003", "SCS1201 Data Structures", 2021, "1", 3, "B+"),
+    ("21000004", "SCS1201 Data Structures", 2021, "1", 3, "MC"),
+    ("21000001", "SCS1202 Programming", 2021, "1", 3, "C"),
+    ("21000002", "SCS1202 Programming", 2021, "1", 3, "C"),
+    ("21000001", "ENH1201 Enhancement I", 2021, "1", 0, "CM"),
+], columns=["Index", "Subject", "Year", "Semester", "Credits", "Result"])
+
+
+def test_subject_stats():
+    valid, stats, grade_counts = summarize_subjects(sanitize_results(ROWS))
+    assert set(valid["Result"]) == {"A", "F", "B+", "C"}
+    assert list(stats.index) == ["SCS1201 Data Structures", "SCS1202 Programming"]
+
+    first = stats.loc["SCS1201 Data Structures"]
+    assert first["Average GPA"] == pytest.approx(round((4.0 + 0.0 + 3.3) / 3, 3))
+    assert first["Total Students"] == 3
+    assert first["Failures"] == 1
+    assert first["Failure Rate (%)"] == pytest.approx(33.33)
+    assert grade_counts.loc[("SCS1202 Programming", "C")] == 2
+
+
+def test_stats_match_a_per_subject_calculation(cohort_rows):
+    _, stats, _ = summarize_subjects(sanitize_results(cohort_rows))
+    rows = cohort_rows[(cohort_rows["Credits"] > 0) & ~cohort_rows["Result"].isin(exclude_results)]
+    for subject, group in rows.groupby("Subject"):
+        points = group["Result"].map(grade_points)
+        assert stats.loc[subject, "Average GPA"] == pytest.approx(round(points.mean(), 3))
+        assert stats.loc[subject, "Total Students"] == len(group)
+        assert stats.loc[subject, "Failures"] == (points == 0).sum()
+
+
+def test_workbooks_and_overall_summary(workdir):
+    valid, stats, grade_counts = summarize_subjects(sanitize_results(ROWS))
+    analyze_subjects(valid, stats, grade_counts, "subjects", workers=1)
+    assert sorted(os.listdir("subjects")) == ["SCS1201 Data Structures.xlsx", "SCS1202 Programming.xlsx"]
+    sheets = pd.read_excel("subjects/SCS1201 Data Structures.xlsx", sheet_name=None)
+    assert list(sheets) == ["RawData", "Summary", "GradeDistribution"]
+    assert len(sheets["RawData"]) == 3
+
+    create_overall_summary(stats, "summary")
+    overall = pd.read_excel("summary/overall_subject_summary.xlsx")
+    # Hardest first: (4 - average) + failure rate is 2.0 for SCS1202 and 1.9 for SCS1201
+    assert overall["Subject"].tolist() == ["SCS1202 Programming", "SCS1201 Data Structures"]
+    assert overall["Difficulty Score"].is_monotonic_decreasing
@@ -0,0 +1,149 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+
+from scraper import batch
+from scraper.batch import RateLimiter, login_with_retry, scrape_students
+from scraper.login import LoginError, login
+
+
+def fake_login(failures):
+    """
+    A login() stand-in that raises each of `failures` in turn, then returns a page.
+    """
+    calls = []
+
+    def login(index_no, nic, session=None, url=None, timeout=None):
+        calls.append(index_no)
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return f"<html>{index_no}</html>"
+
+    return login, calls
+
+
+def test_network_errors_are_retried(monkeypatch):
+    login, calls = fake_login([requests.ConnectionError(), requests.Timeout()])
+    monkeypatch.setattr(batch, "login", login)
+    html = login_with_retry("21000001", "nic", None, RateLimiter(0), retries=3, backoff=0)
+    assert html == "<html>21000001</html>"
+    assert len(calls) == 3
+
+
+def test_retries_give_up(monkeypatch):
+    login, calls = fake_login([requests.ConnectionError()] * 5)
+    monkeypatch.setattr(batch, "login", login)
+    with pytest.raises(requests.ConnectionError):
+        login_with_retry("21000001", "nic", None, RateLimiter(0), retries=2, backoff=0)
+    assert len(calls) == 3
+
+
+def test_login_error_is_not_retried(monkeypatch):
+    login, calls = fake_login([LoginError("wrong NIC")])
+    monkeypatch.setattr(batch, "login", login)
+    with pytest.raises(LoginError):
+        login_with_retry("21000001", "nic", None, RateLimiter(0), retries=3, backoff=0)
+    assert len(calls) == 1
+
+
+def test_scrape_students_reports_failures(monkeypatch):
+    def login(index_no, nic, session=None, url=None, timeout=None):
+        if nic == "bad":
+            raise LoginError("wrong NIC")
+        return index_no
+
+    monkeypatch.setattr(batch, "login", login)
+    processed = []
+    summary = scrape_students([("21000001", "ok"), ("21000002", "bad"), ("21000003", "ok")],
+                              lambda index_no, html: processed.append(html), rate_limit=0, backoff=0)
+    assert sorted(summary["succeeded"]) == ["21000001", "21000003"]
+    assert list(summary["failed"]) == ["21000002"]
+    assert sorted(processed) == ["21000001", "21000003"]
+
+
+class StandInServer:
+    """
+    A local stand-in for the results site: answers every login POST with the
+    next (status, body) of `responses` (the last one repeats).
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+                server.requests.append(parse_qs(body))
+                status, page = server.responses[min(len(server.requests), len(server.responses)) - 1]
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html")
+                self.end_headers()
+                self.wfile.write(page.encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/exam_results/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(*responses):
+        servers.append(StandInServer(responses))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+PAGE = "<html><h3>Student Record of Examinations</h3></html>"
+
+
+def test_login_against_the_stand_in(stand_in):
+    server = stand_in((200, PAGE))
+    assert login("21000001", "nic", url=server.url) == PAGE
+    assert server.requests == [{"no": ["21000001"], "pw": ["nic"]}]
+
+    with pytest.raises(LoginError):
+        login("21000001", "nic", url=stand_in((200, "<html>Invalid login</html>")).url)
+    with pytest.raises(requests.HTTPError):
+        login("21000001", "nic", url=stand_in((503, "<html>Service Unavailable</html>")).url)
+
+
+def test_server_errors_and_rate_limiting_are_retried(stand_in):
+    server = stand_in((503, "busy"), (429, "slow down"), (502, "bad gateway"), (200, PAGE))
+    with requests.Session() as session:
+        assert login_with_retry("21000001", "nic", session, RateLimiter(0), url=server.url, backoff=0) == PAGE
+    assert len(server.requests) == 4
+
+
+def test_client_errors_are_not_retried(stand_in):
+    server = stand_in((404, "not found"))
+    with pytest.raises(requests.HTTPError):
+        login_with_retry("21000001", "nic", requests.Session(), RateLimiter(0), url=server.url, backoff=0)
+    assert len(server.requests) == 1
+
+
+def test_scrape_students_against_the_stand_in(stand_in):
+    server = stand_in((500, "oops"), (200, PAGE))
+    processed = []
+    summary = scrape_students([("21000001", "nic"), ("21000002", "nic")],
+                              lambda index_no, html: processed.append(index_no),
+                              url=server.url, concurrency=2, rate_limit=0, retries=1, backoff=0)
+    assert sorted(summary["succeeded"]) == ["21000001", "21000002"]
+    assert summary["failed"] == {}
+    assert len(server.requests) == 3
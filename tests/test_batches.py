@@ -0,0 +1,75 @@
+import os
+
+import pandas as pd
+
+from api.utils import DATA_DIR, load_gpa_table, summary_batches, warm_caches
+from api.watcher import DataWatcher
+from storage.results_store import BATCHES_DIR, batch_of, batch_range, list_batches, read_range
+from update_summaries import AggregateState
+
+
+def test_batch_of_and_range():
+    assert batch_of("21000561") == "2021"
+    assert batch_of(" 99000001") == "2099"
+    assert batch_of("x1000001") is None
+    assert batch_of("2") is None
+    low, high = batch_range("2021")
+    assert low <= "21000001" <= "21999999" <= high
+    assert not low <= "20999999" <= high
+    assert not low <= "22000000" <= high
+
+
+def test_batches_in_the_store(summaries):
+    assert list_batches() == ["2018", "2019"]
+    assert summary_batches() == ["2018", "2019"]
+    low, high = batch_range("2019")
+    rows = read_range(low, high)
+    assert set(rows["Index"].str[:2]) == {"19"}
+
+
+def test_batch_aggregates_match_a_build_of_the_batch(cohort_rows):
+    state = AggregateState.build(cohort_rows)
+    assert state.batches() == ["2018", "2019"]
+    for batch in state.batches():
+        part = state.batch(batch)
+        built = AggregateState.build(cohort_rows[cohort_rows["Index"].map(batch_of) == batch])
+        pd.testing.assert_frame_equal(part.gpa_summary().reset_index(drop=True),
+                                      built.gpa_summary().reset_index(drop=True), check_dtype=False)
+        pd.testing.assert_frame_equal(part.subject_stats(), built.subject_stats(), check_dtype=False)
+
+
+def test_batch_endpoints(client):
+    everyone = client.get("/api/summary/students/gpa-summary").json()["summary"]
+    batch = client.get("/api/summary/students/gpa-summary", params={"batch": "2019"}).json()["summary"]
+    assert {str(r["Index"])[:2] for r in batch} == {"19"}
+    assert len(batch) == sum(str(r["Index"]).startswith("19") for r in everyone)
+    # Ranks are within the batch
+    assert sorted(r["Rank"] for r in batch)[0] == 1
+
+    batches = client.get("/api/summary/batches").json()["batches"]
+    assert [b["batch"] for b in batches] == ["2018", "2019"]
+    assert sum(b["students"] for b in batches) == len(everyone)
+
+    assert client.get("/api/summary/students/gpa-summary", params={"batch": "2030"}).status_code == 404
+    assert client.get("/api/summary/students/gpa-summary", params={"batch": "19"}).status_code == 422
+
+
+def test_warm_up_skips_incomplete_batches(summaries, capsys):
+    os.remove(f"{DATA_DIR}{BATCHES_DIR}/2019/GPA_Summary.xlsx")
+    warm_caches()
+    assert "Summary not available yet" in capsys.readouterr().out
+    assert load_gpa_table("2018").lookup(load_gpa_table("2018").frame["Index"].iloc[0])
+
+
+def test_publish_removes_batches_no_longer_in_the_store(summaries):
+    stale = f"{DATA_DIR}{BATCHES_DIR}/2055"
+    os.makedirs(stale)
+    pd.read_excel(f"{DATA_DIR}GPA_Summary.xlsx").head(0).to_excel(f"{stale}/GPA_Summary.xlsx", index=False)
+
+    watcher = DataWatcher()
+    try:
+        watcher.recompute()
+    finally:
+        watcher.stop()
+    assert watcher.last_error is None
+    assert summary_batches() == ["2018", "2019"]
@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+
+from benchmarks import run
+from benchmarks.cohort import generate_cohort, iter_students, render_page
+from scraper.parse_results import parse_student_results
+
+
+def test_cohort_is_reproducible_and_chunkable():
+    pd.testing.assert_frame_equal(generate_cohort(20, intakes=2, seed=3), generate_cohort(20, intakes=2, seed=3))
+    chunks = pd.concat([generate_cohort(10, intakes=2, start=0), generate_cohort(10, intakes=2, start=10)])
+    indexes = chunks["Index"].unique()
+    assert len(indexes) == 20
+    assert {i[:2] for i in indexes} == {"18", "19"}
+
+
+def test_cohort_rows_look_like_parsed_pages():
+    rows = generate_cohort(10)
+    assert set(rows.columns) == {"Index", "Name", "Subject", "Year", "Semester", "Credits", "Result"}
+    assert set(rows.loc[rows["Credits"] == 0, "Result"]) <= {"CM", "NC"}
+    for index_no, name, student_rows in iter_students(rows):
+        assert parse_student_results(render_page(index_no, name, student_rows)) == (name, index_no, student_rows)
+
+
+def test_compare_flags_regressions(capsys):
+    previous = {"results": [{"benchmark": "gpa", "students": 1000, "seconds": 1.0},
+                            {"benchmark": "parse", "students": 1000, "seconds": 1.0}]}
+    current = {"results": [{"benchmark": "gpa", "students": 1000, "seconds": 1.05},
+                           {"benchmark": "parse", "students": 1000, "seconds": 1.5},
+                           {"benchmark": "api:new", "students": 1000, "seconds": 0.1}]}
+    assert run.compare(current, previous) == [("parse", 1000)]
+    assert "x1.50" in capsys.readouterr().out
+
+
+def test_run_size(tmp_path, monkeypatch):
+    bench_api = run.bench_api
+    monkeypatch.setattr(run, "bench_api", lambda students, summary: bench_api(students, summary, repeats=2))
+    results = run.run_size(30, str(tmp_path / "30"))
+    names = [r["benchmark"] for r in results]
+    assert names[:6] == ["generate", "parse", "load", "gpa", "analyse_load", "analyse"]
+    assert "api:gpa_summary_page" in names
+    assert all(r["students"] == 30 and r["seconds"] >= 0 for r in results)
+    assert os.path.exists(tmp_path / "30" / "data" / "summary" / "GPA_Summary.xlsx")
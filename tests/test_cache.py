@@ -0,0 +1,127 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.cache import SnapshotCache, file_signature
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_reloads_when_the_file_changes(tmp_path):
+    path = str(tmp_path / "summary.txt")
+    write(path, "v1")
+    cache = SnapshotCache(check_interval=0)
+
+    assert cache.get("summary", [path], lambda: read(path)) == "v1"
+    assert cache.get("summary", [path], lambda: "not reloaded") == "v1"
+    write(path, "v2 longer")
+    assert cache.get("summary", [path], lambda: read(path)) == "v2 longer"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_signature_is_trusted_for_the_check_interval(tmp_path):
+    path = str(tmp_path / "summary.txt")
+    write(path, "v1")
+    cache = SnapshotCache(check_interval=60)
+    cache.get("summary", [path], lambda: read(path))
+    write(path, "v2 longer")
+    assert cache.get("summary", [path], lambda: read(path)) == "v1"
+
+
+def test_missing_files_are_part_of_the_signature(tmp_path):
+    path = str(tmp_path / "summary.txt")
+    assert file_signature([path]) == (None,)
+    write(path, "v1")
+    assert file_signature([path]) != (None,)
+    os.remove(path)
+    assert file_signature([path]) == (None,)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SnapshotCache(max_entries=2)
+    for key in "abc":
+        cache.get(key, (), lambda: key.upper())
+    cache.get("b", (), lambda: "reloaded")
+    cache.get("d", (), lambda: "D")
+    assert cache.peek("a") is None
+    assert cache.peek("c") is None
+    assert cache.peek("b") == "B"
+    assert cache.stats()["entries"] == 2
+
+
+def test_get_many_loads_only_the_missing_keys():
+    cache = SnapshotCache()
+    cache.get("a", (), lambda: "A")
+    requested = []
+
+    def loader(keys):
+        requested.extend(keys)
+        return {key: key.upper() for key in keys}
+
+    assert cache.get_many(["a", "b", "c"], (), loader) == {"a": "A", "b": "B", "c": "C"}
+    assert requested == ["b", "c"]
+
+
+def test_concurrent_misses_load_once():
+    cache = SnapshotCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(executor.map(lambda _: cache.get("cohort", (), loader), range(8)))
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+
+
+def test_a_failed_load_is_retried():
+    cache = SnapshotCache()
+
+    def failing():
+        raise FileNotFoundError("no store")
+
+    with pytest.raises(FileNotFoundError):
+        cache.get("cohort", (), failing)
+    assert cache.get("cohort", (), lambda: "loaded") == "loaded"
+
+
+def test_lookup_never_loads(tmp_path):
+    path = str(tmp_path / "results.db")
+    write(path, "v1")
+    cache = SnapshotCache(check_interval=0)
+    assert cache.lookup("cohort", [path]) == (None, False)
+
+    cache.get("cohort", [path], lambda: "model v1")
+    assert cache.lookup("cohort", [path]) == ("model v1", True)
+    write(path, "v2 longer")
+    assert cache.lookup("cohort", [path]) == ("model v1", False)
+
+
+def test_put_many_swaps_then_publishes_outside_the_lock(tmp_path):
+    path, staged = str(tmp_path / "summary.txt"), str(tmp_path / "staged.txt")
+    write(path, "v1")
+    write(staged, "v2 longer")
+    cache = SnapshotCache(check_interval=0)
+    cache.get("summary", [path], lambda: read(path))
+
+    def publish():
+        # Lookups are served while the files move, and already see the new value
+        assert cache.peek("summary") == "v2 longer"
+        os.replace(staged, path)
+
+    cache.put_many({"summary": ([path], "v2 longer", file_signature([staged]))}, publish)
+    assert cache.get("summary", [path], lambda: "not reloaded") == "v2 longer"
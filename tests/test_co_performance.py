@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.co_performance import MIN_PAIR_STUDENTS, CoPerformance
+from api.cohort import CohortModel
+from api.grade_matrix import GradeMatrix
+
+
+@pytest.fixture
+def co_performance(summaries):
+    return CoPerformance(GradeMatrix(CohortModel.load()))
+
+
+def grade_frame(co_performance):
+    matrix = co_performance.matrix
+    return pd.DataFrame(matrix.dense(co_performance.cell_gp), columns=co_performance.subjects,
+                        index=matrix.index_numbers)
+
+
+def test_correlations_match_pandas(co_performance):
+    grades = grade_frame(co_performance)
+    expected = grades.corr(min_periods=MIN_PAIR_STUDENTS)
+    pairs = co_performance.correlations()
+    assert pairs
+    for pair in pairs:
+        a, b = pair["subject_a"], pair["subject_b"]
+        assert pair["students"] == (grades[a].notna() & grades[b].notna()).sum()
+        if pair["correlation"] is None:
+            assert np.isnan(expected.loc[a, b])
+        else:
+            assert pair["correlation"] == pytest.approx(expected.loc[a, b], abs=1e-4)
+    strengths = [abs(p["correlation"]) for p in pairs if p["correlation"] is not None]
+    assert strengths == sorted(strengths, reverse=True)
+
+
+def test_conditional_failure_rates(co_performance):
+    grades = grade_frame(co_performance)
+    failed = pd.DataFrame(co_performance.matrix.dense(co_performance.matrix.cell_failed(), fill=0.0) > 0,
+                          columns=grades.columns, index=grades.index)
+    for pair in co_performance.correlations()[:20]:
+        a, b = pair["subject_a"], pair["subject_b"]
+        both = grades[a].notna() & grades[b].notna()
+        assert pair["failed_both"] == (failed[a] & failed[b]).sum()
+        failed_a = (failed[a] & both).sum()
+        if failed_a:
+            assert pair["fail_b_given_fail_a"] == pytest.approx((failed[a] & failed[b]).sum() / failed_a, abs=1e-4)
+        else:
+            assert pair["fail_b_given_fail_a"] is None
+
+
+def test_expected_grades(co_performance):
+    grades = grade_frame(co_performance)
+    residuals = grades - grades.mean()
+    index_number = grades.index[0]
+    subjects = co_performance.student_deviations(index_number)
+    assert [s["subject"] for s in subjects] == grades.loc[index_number].dropna().index.tolist()
+    for subject in subjects:
+        others = residuals.loc[index_number].drop(subject["subject"]).dropna()
+        expected = grades[subject["subject"]].mean() + others.mean()
+        assert subject["expected"] == pytest.approx(expected, abs=1e-3)
+        assert subject["deviation"] == pytest.approx(subject["grade_point"] - expected, abs=1e-3)
+    assert co_performance.student_deviations("00000000") is None
+
+
+def test_co_performance_endpoints(client):
+    pairs = client.get("/api/summary/subjects/correlations", params={"subject": "SCS1201", "limit": 3}).json()
+    assert pairs["subject"] == "SCS1201"
+    assert 0 < len(pairs["pairs"]) <= 3
+    assert all("SCS1201" in (p["subject_a"], p["subject_b"]) for p in pairs["pairs"])
+    assert client.get("/api/summary/subjects/correlations", params={"subject": "XYZ9999"}).status_code == 404
+
+    index_number = client.get("/api/summary/students/gpa-summary", params={"limit": 1}).json()["summary"][0]["Index"]
+    outliers = client.get(f"/api/summary/students/{index_number}/outliers", params={"z": 0.5}).json()
+    assert outliers["subjects"]
+    assert all(s["outlier"] == (s["z"] is not None and abs(s["z"]) >= 0.5) for s in outliers["subjects"])
+    assert client.get("/api/summary/students/00000000/outliers").status_code == 404
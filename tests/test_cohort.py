@@ -0,0 +1,99 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api import utils
+from api.cohort import CohortModel
+from api.utils import load_cohort, load_student_results, student_cache, summary_cache, watching
+from storage.results_store import connect, list_students, read_student, write_results
+
+
+@pytest.fixture
+def no_signature_delay(monkeypatch):
+    monkeypatch.setattr(summary_cache, "check_interval", 0)
+
+
+def rescrape(index_number):
+    rows = read_student(index_number).astype(str).values.tolist()
+    conn = connect()
+    write_results(conn, [(index_number, None, rows[:-1])])
+    conn.close()
+
+
+def test_model_decodes_the_stored_rows(summaries):
+    model = CohortModel.load()
+    assert list(model.index_numbers) == list_students()
+    for index_number in list_students()[:10]:
+        assert model.student_frame(index_number).values.tolist() == read_student(index_number).values.tolist()
+    assert model.position("00000000") is None
+    assert model.student_frame("00000000").empty
+    assert model.memory_report()["students"] == len(model)
+
+
+def test_four_digit_years_and_missing_values(workdir):
+    conn = connect()
+    write_results(conn, [("21000001", "Student 1", [
+        ["SCS1201 Data Structures", "2021", "1", "3", "A"],
+        ["SCS1202 Programming", "", "1", "", "MC"],
+    ])])
+    conn.close()
+
+    frame = CohortModel.load().student_frame("21000001")
+    assert frame["Year"].tolist() == [2021, None]
+    assert frame["Credits"].tolist() == [3, None]
+    assert frame["Result"].tolist() == ["A", "MC"]
+
+
+def test_concurrent_requests_load_the_model_once(summaries, monkeypatch):
+    loads = []
+    load = CohortModel.load
+
+    def slow_load(*args, **kwargs):
+        loads.append(1)
+        time.sleep(0.2)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(utils.CohortModel, "load", slow_load)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: load_cohort(), range(8)))
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_a_stale_model_is_served_while_it_reloads(summaries, no_signature_delay):
+    old = load_cohort()
+    index_number = list_students()[0]
+    rescrape(index_number)
+
+    # The request gets the loaded model straight away; the new one is built in the background
+    assert load_cohort() is old
+    deadline = time.monotonic() + 30
+    while load_cohort() is old:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert len(load_student_results(index_number)) == len(old.student_frame(index_number)) - 1
+
+
+def test_requests_leave_reloads_to_the_watcher(summaries, no_signature_delay):
+    old = load_cohort()
+    rescrape(list_students()[0])
+    threads = threading.active_count()
+    watching.set()
+    try:
+        assert load_cohort() is old
+        assert threading.active_count() == threads
+    finally:
+        watching.clear()
+
+
+def test_student_frames_are_cached_per_model(summaries):
+    index_number = list_students()[0]
+    first = load_student_results(index_number)
+    hits = student_cache.stats()["hits"]
+    assert load_student_results(index_number) is first
+    assert student_cache.stats()["hits"] == hits + 1
+    assert utils.cache_stats()["students"]["max_entries"] == utils.STUDENT_CACHE_SIZE
+    with pytest.raises(FileNotFoundError):
+        load_student_results("00000000")
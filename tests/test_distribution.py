@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.distribution import BELOW_PASS, GPADistribution
+
+GPAS = [3.9, 3.7, 3.7, 3.5, 3.3, 3.0, 2.5, 2.0, 1.5, np.nan]
+
+
+@pytest.fixture
+def distribution():
+    return GPADistribution({"FinalGPA": np.array(GPAS)})
+
+
+def test_rank_and_percentile_match_pandas(distribution):
+    series = pd.Series(GPAS).dropna()
+    ranks = series.rank(method="min", ascending=False)
+    for value, rank in zip(series, ranks):
+        position = distribution.position("FinalGPA", value)
+        assert position["rank"] == rank
+        assert position["percentile"] == round(100 * (series <= value).mean(), 2)
+        assert position["students"] == 9
+
+
+def test_histogram(distribution):
+    histogram = distribution.histogram("FinalGPA", bins=4, low=0.0, high=4.0)
+    assert [b["count"] for b in histogram] == [0, 1, 2, 6]
+    assert histogram[-1] == {"low": 3.0, "high": 4.0, "count": 6}
+    # Values outside the range are not counted; the top edge is included
+    assert sum(b["count"] for b in distribution.histogram("FinalGPA", bins=3, low=2.0, high=3.5)) == 5
+
+
+def test_class_bands(distribution):
+    bands = {b["band"]: b["count"] for b in distribution.class_bands()}
+    assert bands == {"First Class": 3, "Second Class (Upper Division)": 2, "Second Class (Lower Division)": 1,
+                     "Pass": 2, BELOW_PASS: 1}
+
+
+def test_distribution_endpoints(client):
+    summary = client.get("/api/summary/students/gpa-summary", params={"sort": "-FinalGPA", "limit": 3}).json()
+    best = summary["summary"][0]
+    position = client.get(f"/api/summary/students/gpa-summary/{best['Index']}/percentile",
+                          params={"metric": "FinalGPA"}).json()["positions"]["FinalGPA"]
+    assert position["rank"] == 1
+    assert position["percentile"] == 100.0
+
+    top = client.get("/api/summary/students/gpa-top", params={"k": 3}).json()["summary"]
+    assert [r["Index"] for r in top] == [r["Index"] for r in summary["summary"]]
+    assert client.get("/api/summary/students/gpa-top", params={"metric": "Y9S9"}).status_code == 400
+
+    bands = client.get("/api/summary/students/class-bands").json()["bands"]
+    assert sum(b["count"] for b in bands) == summary["total"]
+    histogram = client.get("/api/summary/students/gpa-histogram", params={"bins": 8}).json()
+    assert sum(b["count"] for b in histogram["histogram"]) == histogram["students"]
+    assert client.get("/api/summary/students/gpa-histogram", params={"low": 4, "high": 1}).status_code == 400
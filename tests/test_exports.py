@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import os
+
+import pandas as pd
+
+from api import exports
+from storage.results_store import list_students, read_subject
+
+
+def test_csv_export_is_streamed_and_cached(client):
+    response = client.get("/api/exports/results.csv", params={"subjects": "SCS1201"})
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == exports.EXPORT_COLUMNS
+    assert [row[0] for row in rows[1:]] == read_subject("SCS1201")["Index"].tolist()
+
+    etag = response.headers["etag"]
+    assert os.listdir(exports.EXPORT_DIR) == [etag.strip('"') + ".csv"]
+    again = client.get("/api/exports/results.csv", params={"subjects": "SCS1201"})
+    assert again.content == response.content
+    assert client.get("/api/exports/results.csv", params={"subjects": "SCS1201"},
+                      headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_ndjson_and_xlsx_exports(client):
+    params = {"semester": "Y1S1", "batch": "2018"}
+    records = [json.loads(line) for line in client.get("/api/exports/results.ndjson", params=params).text.splitlines()]
+    assert records and all(r["Index"].startswith("18") and "SCS1201" <= r["Subject"][:7] <= "SCS1207"
+                           for r in records)
+
+    response = client.get("/api/exports/results.xlsx", params=params)
+    frame = pd.read_excel(io.BytesIO(response.content), dtype={"Index": str})
+    assert frame["Index"].tolist() == [r["Index"] for r in records]
+
+
+def test_cached_exports_survive_a_concurrent_prune(client, monkeypatch):
+    params = {"subjects": "SCS1201"}
+    for fmt in ("csv", "xlsx"):
+        first = client.get(f"/api/exports/results.{fmt}", params=params)
+        path = os.path.join(exports.EXPORT_DIR, first.headers["etag"].strip('"') + f".{fmt}")
+        open_cached = exports._open_cached
+
+        def pruned_after_open(path):
+            f = open_cached(path)
+            os.remove(path)
+            return f
+
+        monkeypatch.setattr(exports, "_open_cached", pruned_after_open)
+        assert client.get(f"/api/exports/results.{fmt}", params=params).content == first.content
+
+        def pruned_before_open(path):
+            if os.path.exists(path):
+                os.remove(path)
+            return open_cached(path)
+
+        # Pruned after an existence check would have passed: the export is generated again
+        open(path, "wb").close()
+        monkeypatch.setattr(exports, "_open_cached", pruned_before_open)
+        again = client.get(f"/api/exports/results.{fmt}", params=params)
+        assert again.status_code == 200
+        assert os.path.exists(path)
+        monkeypatch.setattr(exports, "_open_cached", open_cached)
+        if fmt == "csv":
+            assert again.content == first.content
+        else:
+            pd.testing.assert_frame_equal(pd.read_excel(io.BytesIO(again.content)),
+                                          pd.read_excel(io.BytesIO(first.content)))
+
+
+def test_bad_export_requests(client):
+    assert client.get("/api/exports/results.pdf").status_code == 400
+    assert client.get("/api/exports/results.csv", params={"semester": "Y9S9"}).status_code == 400
+
+
+def test_student_download_falls_back_to_an_export(client):
+    index_number = list_students()[0]
+    response = client.get(f"/api/students/{index_number}/download")
+    assert response.status_code == 200
+    frame = pd.read_excel(io.BytesIO(response.content), dtype={"Index": str})
+    assert set(frame["Index"]) == {index_number}
+    assert client.get("/api/students/00000000/download").status_code == 404
+
+
+def test_prune_keeps_the_newest_and_never_partial_files(workdir, monkeypatch):
+    monkeypatch.setattr(exports, "MAX_EXPORTS", 2)
+    os.makedirs(exports.EXPORT_DIR)
+    for i, name in enumerate(["a.csv", "b.ndjson", "c.xlsx", "d.csv", "d.csv.1234.tmp"]):
+        path = os.path.join(exports.EXPORT_DIR, name)
+        with open(path, "w") as f:
+            f.write(name)
+        os.utime(path, (i, i))
+
+    exports._prune_exports()
+    assert sorted(os.listdir(exports.EXPORT_DIR)) == ["c.xlsx", "d.csv", "d.csv.1234.tmp"]
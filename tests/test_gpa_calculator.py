@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from GPA_Calculator.gpa_caculator import SEMESTERS, compute_gpa_summary, ordered_sums
+from GPA_Calculator.sort_by_medicals import flag_strategic_mc
+
+ROWS = pd.DataFrame([
+    # A failed paper re-sat with a B: the B counts, capped at C+ in FinalGPA only
+    ("21000001", "SCS1201 Data Structures and Algorithms I", 2021, "1", 3, "F"),
+    ("21000001", "SCS1201 Data Structures and Algorithms I", 2022, "1", 3, "B"),
+    ("21000001", "SCS1202 Programming Using C", 2021, "1", 3, "A"),
+    ("21000001", "SCS1208 Data Structure and Algorithm II", 2021, "2", 3, "MC"),
+    ("21000001", "ENH1201 Enhancement I", 2021, "1", 0, "CM"),
+    ("21000002", "SCS1201 Data Structures and Algorithms I", 2021, "1", 3, "A-"),
+    ("21000002", "SCS 2201 Software Engineering", 2022, "1", 2, "C"),
+    ("21000003", "SCS1201 Data Structures and Algorithms I", 2021, "1", 3, "A"),
+    ("21000003", "SCS1202 Programming Using C", 2021, "1", 3, "WH"),
+    ("21000004", "SCS1201 Data Structures and Algorithms I", 2021, "1", 3, "a "),
+], columns=["Index", "Subject", "Year", "Semester", "Credits", "Result"])
+
+# 39.9 points over 16 credits: 2.49375 exactly, but numpy sums the points to 39.899999999999999
+HALF_WAY = pd.DataFrame([
+    ("21000005", f"SCS120{i + 1} Subject {i + 1}", 2021, "1", credits, grade)
+    for i, (credits, grade) in enumerate(zip([3, 3, 2, 2, 2, 2, 2], ["B+", "D", "A-", "B-", "A-", "C-", "C-"]))
+], columns=ROWS.columns)
+
+
+def test_gpa_summary():
+    summary = compute_gpa_summary(ROWS).set_index("Index")
+    assert list(summary.columns) == SEMESTERS + ["FinalGPA", "TotalMC", "Rank"]
+
+    first = summary.loc["21000001"]
+    assert first["Y1S1"] == pytest.approx(3.5)
+    assert first["Y1S2"] == 0.0
+    assert first["FinalGPA"] == pytest.approx(3.15)
+    assert first["TotalMC"] == 3
+
+    second = summary.loc["21000002"]
+    assert second["Y1S1"] == pytest.approx(3.7)
+    assert second["Y2S1"] == pytest.approx(2.0)
+    assert second["FinalGPA"] == pytest.approx(3.02)
+    assert second["TotalMC"] == 0
+
+    assert summary["Rank"].to_dict() == {"21000003": 1, "21000004": 1, "21000001": 3, "21000002": 4}
+
+
+def test_half_way_gpa_rounds_like_the_per_student_calculation():
+    summary = compute_gpa_summary(HALF_WAY).iloc[0]
+    assert summary["Y1S1"] == 2.4937
+    assert summary["FinalGPA"] == 2.4937
+
+
+def test_ordered_sums_match_numpy():
+    rng = np.random.default_rng(0)
+    sizes = rng.integers(0, 300, 500)
+    ends = np.cumsum(sizes)
+    values = rng.choice([1, 2, 3], ends[-1]) * rng.choice([4.0, 3.7, 3.3, 2.7, 2.3, 1.7, 1.3, 0.0], ends[-1])
+    expected = [values[start:end].sum() for start, end in zip(ends - sizes, ends)]
+    assert ordered_sums(values, ends - sizes, ends).tolist() == expected
+
+
+def test_students_are_computed_independently(cohort_rows):
+    """
+    The whole-cohort computation gives every student the GPAs they get on their own.
+    """
+    summary = compute_gpa_summary(cohort_rows).set_index("Index")
+    for index_no, rows in list(cohort_rows.groupby("Index"))[:10]:
+        alone = compute_gpa_summary(rows).set_index("Index").loc[index_no]
+        pd.testing.assert_series_equal(summary.loc[index_no].drop("Rank"), alone.drop("Rank"), check_dtype=False)
+
+
+def test_strategic_mc_flag():
+    flagged = flag_strategic_mc(compute_gpa_summary(ROWS)).set_index("Index")["StrategicUseOfMC"]
+    # Median FinalGPA is 3.575 and the MC threshold 0.75: only a student above both is flagged
+    assert not flagged.any()
+    rows = pd.concat([ROWS, pd.DataFrame([("21000003", "SCS1203 Database I", 2021, "1", 3, "MC")],
+                                         columns=ROWS.columns)])
+    flagged = flag_strategic_mc(compute_gpa_summary(rows)).set_index("Index")["StrategicUseOfMC"]
+    assert flagged[flagged].index.tolist() == ["21000003"]
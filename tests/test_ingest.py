@@ -0,0 +1,58 @@
+import glob
+import os
+
+import pandas as pd
+
+from storage import ingest
+from storage.ingest import load_results, partitions
+
+
+def test_partitions_cover_every_student():
+    students = [f"2100{i:04d}" for i in range(10)]
+    assert partitions(students, 1) == [(None, None)]
+    assert partitions(students[:2], 4) == [(None, None)]
+    ranges = partitions(students, 3)
+    assert ranges[0][0] is None and ranges[-1][1] is None
+    assert [stop for _, stop in ranges[:-1]] == [start for start, _ in ranges[1:]]
+
+
+def test_parallel_load_matches_serial(summaries, monkeypatch):
+    serial = load_results(workers=1, cache=False)
+    monkeypatch.setattr(ingest, "PARALLEL_MIN_STUDENTS", 0)
+    parallel = load_results(workers=2, cache=False)
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert serial["Index"].nunique() == 40
+
+
+def test_cache_is_reused_until_the_store_changes(summaries, monkeypatch):
+    first = load_results(workers=1)
+    cached = glob.glob(os.path.join(ingest.CACHE_DIR, "results-*.pkl"))
+    assert len(cached) == 1
+    pd.testing.assert_frame_equal(load_results(workers=1), first)
+
+    # A leftover frame of an older store that disappears mid-cleanup is not an error
+    stale = os.path.join(ingest.CACHE_DIR, "results-0000000000000000.pkl")
+    first.head(0).to_pickle(stale)
+    real_remove = os.remove
+
+    def racing_remove(path):
+        if path == stale:
+            real_remove(path)
+        real_remove(path)
+
+    os.utime(ingest.STORE_PATH, ns=(1, 1))
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "remove", racing_remove)
+        pd.testing.assert_frame_equal(load_results(workers=1), first)
+    assert glob.glob(os.path.join(ingest.CACHE_DIR, "results-*.pkl")) != cached
+    assert len(glob.glob(os.path.join(ingest.CACHE_DIR, "results-*.pkl"))) == 1
+
+
+def test_unreadable_cache_is_rebuilt(summaries):
+    first = load_results(workers=1)
+    [cached] = glob.glob(os.path.join(ingest.CACHE_DIR, "results-*.pkl"))
+    with open(cached, "wb") as f:
+        f.write(b"not a pickle")
+    pd.testing.assert_frame_equal(load_results(workers=1), first)
+    pd.testing.assert_frame_equal(pd.read_pickle(cached), first)
+
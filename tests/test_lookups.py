@@ -0,0 +1,52 @@
+import pandas as pd
+
+from api.utils import load_gpa_table, load_subject_difficulty_table
+
+
+def test_gpa_lookup_matches_the_summary_file(summaries):
+    frame = pd.read_excel("data/summary/GPA_Summary.xlsx", dtype={"Index": str})
+    table = load_gpa_table()
+    for _, row in frame.sample(5, random_state=0).iterrows():
+        [record] = table.lookup(f" {row['Index']} ")
+        assert str(record["Index"]) == row["Index"]
+        assert record["FinalGPA"] == row["FinalGPA"]
+        assert record["Rank"] == row["Rank"]
+    assert table.lookup("00000000") == []
+
+
+def test_lookups_use_the_hash_index(summaries):
+    table = load_gpa_table()
+    frame = table.frame
+    # Every key maps straight to its row; records come out as to_dict would build them
+    assert len(table.by_key) == len(frame)
+    for position in (0, len(frame) // 2, len(frame) - 1):
+        assert table.by_key[str(frame["Index"].iloc[position])] == [position]
+        assert table.lookup(frame["Index"].iloc[position]) == frame.iloc[[position]].to_dict(orient="records")
+
+
+def test_subject_lookup_by_name_or_code(summaries):
+    table = load_subject_difficulty_table()
+    [by_name] = table.lookup("scs1201 data structures and algorithms i")
+    [by_code] = table.lookup("scs1201")
+    assert by_name == by_code
+    assert by_name["Subject"] == "SCS1201 Data Structures and Algorithms I"
+
+
+def test_student_endpoints(client):
+    index_number = pd.read_excel("data/summary/GPA_Summary.xlsx", dtype={"Index": str})["Index"].iloc[0]
+
+    response = client.get(f"/api/summary/students/gpa-summary/{index_number}")
+    assert response.status_code == 200
+    assert str(response.json()["summary"][0]["Index"]) == index_number
+    assert client.get("/api/summary/students/gpa-summary/00000000").status_code == 404
+
+    results = client.get(f"/api/students/{index_number}").json()["results"]
+    assert results and {"Subject", "Result"} <= set(results[0])
+    subject = client.get(f"/api/students/{index_number}/subject/SCS1201").json()
+    assert subject
+
+
+def test_subject_endpoint(client):
+    summary = client.get("/api/subjects/SCS1201").json()
+    assert summary["summary"][0]["Subject"] == "SCS1201 Data Structures and Algorithms I"
+    assert client.get("/api/subjects/XYZ9999").status_code == 404
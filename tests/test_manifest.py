@@ -0,0 +1,54 @@
+import json
+import os
+from datetime import timedelta
+
+from scraper.manifest import Manifest, STATUS_FAILED
+
+ROWS = [["SCS1201 Data Structures", "2021", "1", "2", "A"]]
+CHANGED_ROWS = [["SCS1201 Data Structures", "2021", "1", "2", "B"]]
+
+
+def test_updates_are_journaled_not_rewritten(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = Manifest(path)
+    manifest.start_run()
+    size = os.path.getsize(path)
+
+    for i in range(100):
+        manifest.record_success(f"21{i:06d}", ROWS)
+    assert os.path.getsize(path) == size
+    with open(manifest.journal_path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 100
+
+    manifest.finish_run()
+    assert not os.path.exists(manifest.journal_path)
+    assert len(Manifest(path).students) == 100
+
+
+def test_interrupted_run_resumes_from_the_journal(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = Manifest(path)
+    manifest.start_run()
+    manifest.record_success("21000001", ROWS)
+    manifest.record_failure("21000002", "timed out")
+    # The process dies here: no flush, and the last journal line is cut off
+    with open(manifest.journal_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(["21000003", {"status": "ok"}])[:10])
+
+    resumed = Manifest(path)
+    assert sorted(resumed.students) == ["21000001", "21000002"]
+    assert resumed.is_fresh("21000001", timedelta(hours=1))
+    assert resumed.students["21000002"]["status"] == STATUS_FAILED
+    assert not resumed.is_fresh("21000002", timedelta(hours=1))
+
+
+def test_changed_rows(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    manifest.start_run()
+    assert manifest.has_changed("21000001", ROWS)
+    assert manifest.record_success("21000001", ROWS)
+    assert not manifest.has_changed("21000001", ROWS)
+    assert not manifest.record_success("21000001", ROWS)
+    assert manifest.has_changed("21000001", CHANGED_ROWS)
+    assert manifest.record_success("21000001", CHANGED_ROWS)
+    assert manifest.changed_since() == ["21000001"]
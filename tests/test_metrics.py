@@ -0,0 +1,49 @@
+from api.metrics import Histogram, format_labels
+from storage.results_store import list_students
+from timings import StageTimer, TIMINGS_DIR
+
+
+def metric_lines(client, name):
+    return [line for line in client.get("/api/metrics").text.splitlines() if line.startswith(name)]
+
+
+def test_requests_are_labelled_with_their_route_template(client):
+    index_number = list_students()[0]
+    # Path parameters that equal a literal segment of the template must not be confused with it
+    for path in (f"/api/students/{index_number}", "/api/students/students",
+                 "/api/summary/students/gpa-summary/gpa-summary", "/api/no/such/page"):
+        client.get(path)
+
+    requests = metric_lines(client, "http_requests_total")
+    assert any('route="/api/students/{index_number}",status="200"' in line for line in requests)
+    assert any('route="/api/students/{index_number}",status="404"' in line for line in requests)
+    assert any('route="/api/summary/students/gpa-summary/{index_number}",status="404"' in line for line in requests)
+    assert any('route="unmatched",status="404"' in line for line in requests)
+    assert not any(index_number in line or "/students/students" in line for line in requests)
+
+
+def test_cache_and_pipeline_metrics(client):
+    timer = StageTimer("gpa_calculator")
+    with timer.stage("compute"):
+        pass
+    timer.write(f"{TIMINGS_DIR}gpa_calculator.json")
+
+    assert metric_lines(client, 'cache_entries{cache="summaries"}')
+    assert metric_lines(client, 'cache_hits_total{cache="students"}')
+    assert metric_lines(client, 'pipeline_stage_seconds{command="gpa_calculator",stage="compute"}')
+    assert metric_lines(client, 'pipeline_run_seconds{command="gpa_calculator"}')
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram([0.1, 1.0])
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe((("route", "/a"),), value)
+    lines = histogram.render("latency", "Latency")
+    assert 'latency_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_count{route="/a"} 4' in lines
+
+
+def test_label_values_are_escaped():
+    assert format_labels((("route", 'a"b\\c'),)) == '{route="a\\"b\\\\c"}'
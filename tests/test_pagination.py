@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from api.indexes import SummaryTable
+from api.summery import encode_cursor, paginate
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    gpa = rng.choice([2.0, 2.5, 3.0, 3.5, np.nan], 200)  # many ties and missing values
+    return pd.DataFrame({
+        "Index": [f"21{i:06d}" for i in range(200)],
+        "FinalGPA": gpa,
+        "TotalMC": rng.integers(0, 4, 200),
+    })
+
+
+def expected(frame, sort, descending, filters):
+    """
+    The same query with pandas: range filters (missing values never match), then a stable sort.
+    """
+    for column, low, high in filters:
+        if low is not None:
+            frame = frame[frame[column] >= low]
+        if high is not None:
+            frame = frame[frame[column] <= high]
+    if sort:
+        frame = frame.sort_values(sort, ascending=not descending, kind="mergesort", na_position="last")
+    return frame["Index"].tolist()
+
+
+@pytest.mark.parametrize("sort", [None, "FinalGPA", "TotalMC", "Index"])
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("filters", [
+    [],
+    [("FinalGPA", 2.5, 3.0)],
+    [("FinalGPA", None, 2.5), ("TotalMC", 1, None)],
+    [("FinalGPA", 3.0, None), ("FinalGPA", None, 3.4)],
+    [("TotalMC", 2, 2)],
+    [("FinalGPA", 3.8, None)],
+])
+def test_query_matches_pandas(frame, sort, descending, filters):
+    table = SummaryTable(frame, "Index")
+    want = expected(frame, sort, descending, filters)
+    records, total = table.query(sort, descending, filters)
+    assert [r["Index"] for r in records] == want
+    assert total == len(want)
+
+    records, total = table.query(sort, descending, filters, offset=7, limit=10)
+    assert [r["Index"] for r in records] == want[7:17]
+    assert total == len(want)
+
+
+def test_descending_sort_is_stable_with_missing_values_last(frame):
+    records, _ = SummaryTable(frame, "Index").query("FinalGPA", descending=True)
+    values = [r["FinalGPA"] for r in records]
+    missing = [np.isnan(v) for v in values]
+    assert missing == sorted(missing)
+    for value in (3.5, 2.0):
+        tied = [r["Index"] for r in records if r["FinalGPA"] == value]
+        assert tied == sorted(tied)
+
+
+def test_cursor_pages_cover_every_record(frame):
+    table = SummaryTable(frame, "Index")
+    seen, cursor = [], None
+    while True:
+        page = paginate(table, "-FinalGPA", "Index,FinalGPA", cursor=cursor, limit=30)
+        assert page["total"] == len(frame)
+        assert all(set(r) == {"Index", "FinalGPA"} for r in page["summary"])
+        seen.extend(r["Index"] for r in page["summary"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected(frame, "FinalGPA", True, [])
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor(-1), encode_cursor(-100), "not a cursor!", "YWJj"])
+def test_invalid_cursors_are_rejected(frame, cursor):
+    with pytest.raises(HTTPException) as error:
+        paginate(SummaryTable(frame, "Index"), cursor=cursor, limit=10)
+    assert error.value.status_code == 400
+
+
+def test_a_cursor_past_the_end_returns_an_empty_page(frame):
+    page = paginate(SummaryTable(frame, "Index"), cursor=encode_cursor(1000), limit=10)
+    assert page["summary"] == []
+    assert page["next_cursor"] is None
+
+
+def test_unknown_columns_are_rejected(frame):
+    table = SummaryTable(frame, "Index")
+    for kwargs in ({"sort": "-Nope"}, {"fields": "Index,Nope"}):
+        with pytest.raises(HTTPException) as error:
+            paginate(table, **kwargs)
+        assert error.value.status_code == 400
+
+
+def test_gpa_summary_endpoint_pages(client):
+    first = client.get("/api/summary/students/gpa-summary", params={"limit": 5, "sort": "-FinalGPA"}).json()
+    assert len(first["summary"]) == 5
+    second = client.get("/api/summary/students/gpa-summary", params={"cursor": first["next_cursor"], "limit": 5,
+                                                                     "sort": "-FinalGPA"}).json()
+    assert second["offset"] == 5
+    gpas = [r["FinalGPA"] for r in first["summary"] + second["summary"]]
+    assert gpas == sorted(gpas, reverse=True)
+
+    response = client.get("/api/summary/students/gpa-summary", params={"cursor": encode_cursor(-5), "limit": 5})
+    assert response.status_code == 400
+    assert client.get("/api/summary/students/gpa-summary", params={"offset": -1}).status_code == 422
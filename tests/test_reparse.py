@@ -0,0 +1,55 @@
+import time
+
+from benchmarks.cohort import render_page
+from scraper.archive import archive_path, list_archive, load_html, save_html
+from scraper.manifest import Manifest, get_changed_students
+from scraper.parse_results import parse_student_results
+from scraper.reparse import reparse_archive
+from storage.results_store import list_students, read_student
+
+
+def test_archive_round_trip(workdir):
+    html = render_page("21000001", "Student 1", [["SCS1201 Data Structures", "2021", "1", "3", "A"]])
+    path = save_html("21000001", html)
+    assert path == archive_path("21000001")
+    assert list_archive() == [path]
+    assert load_html(path) == html
+
+
+def test_reparse_archive_writes_the_store(workdir, students):
+    for index_no, name, rows in students:
+        save_html(index_no, render_page(index_no, name, rows))
+    save_html("99999999", "<html><body>Login failed</body></html>")
+
+    summary = reparse_archive(store="data/results.db", workers=2)
+    assert summary["pages"] == len(students) + 1
+    assert summary["parsed"] == len(students)
+    assert summary["rows"] == sum(len(rows) for _, _, rows in students)
+    assert list(summary["failed"]) == [archive_path("99999999")]
+
+    assert list_students("data/results.db") == sorted(index_no for index_no, _, _ in students)
+    index_no, name, rows = students[0]
+    assert read_student(index_no, "data/results.db").astype(str).values.tolist() == rows
+    assert parse_student_results(load_html(archive_path(index_no)))[2] == rows
+
+
+def test_reparse_records_changed_students_in_the_manifest(workdir, students):
+    for index_no, name, rows in students[:3]:
+        save_html(index_no, render_page(index_no, name, rows))
+    reparse_archive(store="data/results.db", workers=1, manifest_path="data/manifest.json")
+    manifest = Manifest("data/manifest.json")
+    assert manifest.changed_since() == sorted(index_no for index_no, _, _ in students[:3])
+    fetched_at = manifest.students[students[0][0]]["fetched_at"]
+
+    # A parser fix changes one student's rows: only that student is rewritten and reported
+    index_no, name, rows = students[1]
+    save_html(index_no, render_page(index_no, name, rows[:-1]))
+    time.sleep(1)
+    summary = reparse_archive(store="data/results.db", workers=1, manifest_path="data/manifest.json")
+    assert summary["changed"] == 1
+    manifest = Manifest("data/manifest.json")
+    assert manifest.changed_since() == [index_no]
+    assert get_changed_students() == [index_no]
+    assert read_student(index_no, "data/results.db").astype(str).values.tolist() == rows[:-1]
+    # Re-parsing is not a fetch: the scraper's freshness check is unaffected
+    assert manifest.students[students[0][0]]["fetched_at"] == fetched_at
@@ -0,0 +1,52 @@
+import gzip
+import json
+import os
+
+import pandas as pd
+
+from api.responses import PreparedJSON
+from api.utils import summary_cache
+
+URL = "/api/summary/students/gpa-summary"
+
+
+def test_prepared_json_encodings():
+    prepared = PreparedJSON({"summary": [{"Index": "21000001", "FinalGPA": 3.5}] * 100}, "v1")
+    assert json.loads(prepared.body)["summary"][0]["FinalGPA"] == 3.5
+    assert gzip.decompress(prepared.encoded("gzip")) == prepared.body
+    assert prepared.encoded("gzip") is prepared.encoded("gzip")
+    assert prepared.etag_for("identity") == '"v1"'
+    assert prepared.etag_for("gzip") == '"v1-gzip"'
+
+
+def test_full_listing_is_compressed_and_revalidated(client):
+    response = client.get(URL, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert response.json()["total"] == len(response.json()["summary"])
+
+    cached = client.get(URL, headers={"Accept-Encoding": "gzip", "If-None-Match": f"W/{etag}"})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    plain = client.get(URL, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != etag
+    assert plain.json() == response.json()
+
+
+def test_etag_changes_with_the_data(client, monkeypatch):
+    monkeypatch.setattr(summary_cache, "check_interval", 0)
+    etag = client.get(URL).headers["etag"]
+    assert client.get(URL).headers["etag"] == etag
+
+    path = "data/summary/GPA_Summary.xlsx"
+    frame = pd.read_excel(path)
+    frame.loc[0, "FinalGPA"] = 0.5
+    frame.to_excel(path, index=False)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+
+    response = client.get(URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+
+from storage import results_store
+from storage.migrate import migrate_from_excel
+from storage.results_store import (
+    ResultsWriter, connect, export_student_excel, iter_rows, list_students, read_student, read_students, read_subject,
+    subject_code, write_results,
+)
+
+ROWS = [
+    ["SCS1201 Data Structures and Algorithms I", "2021", "1", "3", "F"],
+    ["SCS1202 Programming Using C", "2021", "1", "3", "A"],
+    ["SCS1201 Data Structures and Algorithms I", "2022", "1", "3", "B"],
+]
+
+
+def test_subject_code():
+    assert subject_code("SCS1201 Data Structures and Algorithms I") == "SCS1201"
+    assert subject_code(" scs 1201 - Data Structures") == "SCS1201"
+
+
+def test_write_replaces_a_students_rows(workdir):
+    conn = connect()
+    write_results(conn, [("21000001", "Student 1", ROWS), ("21000002", "Student 2", ROWS[:1])])
+    write_results(conn, [("21000001", None, ROWS[1:])])
+    conn.close()
+
+    assert read_student("21000001").values.tolist() == [
+        ["SCS1202 Programming Using C", 2021, "1", 3, "A"],
+        ["SCS1201 Data Structures and Algorithms I", 2022, "1", 3, "B"],
+    ]
+    assert read_students(["21000002", "21000001"])["Index"].tolist() == ["21000001", "21000001", "21000002"]
+    assert read_subject("scs1201")["Index"].tolist() == ["21000001", "21000002"]
+
+
+def test_list_students_skips_students_without_results(workdir):
+    conn = connect()
+    write_results(conn, [("21000002", "Student 2", ROWS), ("21000001", "Student 1", ROWS), ("21000003", "Student 3", [])])
+    conn.close()
+    assert list_students() == ["21000001", "21000002"]
+
+
+def test_reads_do_not_run_the_schema(workdir, monkeypatch):
+    conn = connect()
+    write_results(conn, [("21000001", "Student 1", ROWS)])
+    conn.close()
+    monkeypatch.setattr(results_store, "SCHEMA", "this is not SQL")
+    assert len(read_student("21000001")) == len(ROWS)
+    assert list_students() == ["21000001"]
+    assert sum(len(rows) for rows in iter_rows()) == len(ROWS)
+
+
+def test_writer_batches_and_runs_callbacks_after_commit(workdir):
+    written = []
+    with ResultsWriter(batch_size=2) as writer:
+        writer.add("21000001", "Student 1", ROWS, on_write=lambda: written.append("21000001"))
+        assert written == []
+        assert writer.has_student("21000001")
+        assert read_students(["21000001"]).empty
+        writer.add("21000002", "Student 2", ROWS, on_write=lambda: written.append("21000002"))
+        assert written == ["21000001", "21000002"]
+        writer.add("21000003", "Student 3", ROWS)
+    assert read_students(["21000003"])["Index"].tolist() == ["21000003"] * 3
+
+
+def test_iter_rows_filters(workdir, students):
+    conn = connect()
+    write_results(conn, students)
+    conn.close()
+
+    rows = [row for batch in iter_rows(batch_size=7) for row in batch]
+    assert len(rows) == sum(len(r) for _, _, r in students)
+    assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+
+    first, last = students[0][0], students[5][0]
+    rows = [row for batch in iter_rows(subjects=["SCS1201"], index_from=first, index_to=last) for row in batch]
+    assert rows and all(subject_code(row[1]) == "SCS1201" and first <= row[0] <= last for row in rows)
+
+    rows = [row for batch in iter_rows(code_ranges=[("SCS1201", "SCS1207")]) for row in batch]
+    assert rows and all("SCS1201" <= subject_code(row[1]) <= "SCS1207" for row in rows)
+
+
+def test_migrate_and_export_workbooks(workdir):
+    os.makedirs("data/results")
+    frame = pd.DataFrame(ROWS, columns=["Subject", "Year", "Semester", "Credits", "Result"])
+    frame.to_excel("data/results/21000001.xlsx", index=False)
+
+    assert migrate_from_excel() == 1
+    export_student_excel("21000001", "exported.xlsx")
+    exported = pd.read_excel("exported.xlsx", dtype={"Semester": str})
+    assert exported.astype(str).values.tolist() == ROWS
@@ -0,0 +1,89 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from api.search_index import CODE_PREFIX, EXACT, INDEX_PREFIX, NAME_PREFIX, SearchIndex
+from storage.results_store import subject_code
+
+SUBJECTS = [
+    "SCS1201 Data Structures and Algorithms I",
+    "SCS1208 Data Structure and Algorithm II",
+    "SCS2201 Data Structures and Algorithms III",
+    "SCS1203 Database I",
+    "SCS2209 Database II",
+    "ENH1201 Enhancement I",
+    "SCS1201 Data Structures and Algorithms I",  # the same subject found again
+]
+INDEX_NUMBERS = ["20001201", "21000001", "21000002", "21000010", "21001000"]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex(SimpleNamespace(index_numbers=np.array(INDEX_NUMBERS), subjects=SUBJECTS))
+
+
+def values(matches):
+    return [(m["value"], m["rank"]) for m in matches]
+
+
+def test_subject_codes_rank_exact_matches_first(index):
+    matches, total = index.search("SCS 1201")
+    assert values(matches) == [("SCS1201", EXACT)]
+    assert total == 1
+
+    matches, total = index.search("scs12")
+    assert values(matches) == [("SCS1201", CODE_PREFIX), ("SCS1203", CODE_PREFIX), ("SCS1208", CODE_PREFIX)]
+
+
+def test_every_word_must_start_a_word_of_the_name(index):
+    matches, _ = index.search("data struct")
+    assert [m["value"] for m in matches] == ["SCS1201", "SCS1208", "SCS2201"]
+    assert {m["rank"] for m in matches} == {NAME_PREFIX}
+    matches, _ = index.search("struct data ii")
+    assert [m["value"] for m in matches] == ["SCS1208", "SCS2201"]
+    assert index.search("database x")[0] == []
+
+
+def test_index_numbers(index):
+    matches, total = index.search("2100")
+    assert values(matches) == [("21000001", INDEX_PREFIX), ("21000002", INDEX_PREFIX), ("21000010", INDEX_PREFIX),
+                               ("21001000", INDEX_PREFIX)]
+    assert total == 4
+    matches, total = index.search("21000001")
+    assert values(matches) == [("21000001", EXACT)]
+
+
+def test_ranking_across_kinds_limit_and_type(index):
+    # Starts both the code and the word "Enhancement"; the subject is listed once with the better rank
+    matches, _ = index.search("enh")
+    assert values(matches) == [("ENH1201", CODE_PREFIX)]
+
+    matches, total = index.search("2", limit=2)
+    assert len(matches) == 2
+    assert total == 5
+    assert index.search("scs1201", kind="student") == ([], 0)
+    assert index.search("   ") == ([], 0)
+
+    matches, _ = index.search("SCS1201 data")
+    assert values(matches)[0] == ("SCS1201", NAME_PREFIX)
+
+
+def test_search_endpoint(client):
+    body = client.get("/api/search", params={"q": "scs120", "limit": 3}).json()
+    assert [m["rank"] for m in body["matches"]] == [CODE_PREFIX] * 3
+    assert body["total"] > 3
+    index_number = client.get("/api/summary/students/gpa-summary", params={"limit": 1}).json()["summary"][0]["Index"]
+    body = client.get("/api/search", params={"q": str(index_number)}).json()
+    assert body["matches"][0] == {"type": "student", "value": str(index_number), "label": str(index_number),
+                                  "rank": EXACT}
+    assert client.get("/api/search", params={"q": "x", "type": "teacher"}).status_code == 422
+
+
+def test_subject_list_has_only_analysed_subjects(client):
+    subjects = client.get("/api/subjects/").json()["subjects"]
+    workbooks = [os.path.splitext(f)[0] for f in os.listdir("data/summary/subjects")]
+    assert sorted(subjects) == sorted(workbooks)
+    assert not any(subject_code(s).startswith("ENH") for s in subjects)
+    assert client.get("/api/subjects/ENH1201 Enhancement I").status_code == 404
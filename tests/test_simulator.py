@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from GPA_Calculator import gpa_caculator
+from GPA_Calculator.gpa_caculator import SEMESTERS, compute_gpa_summary
+from GPA_Calculator.sort_by_medicals import flag_strategic_mc
+from api.cohort import CohortModel
+from api.grade_matrix import GradeMatrix
+from storage import ingest
+from storage.ingest import load_results
+from storage.results_store import connect, write_results
+
+# A flatter grade table: every A is worth 4, B 3, C 2, D 1
+FLAT_POINTS = {"A+": 4.0, "A": 4.0, "A-": 4.0, "B+": 3.0, "B": 3.0, "B-": 3.0, "C+": 2.0, "C": 2.0, "C-": 2.0,
+               "D+": 1.0, "D": 1.0, "E": 0.0, "F": 0.0, "NC": 0.0}
+
+
+@pytest.fixture
+def matrix(summaries):
+    return GradeMatrix(CohortModel.load())
+
+
+def simulated_frame(matrix, result):
+    frame = pd.DataFrame(result["semesters"], columns=SEMESTERS, index=pd.Index(matrix.index_numbers, name="Index"))
+    return frame.assign(FinalGPA=result["FinalGPA"], Rank=result["Rank"], TotalMC=matrix.total_mc,
+                        StrategicUseOfMC=result["StrategicUseOfMC"])
+
+
+def expected_frame():
+    summary = compute_gpa_summary(load_results(cache=False))
+    flags = flag_strategic_mc(summary).set_index("Index")["StrategicUseOfMC"]
+    return summary.set_index("Index").assign(StrategicUseOfMC=flags).sort_index()
+
+
+def assert_same(simulated, expected):
+    for column in SEMESTERS + ["FinalGPA", "TotalMC"]:
+        np.testing.assert_allclose(simulated[column], expected[column].astype(float), atol=1e-9, err_msg=column)
+    assert simulated["Rank"].tolist() == expected["Rank"].tolist()
+    assert simulated["StrategicUseOfMC"].tolist() == expected["StrategicUseOfMC"].tolist()
+
+
+def test_current_policy_matches_the_gpa_calculator(matrix):
+    assert_same(simulated_frame(matrix, matrix.baseline), expected_frame())
+
+
+def test_uncapped_repeats_match_the_gpa_calculator(matrix, monkeypatch):
+    monkeypatch.setattr(gpa_caculator, "REPEAT_CAP", 4.0)
+    assert_same(simulated_frame(matrix, matrix.simulate(repeat_cap=None)), expected_frame())
+
+
+def test_other_grade_points_match_the_gpa_calculator(matrix, monkeypatch):
+    monkeypatch.setattr(ingest, "grade_points", FLAT_POINTS)
+    assert_same(simulated_frame(matrix, matrix.simulate(FLAT_POINTS)), expected_frame())
+
+
+def test_latest_attempt(workdir):
+    conn = connect()
+    write_results(conn, [
+        ("21000001", None, [["SCS1201 Data Structures", "2021", "1", "3", "F"],
+                            ["SCS1201 Data Structures", "2022", "1", "3", "B"]]),
+        ("21000002", None, [["SCS1201 Data Structures", "2022", "1", "3", "C"],
+                            ["SCS1201 Data Structures", "2021", "1", "3", "A"]]),
+    ])
+    conn.close()
+    matrix = GradeMatrix(CohortModel.load())
+
+    best = matrix.simulate(repeat_cap=None)
+    latest = matrix.simulate(repeat_cap=None, attempt="latest")
+    # Attempts are ordered by year, whatever their order on the page
+    assert best["FinalGPA"].tolist() == [3.0, 4.0]
+    assert latest["FinalGPA"].tolist() == [3.0, 2.0]
+    assert matrix.baseline["FinalGPA"].tolist() == [2.3, 2.3]
+
+
+def test_half_way_gpa_rounds_like_the_gpa_calculator(workdir):
+    grades = zip([3, 3, 2, 2, 2, 2, 2], ["B+", "D", "A-", "B-", "A-", "C-", "C-"])
+    conn = connect()
+    write_results(conn, [("21000001", None, [[f"SCS120{i + 1} Subject {i + 1}", "2021", "1", str(credits), grade]
+                                             for i, (credits, grade) in enumerate(grades)])])
+    conn.close()
+    matrix = GradeMatrix(CohortModel.load())
+    assert matrix.baseline["semesters"][0].tolist() == [2.4937, 0.0, 0.0, 0.0, 0.0]
+    assert matrix.baseline["FinalGPA"].tolist() == [2.4937]
+    assert_same(simulated_frame(matrix, matrix.baseline), expected_frame())
+
+
+def test_simulate_endpoint(client):
+    current = client.post("/api/simulate/gpa", json={}).json()
+    assert current["changed"] == {"final_gpa": 0, "rank": 0, "strategic_mc": 0}
+    assert current["mean_gpa"] == current["current_mean_gpa"]
+    assert current["total"] == current["students"]
+
+    uncapped = client.post("/api/simulate/gpa", params={"limit": 5, "changed_only": True},
+                           json={"repeat_cap": None, "attempt": "latest"}).json()
+    assert len(uncapped["summary"]) <= 5
+    assert all(s["RankChange"] == s["CurrentRank"] - s["Rank"] for s in uncapped["summary"])
+    ranks = [s["Rank"] for s in uncapped["summary"]]
+    assert ranks == sorted(ranks)
+
+    response = client.post("/api/simulate/gpa", json={"grade_points": {"A": -1}})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("policy", [
+    {"grade_points": {"A": "nan"}},
+    {"grade_points": {"A": "inf"}},
+    {"repeat_cap": "inf"},
+    {"repeat_cap": "-inf"},
+    {"gpa_quantile": "nan"},
+])
+def test_non_finite_policies_are_rejected(client, policy):
+    assert client.post("/api/simulate/gpa", json=policy).status_code == 422
@@ -0,0 +1,27 @@
+from storage.results_store import list_students, read_student
+
+
+def test_batch_lookup(client):
+    first, second = list_students()[:2]
+    response = client.post("/api/students/batch", json={"index_numbers": [first, f" {second} ", "00000000", first]})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert [s["index_number"] for s in body["students"]] == [first, second]
+    assert body["not_found"] == ["00000000"]
+    student = body["students"][0]
+    assert len(student["results"]) == len(read_student(first))
+    assert str(student["gpa_summary"][0]["Index"]) == first
+
+
+def test_batch_lookup_filters_subjects(client):
+    first = list_students()[0]
+    body = client.post("/api/students/batch", json={"index_numbers": [first],
+                                                    "subjects": ["scs1201", "SCS1202 Programming Using C"]}).json()
+    subjects = {r["Subject"] for r in body["students"][0]["results"]}
+    assert subjects == {"SCS1201 Data Structures and Algorithms I", "SCS1202 Programming Using C"}
+
+
+def test_batch_size_is_limited(client):
+    response = client.post("/api/students/batch", json={"index_numbers": [str(i) for i in range(1001)]})
+    assert response.status_code == 400
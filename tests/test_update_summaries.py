@@ -0,0 +1,47 @@
+import pandas as pd
+
+from update_summaries import AggregateState
+
+
+def changed_cohort(rows):
+    """
+    The cohort after a rescrape: two students' grades change, one loses a subject and one student is new.
+    """
+    rows = rows.copy()
+    indexes = rows["Index"].unique()
+    rows.loc[rows["Index"] == indexes[0], "Result"] = "A+"
+    rows.loc[(rows["Index"] == indexes[1]) & (rows["Result"] != "MC"), "Result"] = "F"
+    third = rows["Index"] == indexes[2]
+    rows = rows.drop(rows[third & (rows["Credits"] > 0) & (rows["Result"] != "MC")].index[:2])
+    new = rows[rows["Index"] == indexes[3]].assign(Index="19999999", Name="New Student")
+    return pd.concat([rows, new], ignore_index=True), [indexes[0], indexes[1], indexes[2], "19999999"]
+
+
+def test_update_matches_a_rebuild(cohort_rows, tmp_path):
+    state = AggregateState.build(cohort_rows)
+    state.save(str(tmp_path / "state.pkl"))
+    state = AggregateState.load(str(tmp_path / "state.pkl"))
+
+    rows, changed = changed_cohort(cohort_rows)
+    before = set(state.student_grades.loc[changed[2]].index.get_level_values("OriginalSubject"))
+    subjects = state.update(changed, rows[rows["Index"].isin(changed)])
+    rebuilt = AggregateState.build(rows)
+
+    pd.testing.assert_frame_equal(state.gpa_summary().reset_index(drop=True),
+                                  rebuilt.gpa_summary().reset_index(drop=True), check_dtype=False)
+    pd.testing.assert_frame_equal(state.subject_stats(), rebuilt.subject_stats(), check_dtype=False)
+    pd.testing.assert_series_equal(state.subject_grades, rebuilt.subject_grades, check_dtype=False)
+    # Every subject the changed students took before or take now is rewritten, and only those
+    dropped = before - set(rows.loc[rows["Index"] == changed[2], "Subject"])
+    assert dropped and dropped <= subjects
+    assert subjects <= set(rows.loc[rows["Index"].isin(changed), "Subject"]) | dropped
+
+
+def test_credit_and_year_changes_mark_the_subject(cohort_rows):
+    state = AggregateState.build(cohort_rows)
+    index_no = cohort_rows["Index"].iloc[0]
+    rows = cohort_rows[cohort_rows["Index"] == index_no].copy()
+    graded = rows[~rows["Result"].isin(["MC", "CM"])].index[0]
+    rows.loc[graded, "Credits"] += 1
+    rows.loc[graded, "Year"] += 1
+    assert rows.loc[graded, "Subject"] in state.update([index_no], rows)
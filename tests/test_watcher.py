@@ -0,0 +1,101 @@
+import os
+import time
+
+import pytest
+
+from GPA_Calculator.gpa_caculator import compute_gpa_summary
+import api.watcher
+from api.cohort import CohortModel
+from api.grade_matrix import GradeMatrix
+from api.utils import DATA_DIR, load_cohort, load_gpa_table, load_student_results, watching
+from api.watcher import STAGING_DIR, DataWatcher, summaries_outdated
+from storage.results_store import connect, list_students, read_student, read_students, write_results
+from update_summaries import STATE_PATH, SUBJECTS_DIR, AggregateState
+
+
+def rescrape(index_number, result="A+"):
+    """
+    Store new results for one student, as a scrape would. Returns their new FinalGPA.
+    """
+    rows = read_student(index_number).astype(str).values.tolist()
+    rows = [row[:4] + [result if row[3] != "0" else row[4]] for row in rows]
+    conn = connect()
+    write_results(conn, [(index_number, None, rows)])
+    conn.close()
+    return compute_gpa_summary(read_students([index_number]))["FinalGPA"].iloc[0]
+
+
+def not_in_the_server(*args, **kwargs):
+    raise AssertionError("built in the serving process")
+
+
+@pytest.fixture
+def watcher():
+    watcher = DataWatcher(interval=0.05, settle=0.2)
+    yield watcher
+    watcher.stop()
+
+
+def test_recompute_publishes_and_swaps_everything(summaries, watcher, monkeypatch):
+    index_number = list_students()[-1]
+    old_table, old_cohort = load_gpa_table(), load_cohort()
+    old_gpa = old_table.lookup(index_number)[0]["FinalGPA"]
+    load_student_results(index_number)
+
+    # Left over from a subject that is no longer in the store
+    open(f"{SUBJECTS_DIR}XYZ9999 Dropped Subject.xlsx", "w").close()
+
+    new_gpa = rescrape(index_number)
+    assert new_gpa != old_gpa
+    assert summaries_outdated()
+    # Everything is built in the worker process; the serving process only swaps it in
+    with monkeypatch.context() as patch:
+        patch.setattr(CohortModel, "load", not_in_the_server)
+        patch.setattr(GradeMatrix, "__init__", not_in_the_server)
+        patch.setattr(api.watcher, "read_snapshot", not_in_the_server)
+        watcher.recompute()
+    assert watcher.last_error is None
+    assert watcher.last_recompute["students"] == len(list_students())
+
+    table = load_gpa_table()
+    assert table is not old_table
+    assert table.version != old_table.version
+    assert table.lookup(index_number)[0]["FinalGPA"] == new_gpa
+    # A request still holding the previous snapshot keeps seeing it unchanged
+    assert old_table.lookup(index_number)[0]["FinalGPA"] == old_gpa
+
+    cohort = load_cohort()
+    assert cohort.version != old_cohort.version
+    results = load_student_results(index_number)
+    assert set(results.loc[results["Credits"] > 0, "Result"]) == {"A+"}
+
+    assert not summaries_outdated()
+    assert sorted(os.listdir(f"{DATA_DIR}batches")) == ["2018", "2019"]
+    assert "XYZ9999 Dropped Subject.xlsx" not in os.listdir(SUBJECTS_DIR)
+    assert AggregateState.load(STATE_PATH).gpa.loc[index_number, "FinalGPA"] == new_gpa
+    assert os.listdir(STAGING_DIR) == []
+
+
+def test_watcher_restarts_and_recomputes_on_change(summaries, watcher):
+    watcher.start()
+    assert watching.is_set()
+    watcher.stop()
+    assert not watching.is_set()
+    assert not watcher.status()["enabled"]
+
+    watcher.start()
+    assert watcher.status()["enabled"]
+    index_number = list_students()[0]
+    new_gpa = rescrape(index_number)
+
+    deadline = time.monotonic() + 60
+    while load_gpa_table().lookup(index_number)[0]["FinalGPA"] != new_gpa:
+        assert time.monotonic() < deadline, watcher.last_error
+        time.sleep(0.1)
+    assert watcher.last_recompute is not None
+
+
+def test_status_endpoint(client):
+    status = client.get("/api/status").json()
+    assert not status["watcher"]["enabled"]
+    assert "GPA_Summary.xlsx" in status["snapshots"]
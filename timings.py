@@ -0,0 +1,90 @@
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TIMINGS_DIR = "data/metrics/"
+
+
+class StageTimer:
+    """
+    Wall-clock time per named stage of a batch command.
+
+    Stages can be timed many times (e.g. once per student, from several
+    threads); each keeps its total time and how often it ran.
+    """
+
+    def __init__(self, command):
+        self.command = command
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, count = self._stages.get(name, (0.0, 0))
+            self._stages[name] = (total + seconds, count + 1)
+
+    def seconds(self, name):
+        with self._lock:
+            return self._stages.get(name, (0.0, 0))[0]
+
+    def report(self):
+        with self._lock:
+            stages = {name: {"seconds": round(total, 4), "count": count} for name, (total, count) in self._stages.items()}
+        return {
+            "command": self.command,
+            "started": self.started.isoformat(timespec="seconds"),
+            "total_seconds": round(time.perf_counter() - self._start, 4),
+            "stages": stages,
+        }
+
+    def print_summary(self):
+        report = self.report()
+        print(f"⏱️ {self.command} finished in {report['total_seconds']:.2f}s")
+        for name, stage in report["stages"].items():
+            print(f"   {name:<20} {stage['seconds']:8.2f}s  ({stage['count']}x)")
+
+    def write(self, path):
+        """
+        Write the JSON timing report to `path` (atomically, so readers never see half a file).
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+def add_timings_argument(parser, command):
+    parser.add_argument(
+        "--timings", nargs="?", const=f"{TIMINGS_DIR}{command}.json", default=None, metavar="PATH",
+        help=f"Write a JSON timing report (default path: {TIMINGS_DIR}{command}.json)",
+    )
+
+
+def load_reports(folder=TIMINGS_DIR):
+    """
+    The latest timing report of every batch command written to `folder`.
+    """
+    reports = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        try:
+            with open(path) as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return reports
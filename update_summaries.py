@@ -0,0 +1,225 @@
+import argparse
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from GPA_Calculator.gpa_caculator import compute_gpa_summary, rank_students, write_gpa_summary
+from GPA_Calculator.sort_by_medicals import flag_strategic_mc, write_medicals_summary
+from analyse_subjects import analyse_subjects
+from scraper.manifest import get_changed_students
+from storage.ingest import load_results
+from storage.results_store import BATCHES_DIR, batch_of, read_students, read_subject, subject_code, STORE_PATH
+
+STATE_PATH = "data/summary/aggregate_state.pkl"
+SUMMARY_DIR = "data/summary/"
+SUBJECTS_DIR = "data/summary/subjects/"
+
+
+def student_histogram(rows):
+    """
+    (Index, OriginalSubject, Result) -> count of every student's valid results.
+    """
+    df = analyse_subjects.sanitize_results(rows)
+    valid = df[~df["Result"].isin(analyse_subjects.exclude_results)]
+    counts = valid.groupby(["Index", "OriginalSubject", "Result"], observed=True).size()
+    # Plain string levels, so histograms of separate loads line up when they are merged
+    counts.index = counts.index.set_levels([level.astype(object) for level in counts.index.levels])
+    return counts
+
+
+def student_gpas(rows):
+    """
+    GPA rows (semester GPAs, FinalGPA, TotalMC) indexed by Index, without ranks.
+    """
+    if rows.empty:
+        return pd.DataFrame()
+    return compute_gpa_summary(rows).drop(columns="Rank").set_index("Index")
+
+
+class AggregateState:
+    """
+    Persistent cohort aggregates: one GPA row per student, every student's
+    per-subject grade counts and the running per-subject grade histogram.
+
+    Subject averages, failures and failure rates are derived from the
+    histogram, so updating a few students only subtracts their old counts
+    and adds the new ones instead of reprocessing the whole cohort.
+    """
+
+    def __init__(self, gpa, student_grades, subject_grades):
+        self.gpa = gpa
+        self.student_grades = student_grades
+        self.subject_grades = subject_grades
+
+    @classmethod
+    def build(cls, rows):
+        student_grades = student_histogram(rows)
+        subject_grades = student_grades.groupby(level=["OriginalSubject", "Result"]).sum()
+        return cls(student_gpas(rows), student_grades, subject_grades)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        with open(path, "rb") as f:
+            return cls(**pickle.load(f))
+
+    def save(self, path=STATE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"gpa": self.gpa, "student_grades": self.student_grades,
+                         "subject_grades": self.subject_grades}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def update(self, changed, rows):
+        """
+        Replace the contributions of the `changed` index numbers with their current `rows`.
+        Returns every subject the changed students had or now have a result in: a
+        row whose credits or year changed leaves the grade counts alone but still
+        changes that subject's workbook.
+        """
+        changed = [str(i) for i in changed]
+        old = self.student_grades[self.student_grades.index.get_level_values("Index").isin(changed)]
+        new = student_histogram(rows)
+
+        # Net change of every (subject, grade) count; unchanged subjects net out to zero
+        levels = ["OriginalSubject", "Result"]
+        delta = new.groupby(level=levels).sum().sub(old.groupby(level=levels).sum(), fill_value=0)
+        delta = delta[delta != 0]
+        subject_grades = self.subject_grades.add(delta, fill_value=0)
+        self.subject_grades = subject_grades[subject_grades > 0].astype(int).sort_index()
+        self.student_grades = pd.concat([self.student_grades.drop(old.index), new]).sort_index()
+
+        gpa = self.gpa.drop(changed, errors="ignore")
+        new_gpa = student_gpas(rows)
+        self.gpa = pd.concat([gpa, new_gpa]) if not new_gpa.empty else gpa
+
+        touched = old.index.get_level_values("OriginalSubject").union(new.index.get_level_values("OriginalSubject"))
+        return set(touched)
+
+    def batches(self):
+        return sorted(set(self.gpa.index.map(batch_of).dropna()))
+
+    def batch(self, batch):
+        """
+        The aggregates of one intake only, taken from the cohort aggregates without rereading any rows.
+        """
+        gpa = self.gpa[self.gpa.index.map(batch_of) == batch]
+        indexes = self.student_grades.index.get_level_values("Index")
+        student_grades = self.student_grades[indexes.isin(gpa.index)]
+        subject_grades = student_grades.groupby(level=["OriginalSubject", "Result"]).sum()
+        return AggregateState(gpa, student_grades, subject_grades)
+
+    def gpa_summary(self):
+        return rank_students(self.gpa.sort_index().reset_index())
+
+    def subject_stats(self):
+        return analyse_subjects.subject_stats(self.subject_grades)
+
+
+def write_subject_files(state, subjects, stats, output_dir=SUBJECTS_DIR):
+    """
+    Rewrite the workbooks of the given subjects only, reading just their rows from the store.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for subject in sorted(subjects):
+        path = os.path.join(output_dir, f"{subject}.xlsx")
+        if subject not in stats.index:
+            # Nobody has a valid result for this subject any more
+            if os.path.exists(path):
+                os.remove(path)
+            continue
+        df = analyse_subjects.sanitize_results(read_subject(subject_code(subject)))
+        valid = df[(df["OriginalSubject"] == subject) & ~df["Result"].isin(analyse_subjects.exclude_results)]
+        for workbook in analyse_subjects.subject_workbooks(valid, stats, state.subject_grades, output_dir):
+            analyse_subjects.write_subject_workbook(*workbook)
+        print(f"✅ Saved analysis for subject: {subject}")
+
+
+def write_batch_summaries(state, batches, output_dir=SUMMARY_DIR):
+    """
+    Write the GPA, strategic MC and overall subject summaries of each of `batches`,
+    ranking students within their own intake.
+    """
+    for batch in sorted(batches):
+        part = state.batch(batch)
+        if part.gpa.empty:
+            continue
+        batch_dir = os.path.join(output_dir, BATCHES_DIR, batch)
+        summary_df = part.gpa_summary()
+        write_gpa_summary(summary_df, os.path.join(batch_dir, "GPA_Summary.xlsx"))
+        write_medicals_summary(flag_strategic_mc(summary_df), os.path.join(batch_dir, "GPA_Summary_By_Medicals.xlsx"))
+        analyse_subjects.create_overall_summary(part.subject_stats(), batch_dir)
+        print(f"✅ Batch {batch} summaries saved to {batch_dir}")
+
+
+def write_summaries(state, subjects, batches):
+    summary_df = state.gpa_summary()
+    print(f"✅ GPA summary saved to {write_gpa_summary(summary_df)}")
+    print(f"✅ Strategic MC summary saved to {write_medicals_summary(flag_strategic_mc(summary_df))}")
+
+    stats = state.subject_stats()
+    analyse_subjects.create_overall_summary(stats)
+    write_subject_files(state, subjects, stats)
+    write_batch_summaries(state, batches)
+
+
+def build_summaries(output_dir=SUMMARY_DIR, store=STORE_PATH):
+    """
+    Recompute every summary from every student in the store and write them to
+    `output_dir` with the same layout as data/summary/: the GPA, strategic MC
+    and overall subject summaries, every batch's copies, every subject's
+    workbook and the aggregate state, so a later incremental update starts
+    from this data. Runs in the API's background worker process when the store changes.
+    """
+    rows = load_results(store)
+    state = AggregateState.build(rows)
+    summary_df = state.gpa_summary()
+    write_gpa_summary(summary_df, os.path.join(output_dir, "GPA_Summary.xlsx"))
+    write_medicals_summary(flag_strategic_mc(summary_df), os.path.join(output_dir, "GPA_Summary_By_Medicals.xlsx"))
+    stats = state.subject_stats()
+    analyse_subjects.create_overall_summary(stats, output_dir)
+    write_batch_summaries(state, state.batches(), output_dir)
+
+    subjects_dir = os.path.join(output_dir, os.path.relpath(SUBJECTS_DIR, SUMMARY_DIR))
+    os.makedirs(subjects_dir, exist_ok=True)
+    df = analyse_subjects.sanitize_results(rows)
+    valid = df[~df["Result"].isin(analyse_subjects.exclude_results)]
+    for workbook in analyse_subjects.subject_workbooks(valid, stats, state.subject_grades, subjects_dir):
+        analyse_subjects.write_subject_workbook(*workbook)
+
+    state.save(os.path.join(output_dir, os.path.relpath(STATE_PATH, SUMMARY_DIR)))
+    return len(state.gpa)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update GPA and subject summaries for changed students only.")
+    parser.add_argument("indexes", nargs="*", help="Changed index numbers (default: changed in the last scrape run)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the aggregate state from every student")
+    parser.add_argument("--state", default=STATE_PATH, help="Aggregate state file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.rebuild or not os.path.exists(args.state):
+        state = AggregateState.build(load_results())
+        subjects = set(state.subject_grades.index.get_level_values("OriginalSubject"))
+        batches = state.batches()
+        print(f"🔄 Rebuilt aggregate state for {len(state.gpa)} students")
+    else:
+        changed = args.indexes or get_changed_students()
+        if not changed:
+            print("✅ No changed students, summaries are up to date")
+            return
+        state = AggregateState.load(args.state)
+        subjects = state.update(changed, read_students(changed))
+        batches = {batch_of(i) for i in changed} - {None}
+        print(f"🔁 Updated {len(changed)} students affecting {len(subjects)} subjects")
+
+    write_summaries(state, subjects, batches)
+    state.save(args.state)
+    print(f"⏱️ Finished in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
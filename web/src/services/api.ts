@@ -34,6 +34,10 @@ export const studentApi = {
     };
   },
   
+  // Results and GPA summaries of many students in one request
+  getStudentsBatch: (indexNumbers: string[], subjects?: string[]) =>
+    api.post('/students/batch', { index_numbers: indexNumbers, subjects }),
+
   downloadStudentExcel: (indexNumber: string) => 
     api.get(`/students/${indexNumber}/download`, { responseType: 'blob' }),
 
@@ -41,19 +45,23 @@ export const studentApi = {
   getSubjectResult: (indexNumber: string, subjectCode: string) => 
     api.get(`/students/${indexNumber}/subject/${subjectCode}`),
   
-  // GPA Summary
-  getAllGPASummary: () => 
-    api.get('/summary/students/gpa-summary'),
+  // GPA Summary (params: limit, offset/cursor, sort, fields, min_gpa, max_gpa, min_mc, max_mc, semester)
+  getAllGPASummary: (params?: Record<string, string | number>) => 
+    api.get('/summary/students/gpa-summary', { params }),
   
   getGPASummaryByIndex: (indexNumber: string) => 
     api.get(`/summary/students/gpa-summary/${indexNumber}`),
   
   // Medical Credits
-  getAllMedicalCredits: (strategicOnly?: boolean) => 
+  getAllMedicalCredits: (strategicOnly?: boolean, params?: Record<string, string | number>) => 
     api.get('/summary/students/medical-credits', { 
-      params: strategicOnly ? { strategic_only: true } : undefined 
+      params: strategicOnly ? { ...params, strategic_only: true } : params 
     }),
   
+  // Autocomplete over index numbers, subject codes and subject name words
+  search: (q: string, params?: Record<string, string | number>) =>
+    api.get('/search', { params: { ...params, q } }),
+
   // Subjects
   getAllSubjects: () => 
     api.get('/subjects/'),
@@ -67,6 +75,13 @@ export const studentApi = {
   // Subject Difficulty
   getAllDifficultySummary: () => 
     api.get('/summary/subjects/difficulty-summary'),
+
+  // Intakes side by side, and one subject's difficulty in every intake
+  getBatches: () =>
+    api.get('/summary/batches'),
+
+  getDifficultyByBatch: (subjectCode: string) =>
+    api.get(`/summary/subjects/difficulty-summary/${subjectCode}/batches`),
   
   getDifficultySummaryBySubject: (subjectCode: string) => 
     api.get(`/subjects/difficulty-summary/${subjectCode}`),